@@ -0,0 +1,52 @@
+"""Contains benchmarks for the performance critical parts of the package.
+
+Each module can be executed as a script from the root of the repository, e.g.
+    python -m benchmarks.aggregate
+
+The benchmarks use randomly generated data and do not require an AlphaVantage API key.
+"""
+import time
+import numpy as np
+import pandas as pd
+
+
+def random_daily_series(n_days, seed=0, freq="B"):
+    """Generates a random stock data frame with n_days rows.
+
+    Args:
+        n_days (int): Number of rows (data points).
+        seed (int, optional): Seed for the random number generator. Defaults to 0.
+        freq (str, optional): Frequency of the timestamps. Defaults to "B" (business days).
+
+    Returns:
+        pandas.DataFrame: A data frame with timestamp as index, as well as 5 columns:
+            open, high, low, close and volume. The first row stores the latest data.
+    """
+    rng = np.random.RandomState(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_days)))
+    open_ = close * (1 + rng.normal(0, 0.005, n_days))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, n_days)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, n_days)))
+    volume = rng.randint(1000, 100000, n_days)
+    index = pd.date_range("1990-01-01", periods=n_days, freq=freq, name="timestamp")
+    df = pd.DataFrame({
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+    }, index=index)
+    return df[::-1]
+
+
+def timeit(func, *args, repeat=3, **kwargs):
+    """Runs a function for a number of times and returns the best run time in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
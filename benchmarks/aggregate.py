@@ -0,0 +1,67 @@
+"""Compares the vectorized Stock.aggregate() with the DataPoint loop it replaced.
+"""
+import datetime
+import pandas as pd
+from collections import OrderedDict
+from virgo_stock.stock import Stock, DataPoint
+from benchmarks import random_daily_series, timeit
+
+
+def loop_aggregate(df, trans_func):
+    """The DataPoint loop previously used by Stock.weekly_series() and Stock.monthly_series().
+    """
+    attributes = ["open", "high", "low", "close", "volume"]
+    aggregated_points = []
+    daily_points = []
+    prev_date_transformed = 0
+    for timestamp, row in df.iterrows():
+        if 'Timestamp' not in str(type(timestamp)):
+            timestamp = datetime.datetime.strptime(str(timestamp), "%Y-%m-%d")
+        date_transformed = trans_func(timestamp)
+        if date_transformed != prev_date_transformed:
+            if daily_points:
+                daily_points.reverse()
+                aggregated_points.append(DataPoint.from_list(daily_points))
+                daily_points = []
+        prev_date_transformed = date_transformed
+        daily_points.append(DataPoint(timestamp, row["open"], row["high"], row["low"], row["close"], row["volume"]))
+    if daily_points:
+        daily_points.reverse()
+        aggregated_points.append(DataPoint.from_list(daily_points))
+    aggregated_df = pd.DataFrame(
+        OrderedDict(
+            [("timestamp", pd.Series([p.timestamp for p in aggregated_points]))] +
+            [(attr, pd.Series(getattr(p, attr) for p in aggregated_points)) for attr in attributes]
+        )
+    )
+    aggregated_df.set_index("timestamp", inplace=True)
+    return aggregated_df
+
+
+def week_of_year(timestamp):
+    return "%s_%s" % (timestamp.date().isocalendar()[0], timestamp.date().isocalendar()[1])
+
+
+def month_of_year(timestamp):
+    return "%s_%s" % (timestamp.year, timestamp.month)
+
+
+def main():
+    print("%10s %8s %12s %12s %8s" % ("rows", "period", "loop (s)", "vector (s)", "speedup"))
+    for n_days in [1000, 5000, 20000]:
+        df = random_daily_series(n_days)
+        for rule, trans_func in [("W", week_of_year), ("M", month_of_year)]:
+            expected = loop_aggregate(df, trans_func)
+            actual = Stock.aggregate(df, rule)
+            pd.testing.assert_frame_equal(
+                pd.DataFrame(actual), expected, check_dtype=False, check_names=False, check_index_type=False
+            )
+            loop_time = timeit(loop_aggregate, df, trans_func, repeat=1)
+            vector_time = timeit(Stock.aggregate, df, rule)
+            print("%10d %8s %12.4f %12.4f %7.1fx" % (
+                n_days, rule, loop_time, vector_time, loop_time / vector_time
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compares the load time and disk size of the cache file formats.
+"""
+import os
+import tempfile
+from virgo_stock.source import serializer_classes
+from benchmarks import random_daily_series, timeit
+
+
+def main():
+    # Cache files store the timestamp as a column, as returned by AlphaVantage.
+    df = random_daily_series(5000).reset_index()
+    print("%10s %12s %12s %10s" % ("format", "load (ms)", "size (KB)", "speedup"))
+    csv_time = None
+    with tempfile.TemporaryDirectory() as folder:
+        for serializer_class in serializer_classes:
+            if not serializer_class.available():
+                print("%10s %12s" % (serializer_class.extension, "N/A"))
+                continue
+            serializer = serializer_class()
+            file_path = os.path.join(folder, "AAPL" + serializer.extension)
+            read_mode = 'rb' if serializer.binary else 'r'
+            write_mode = 'wb' if serializer.binary else 'w'
+            with open(file_path, write_mode) as f:
+                serializer.dump(df, f)
+
+            def load():
+                with open(file_path, read_mode) as f:
+                    return serializer.load(f)
+
+            loaded = load()
+            assert loaded["timestamp"].tolist() == df["timestamp"].tolist()
+            load_time = timeit(load, repeat=10)
+            if csv_time is None:
+                csv_time = load_time
+            print("%10s %12.2f %12.1f %9.1fx" % (
+                serializer.extension,
+                load_time * 1000,
+                os.path.getsize(file_path) / 1024,
+                csv_time / load_time
+            ))
+
+
+if __name__ == "__main__":
+    main()
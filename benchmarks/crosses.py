@@ -0,0 +1,37 @@
+"""Compares the vectorized IndicatorSeries.series_cross() with the loop it replaced.
+"""
+import numpy as np
+import pandas as pd
+from virgo_stock.indicators import IndicatorSeries, SMA
+from benchmarks import random_daily_series, timeit
+
+
+def loop_series_cross(series_n, series_k):
+    """The loop previously used by IndicatorSeries.series_cross().
+    """
+    crosses = []
+    for i in range(0, len(series_n.index) - 1):
+        if series_n.iloc[i + 1] < series_k.iloc[i + 1] and series_n.iloc[i] > series_k.iloc[i]:
+            crosses.append(i)
+    return crosses
+
+
+def main():
+    print("%10s %12s %12s %8s %12s" % ("points", "loop (s)", "vector (s)", "speedup", "8 pairs (s)"))
+    pairs = [(5, 20), (10, 50), (20, 50), (20, 100), (50, 100), (50, 200), (100, 200), (20, 200)]
+    for n_points in [10000, 100000, 1000000]:
+        df = random_daily_series(n_points, freq="min")
+        series_n = pd.Series(SMA(df, 50).to_numpy())
+        series_k = pd.Series(SMA(df, 200).to_numpy())
+        expected = loop_series_cross(series_n, series_k)
+        assert IndicatorSeries.series_cross(series_n, series_k) == expected
+        loop_time = timeit(loop_series_cross, series_n, series_k, repeat=1)
+        vector_time = timeit(IndicatorSeries.series_cross, series_n, series_k)
+        pairs_time = timeit(SMA.crosses, df, pairs, repeat=1)
+        print("%10d %12.4f %12.4f %7.0fx %12.4f" % (
+            n_points, loop_time, vector_time, loop_time / vector_time, pairs_time
+        ))
+
+
+if __name__ == "__main__":
+    main()
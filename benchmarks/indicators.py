@@ -0,0 +1,29 @@
+"""Measures the throughput of the indicators in bars (data points) per second.
+"""
+from virgo_stock import indicators
+from virgo_stock.stock import DataSeries
+from benchmarks import random_daily_series, timeit
+
+
+def calculate(df, indicator_name, *args):
+    # Clears the cached calculations so that each run calculates the indicator from scratch.
+    indicators.cache.invalidate(df)
+    return df.indicator(indicator_name, *args)
+
+
+def main():
+    names = ["SMA", "EMA", "BollingerBands", "RSI", "MACD", "ATR", "Stochastic", "OBV", "VWAP"]
+    args = {"SMA": (20, ), "EMA": (20, )}
+    sizes = [10000, 100000, 1000000]
+    print("%16s" % "bars/second" + "".join(["%14d" % n for n in sizes]))
+    frames = [DataSeries(random_daily_series(n, freq="min")) for n in sizes]
+    for name in names:
+        row = "%16s" % name
+        for df in frames:
+            seconds = timeit(calculate, df, name, *args.get(name, ()))
+            row += "%14.3g" % (len(df) / seconds)
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Measures the throughput of optimize.sweep() with different numbers of worker processes.
+"""
+import os
+from virgo_stock.stock import DataSeries
+from virgo_stock.strategy import GoldenCrossStrategy
+from virgo_stock.optimize import sweep
+from benchmarks import random_daily_series, timeit
+
+
+def main():
+    frames = {"S%d" % i: DataSeries(random_daily_series(10000, seed=i)) for i in range(8)}
+    grid = {
+        "short_term": [5, 10, 20, 30, 50],
+        "long_term": [100, 150, 200, 250],
+        "initial_cash": [5000],
+    }
+    runs = len(frames) * 5 * 4
+    print("%8s %12s %12s" % ("workers", "seconds", "runs/second"))
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        seconds = timeit(sweep, GoldenCrossStrategy, grid, frames, windows=4, max_workers=workers, repeat=1)
+        print("%8d %12.3f %12.1f" % (workers, seconds, runs / seconds))
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compares Strategy.evaluate() and Strategy.backtest() with the evaluation based on pandas rows.
+"""
+from virgo_stock.stock import DataSeries
+from virgo_stock.strategy import GoldenCrossStrategy
+from virgo_stock.indicators import SMA
+from benchmarks import random_daily_series, timeit
+
+
+class PandasRowStrategy(GoldenCrossStrategy):
+    """The golden cross strategy accessing prices with DataFrame.iloc[] and crosses with a list, as before.
+    """
+    def prices(self, t):
+        if t > 0 or -t >= len(self.df):
+            return None
+        return self.df.iloc[-t]
+
+    def suggest(self, t=1):
+        prices = self.prices(t - 1)
+        if prices is None:
+            return 0, 0
+        date = prices.name
+        p = 0
+        s = 0
+        if date in self.golden_crosses:
+            next_prices = self.prices(t)
+            if next_prices is not None:
+                p = next_prices.high
+                s = 10
+        if date in self.death_crosses:
+            next_prices = self.prices(t)
+            if next_prices is not None:
+                p = next_prices.low
+                s = -self.position(t - 1)
+        return p, s
+
+
+def main():
+    print("%10s %14s %14s %14s" % ("bars", "pandas (s)", "evaluate (s)", "backtest (s)"))
+    for n_days in [1000, 5000, 20000]:
+        df = DataSeries(random_daily_series(n_days))
+        golden_crosses = list(SMA.golden_cross(df, 20, 50))
+        death_crosses = list(SMA.death_cross(df, 20, 50))
+        times = []
+        for strategy_class, method in [
+            (PandasRowStrategy, "evaluate"),
+            (GoldenCrossStrategy, "evaluate"),
+            (GoldenCrossStrategy, "backtest"),
+        ]:
+            times.append(timeit(
+                lambda: getattr(strategy_class(df, 5000, golden_crosses, death_crosses), method)(), repeat=1
+            ))
+        print("%10d %14.4f %14.4f %14.4f" % tuple([n_days] + times))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,101 @@
 import warnings
 import logging
-import scipy.stats
+import hashlib
+import signal
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
 logger = logging.getLogger(__name__)
 
+# scipy.stats is imported when it is first used, as importing it takes about a second.
+_stats = None
+
+
+def stats():
+    """Gets the scipy.stats module, importing it when first used.
+    """
+    global _stats
+    if _stats is None:
+        import scipy.stats
+        _stats = scipy.stats
+    return _stats
+
+
+class Distribution:
+    """Represents a random variable in scipy.stats with metadata for selecting the candidates for fitting.
+
+    Attributes:
+        name (str): The name of the random variable.
+        rv: The random variable.
+        discrete (bool): Whether the random variable is discrete.
+        lower (float): The lower bound of the support in the standard form (loc=0, scale=1).
+        upper (float): The upper bound of the support in the standard form (loc=0, scale=1).
+        n_shapes (int): Number of shape parameters.
+        n_parameters (int): Number of parameters, including loc (and scale for continuous random variables).
+        fit_cost (str): A rough class of the time for fitting,
+            "fast" for random variables with specialized (e.g. analytic) fit methods,
+            "slow" for random variables with 2 or more shape parameters or known to be slow,
+            "medium" for the others, or None if the random variable cannot be fitted.
+    """
+    fit_costs = ["fast", "medium", "slow"]
+    # Random variables taking seconds to fit even a small sample.
+    slow_names = {"levy_stable", "studentized_range", "genhyperbolic", "gausshyper", "ncf", "kstwo"}
+
+    def __init__(self, name, rv):
+        self.name = name
+        self.rv = rv
+        self.discrete = isinstance(rv, stats().rv_discrete)
+        self.lower = float(rv.a)
+        self.upper = float(rv.b)
+        self.n_shapes = rv.numargs
+        self.n_parameters = rv.numargs + (1 if self.discrete else 2)
+        if not hasattr(rv, "fit"):
+            self.fit_cost = None
+        elif name in self.slow_names or rv.numargs >= 2:
+            self.fit_cost = "slow"
+        elif type(rv).fit is not stats().rv_continuous.fit:
+            self.fit_cost = "fast"
+        else:
+            self.fit_cost = "medium"
+
+    def supports(self, samples_min, samples_max):
+        """Checks if the sign of the support is compatible with samples in a range.
+        Half-line supports on one side of 0, i.e. [a, inf) with a >= 0 (positive-only) or (-inf, b] with b <= 0,
+            are not considered for samples on the other side of 0.
+        Bounded supports (e.g. uniform and beta) are always compatible, as loc and scale move both bounds.
+        """
+        if self.lower >= 0 and np.isinf(self.upper) and samples_min < 0:
+            return False
+        if self.upper <= 0 and np.isinf(self.lower) and samples_max > 0:
+            return False
+        return True
+
+    def __repr__(self):
+        return "Distribution(%s)" % self.name
+
+
+_registry = None
+
+
+def registry():
+    """Gets all random variables in scipy.stats as Distribution objects.
+    The registry is built when first used.
+
+    Returns:
+        OrderedDict: A dictionary mapping the names to Distribution objects, ordered by name.
+    """
+    global _registry
+    if _registry is None:
+        distributions = OrderedDict()
+        for attr in dir(stats()):
+            f = getattr(stats(), attr)
+            if isinstance(f, (stats().rv_continuous, stats().rv_discrete)):
+                distributions[attr] = Distribution(attr, f)
+        _registry = distributions
+    return _registry
+
 
 def continuous_rvs():
     """Gets a list of all continuous random variables from scipy
@@ -10,15 +103,7 @@ def continuous_rvs():
     Returns:
         list: A list of sub-classes of scipy.stats.rv_continuous
     """
-    rv_list = []
-    for attr in dir(scipy.stats):
-        f = getattr(scipy.stats, attr)
-        if not callable(f):
-            continue
-        if issubclass(f.__class__, scipy.stats.rv_continuous):
-            rv_list.append(f)
-            continue
-    return rv_list
+    return [d.rv for d in registry().values() if not d.discrete]
 
 
 def discrete_rvs():
@@ -27,15 +112,7 @@ def discrete_rvs():
     Returns:
         list: A list of sub-classes of scipy.stats.rv_discrete
     """
-    rv_list = []
-    for attr in dir(scipy.stats):
-        f = getattr(scipy.stats, attr)
-        if not callable(f):
-            continue
-        if issubclass(f.__class__, scipy.stats.rv_discrete):
-            rv_list.append(f)
-            continue
-    return rv_list
+    return [d.rv for d in registry().values() if d.discrete]
 
 
 def random_variables():
@@ -49,6 +126,38 @@ def random_variables():
     return rv_list
 
 
+def candidates(samples=None, discrete=False, max_fit_cost="medium", max_parameters=None):
+    """Selects random variables as candidates for fitting samples, before any fitting runs.
+
+    Args:
+        samples (array-like, optional): The samples. Random variables with support incompatible with the samples
+            (e.g. positive-only random variables for samples with negative values) are excluded.
+        discrete (bool, optional): Selects discrete (True) or continuous (False) random variables.
+            Defaults to False.
+        max_fit_cost (str, optional): The max fit cost class, "fast", "medium" or "slow". Defaults to "medium".
+        max_parameters (int, optional): The max number of parameters. Defaults to None.
+
+    Returns:
+        list: A list of random variables.
+    """
+    max_cost = Distribution.fit_costs.index(max_fit_cost)
+    if samples is not None:
+        samples = np.asarray(samples)
+        samples_min, samples_max = np.min(samples), np.max(samples)
+    rv_list = []
+    for distribution in registry().values():
+        if distribution.discrete != discrete or distribution.fit_cost is None:
+            continue
+        if Distribution.fit_costs.index(distribution.fit_cost) > max_cost:
+            continue
+        if max_parameters is not None and distribution.n_parameters > max_parameters:
+            continue
+        if samples is not None and not distribution.supports(samples_min, samples_max):
+            continue
+        rv_list.append(distribution.rv)
+    return rv_list
+
+
 def fit_test_continuous_rv():
     """A list of default continuous random variables for fit_distribution()
     
@@ -69,13 +178,207 @@ def fit_test_continuous_rv():
         "levy",
         "cauchy",
     ]
-    return [getattr(scipy.stats, name) for name in names]
+    return [getattr(stats(), name) for name in names]
+
+
+class FitCache:
+    """Caches the results of fitting samples to random variables, keyed by a hash of the samples.
+    The least recently used results are discarded when the number of entries exceeds max_entries.
+    """
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def sample_hash(samples):
+        """Calculates a hash of the samples, including the data type and shape.
+        """
+        samples = np.ascontiguousarray(samples)
+        digest = hashlib.sha1(samples.tobytes())
+        digest.update(str((samples.dtype, samples.shape)).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# The cache used by fit_distributions()
+fit_cache = FitCache()
+
+
+# Goodness of fit criteria, lower values indicate better fit.
+criteria = ["D", "AD", "CvM", "AIC", "BIC"]
+
+
+def goodness_of_fit(rv, sorted_samples, parameters):
+    """Calculates goodness of fit statistics of sorted samples for a random variable with parameters.
+    The CDF and the log PDF (or PMF) are evaluated once for all samples,
+        and shared by the statistics.
+
+    Args:
+        rv: A random variable.
+        sorted_samples (numpy.ndarray): Samples sorted in ascending order.
+        parameters (tuple): Parameters of the random variable.
+
+    Returns:
+        dict: A dictionary containing:
+            D: The Kolmogorov-Smirnov test statistic.
+            p_value: The p value of the Kolmogorov-Smirnov test.
+            AD: The Anderson-Darling test statistic.
+            CvM: The Cramér-von Mises test statistic.
+            log_likelihood: The log likelihood of the samples.
+            AIC: Akaike information criterion.
+            BIC: Bayesian information criterion.
+
+    See Also:
+        https://en.wikipedia.org/wiki/Anderson%E2%80%93Darling_test
+        https://en.wikipedia.org/wiki/Cram%C3%A9r%E2%80%93von_Mises_criterion
+        https://en.wikipedia.org/wiki/Akaike_information_criterion
+    """
+    n = len(sorted_samples)
+    cdf = rv.cdf(sorted_samples, *parameters)
+    i = np.arange(1, n + 1)
+    d = max(np.max(i / n - cdf), np.max(cdf - (i - 1) / n))
+    # The log of the CDF is undefined at 0 and 1.
+    clipped = np.clip(cdf, 1e-300, 1 - 1e-16)
+    ad = -n - np.sum((2 * i - 1) * (np.log(clipped) + np.log1p(-clipped[::-1]))) / n
+    cvm = 1.0 / (12 * n) + np.sum((cdf - (2 * i - 1) / (2.0 * n)) ** 2)
+    if hasattr(rv, "logpdf"):
+        log_likelihood = np.sum(rv.logpdf(sorted_samples, *parameters))
+    else:
+        log_likelihood = np.sum(rv.logpmf(sorted_samples, *parameters))
+    k = len(parameters)
+    return {
+        "D": d,
+        "p_value": stats().kstwo.sf(d, n),
+        "AD": ad,
+        "CvM": cvm,
+        "log_likelihood": log_likelihood,
+        "AIC": 2 * k - 2 * log_likelihood,
+        "BIC": k * np.log(n) - 2 * log_likelihood,
+    }
 
 
-def fit_distributions(samples, rv_list=None, filter_warnings='ignore'):
+def rank_fits(fits, sort_by="D"):
+    """Ranks fit results by each goodness of fit criterion.
+    The rank of each criterion is added to the results, as well as the mean of the ranks ("mean_rank").
+
+    Args:
+        fits (list): A list of fit results.
+        sort_by (str, optional): A criterion or "mean_rank" for sorting the results. Defaults to "D".
+
+    Returns:
+        list: The fit results sorted by the criterion.
+    """
+    for criterion in criteria:
+        values = np.array([fit[criterion] for fit in fits], dtype=float)
+        # NaN is ranked last.
+        values = np.where(np.isnan(values), np.inf, values)
+        ranks = stats().rankdata(values, method="min")
+        for fit, rank in zip(fits, ranks):
+            fit[criterion + "_rank"] = int(rank)
+    for fit in fits:
+        fit["mean_rank"] = np.mean([fit[criterion + "_rank"] for criterion in criteria])
+    return sorted(fits, key=lambda i: i.get(sort_by))
+
+
+class FitTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise FitTimeout()
+
+
+def _fit(rv, samples, filter_warnings='ignore', timeout=None, start=None):
+    """Fits samples to a random variable, and calculates the goodness of fit statistics.
+
+    Args:
+        rv: A random variable, or the name of a random variable in scipy.stats.
+        timeout (float, optional): Max number of seconds for the fitting.
+            The timeout is implemented with SIGALRM, which is only available in the main thread on Unix.
+        start (tuple, optional): Parameters as the starting point of the fitting (warm start),
+            e.g. the parameters fitted to a previous window of the samples.
+
+    Returns:
+        dict: The fit result, or None if the samples cannot be fitted to the random variable.
+    """
+    if isinstance(rv, str):
+        rv = getattr(stats(), rv)
+    use_alarm = (
+        timeout is not None and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with warnings.catch_warnings():
+            warnings.filterwarnings(filter_warnings)
+            if not hasattr(rv, "fit"):
+                return None
+            if start is None:
+                parameters = rv.fit(samples)
+            else:
+                parameters = rv.fit(samples, *start[:-2], loc=start[-2], scale=start[-1])
+            result = {
+                "name": rv.name,
+                "parameters": parameters,
+            }
+            result.update(goodness_of_fit(rv, np.sort(samples), parameters))
+            return result
+    except FitTimeout:
+        logger.debug("Fitting to %s timed out after %s seconds." % (rv.name, timeout))
+    except Exception:
+        logger.debug("Cannot fit to %s" % rv.name)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+    return None
+
+
+def _fit_all(rv_list, samples, filter_warnings, timeout, max_workers):
+    """Fits samples to each random variable, in a process pool if max_workers > 1.
+
+    Returns:
+        list: A list of fit results (or None) in the same order as rv_list.
+    """
+    total = len(rv_list)
+    if max_workers is None or max_workers <= 1 or total <= 1:
+        results = []
+        for counter, rv in enumerate(rv_list, 1):
+            logger.debug("Fitting data to %s...(%d/%d)" % (rv.name, counter, total))
+            results.append(_fit(rv, samples, filter_warnings, timeout))
+        return results
+    # Random variables in scipy.stats are sent by name instead of pickling the objects.
+    tasks = [rv.name if getattr(stats(), rv.name, None) is rv else rv for rv in rv_list]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_fit, task, samples, filter_warnings, timeout) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def fit_distributions(samples, rv_list=None, filter_warnings='ignore', max_workers=None, timeout=None,
+                      subsample=None, abandon_ratio=2.0, cache=True, sort_by="D"):
     """Fits a list of samples (numbers) to a list of random variable distribution.
-    The "fitness" is determined by K-S test.
-    # TODO: Use other goodness of fit tests.
+    The "fitness" is determined by K-S test by default,
+        or other goodness of fit criteria (Anderson-Darling, Cramér-von Mises, AIC and BIC) with sort_by.
 
     The data should not be tested on all random variable distributions.
     Because some random variables can produce the same distribution,
@@ -86,47 +389,180 @@ def fit_distributions(samples, rv_list=None, filter_warnings='ignore'):
     Without specifying the rv_list parameter, 
         this function will use a small set of continuous variables returned by
         fit_test_continuous_rv()
+
+    Fitting many random variables (e.g. random_variables()) can be slow, the following options can speed it up:
+        max_workers: Fits the random variables in parallel processes.
+        timeout: Gives up the random variables taking too long to fit.
+        subsample: Screens the random variables by fitting a random subsample first.
+            Random variables with K-S D value greater than abandon_ratio times the best D value of the subsample
+            are abandoned without fitting the full samples.
+        cache: Reuses the results of fitting the same samples (by hash) to the same random variables.
     
     Args:
         samples ([type]): [description]
         rv_list ([type], optional): A list of candidate random variables. Defaults to None.
             If rv_list is None, the list returned by fit_test_continuous_rv() will be used.
         filter_warnings (str, optional): How to handle scipy warnings. Defaults to 'ignore'.
+        max_workers (int, optional): Number of processes for fitting in parallel.
+            Defaults to None, i.e. fitting in the current process.
+        timeout (float, optional): Max number of seconds for fitting each random variable. Defaults to None.
+            Timeout requires SIGALRM (Unix) and fitting in worker processes or the main thread.
+        subsample (int, optional): Size of the subsample for screening the random variables.
+            Defaults to None, i.e. no screening.
+        abandon_ratio (float, optional): Ratio of D value for abandoning a random variable in screening.
+            Defaults to 2.0.
+        cache (bool, optional): Use the cached fit results. Defaults to True.
+        sort_by (str, optional): The criterion for sorting the results, "D", "AD", "CvM", "AIC", "BIC",
+            or "mean_rank" (the mean of the ranks of all criteria). Defaults to "D".
     
     Returns:
-        list: A list of dictionaries, sorted by KS test D value.
+        list: A list of dictionaries, sorted by KS test D value or the sort_by criterion.
             Each dictionary contains:
             name: The name of the fitted rv
             The best fit parameters
             The KS test D value
             The KS test p value
+            The statistics of other criteria (see goodness_of_fit()), and the rank of each criterion.
     """
-    fits = []
-    best_fit_rv = None
-    best_d = 1
-    best_parameters = None
     if rv_list == None:
         rv_list = fit_test_continuous_rv()
-    total = len(rv_list)
-    logger.debug("Fitting data to %d distributions." % total)
-    counter = 1
+    samples = np.asarray(samples)
+    logger.debug("Fitting data to %d distributions." % len(rv_list))
+    sample_hash = FitCache.sample_hash(samples) if cache else None
+
+    fits = {}
+    pending = []
     for rv in rv_list:
-        logger.debug("Fitting data to %s...(%d/%d)" % (rv.name, counter, total))
-        try:
-            with warnings.catch_warnings():
-                warnings.filterwarnings(filter_warnings)
-                if not hasattr(rv, "fit"):
+        cached = fit_cache.get((sample_hash, rv.name)) if cache else None
+        if cached is not None:
+            fits[rv.name] = cached
+        else:
+            pending.append(rv)
+
+    if pending and subsample and len(samples) > subsample:
+        rng = np.random.RandomState(0)
+        screening_samples = rng.choice(samples, subsample, replace=False)
+        screening = _fit_all(pending, screening_samples, filter_warnings, timeout, max_workers)
+        best_d = min([fit["D"] for fit in screening if fit is not None] + [1])
+        kept = [rv for rv, fit in zip(pending, screening) if fit is not None and fit["D"] <= abandon_ratio * best_d]
+        logger.debug("%d of %d distributions abandoned in screening." % (len(pending) - len(kept), len(pending)))
+        pending = kept
+
+    for rv, fit in zip(pending, _fit_all(pending, samples, filter_warnings, timeout, max_workers)):
+        if fit is None:
+            continue
+        fits[rv.name] = fit
+        if cache:
+            fit_cache.put((sample_hash, rv.name), fit)
+    return rank_fits([dict(fit) for fit in fits.values()], sort_by)
+
+
+def _fit_windows(rv_list, values, bounds, filter_warnings='ignore', timeout=None, sort_by="D"):
+    """Fits consecutive windows of values, warm starting each fit from the previous window.
+
+    Args:
+        rv_list (list): Random variables, or names of random variables in scipy.stats.
+        values (numpy.ndarray): The values in ascending (chronological) order.
+        bounds (list): A list of (start, end) positions of the windows in values.
+
+    Returns:
+        list: The best fit result of each window, or None if no random variable can be fitted.
+    """
+    rv_list = [getattr(stats(), rv) if isinstance(rv, str) else rv for rv in rv_list]
+    previous = {}
+    results = []
+    for start, end in bounds:
+        samples = values[start:end]
+        fits = []
+        for rv in rv_list:
+            fit = _fit(rv, samples, filter_warnings, timeout, start=previous.get(rv.name))
+            if fit is None and rv.name in previous:
+                # Fits from scratch if the warm start fails.
+                fit = _fit(rv, samples, filter_warnings, timeout)
+            if fit is not None:
+                previous[rv.name] = fit["parameters"]
+                fits.append(fit)
+        results.append(rank_fits(fits, sort_by)[0] if fits else None)
+    return results
+
+
+def fit_rolling(data, window, step=1, column="close", expanding=False, rv_list=None, filter_warnings='ignore',
+                max_workers=None, timeout=None, sort_by="D"):
+    """Fits the values in rolling (or expanding) windows of a time series to random variables.
+    The best fit of each window is reported, producing a time series of the best fit distributions.
+
+    Each fit is warm started from the parameters fitted to the previous window.
+    With max_workers > 1, the windows are divided into consecutive chunks fitted in parallel processes,
+        and the first window of each chunk is fitted from scratch.
+    For families with ill-conditioned likelihoods (e.g. lognorm with a free loc),
+        a warm start may converge to a slightly different optimum than a fit from scratch,
+        so the results with different max_workers may differ slightly.
+
+    Args:
+        data (pandas.Series or pandas.DataFrame): A time series in reverse order, e.g. an IndicatorSeries,
+            or a data frame (e.g. DataSeries) with the values in column.
+            Missing values (NaN) are dropped.
+        window (int): Number of values in each window.
+            For expanding windows, this is the number of values in the first window.
+        step (int, optional): Number of values between the ends of consecutive windows. Defaults to 1.
+        column (str, optional): The column of the values if data is a data frame. Defaults to "close".
+        expanding (bool, optional): Use expanding windows starting from the earliest value. Defaults to False.
+        rv_list (list, optional): A list of candidate random variables.
+            Defaults to None, i.e. the list returned by fit_test_continuous_rv().
+        filter_warnings (str, optional): How to handle scipy warnings. Defaults to 'ignore'.
+        max_workers (int, optional): Number of processes for fitting in parallel. Defaults to None.
+        timeout (float, optional): Max number of seconds for each fit. Defaults to None.
+        sort_by (str, optional): The criterion for selecting the best fit. Defaults to "D".
+
+    Returns:
+        pandas.DataFrame: A data frame indexed by the time of the latest value in each window (in reverse order),
+            with columns name, parameters, D, p_value, AD, CvM, AIC and BIC of the best fit.
+    """
+    if rv_list is None:
+        rv_list = fit_test_continuous_rv()
+    if hasattr(data, "columns"):
+        data = data[column]
+    data = data.dropna()[::-1]
+    values = data.to_numpy(dtype=float)
+    ends = list(range(window, len(values) + 1, step))
+    bounds = [(0 if expanding else end - window, end) for end in ends]
+    if max_workers is None or max_workers <= 1 or len(bounds) <= 1:
+        results = _fit_windows(rv_list, values, bounds, filter_warnings, timeout, sort_by)
+    else:
+        tasks = [rv.name if getattr(stats(), rv.name, None) is rv else rv for rv in rv_list]
+        chunks = np.array_split(np.arange(len(bounds)), max_workers)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for chunk in chunks:
+                if len(chunk) == 0:
                     continue
-                parameters = rv.fit(samples)
-                d, p = scipy.stats.kstest(samples, lambda x: rv.cdf(x, *parameters))
-                fits.append({
-                    "name": rv.name,
-                    "parameters": parameters,
-                    "D": d,
-                    "p_value": p
-                })
-        except:
-            logger.debug("Cannot fit to %s" % rv.name)
-        counter += 1
-    fits = sorted(fits, key=lambda i : i.get("D"))
-    return fits
+                chunk_bounds = [bounds[i] for i in chunk]
+                # Only the values covered by the chunk are sent to the worker.
+                offset = chunk_bounds[0][0]
+                chunk_values = values[offset:chunk_bounds[-1][1]]
+                chunk_bounds = [(start - offset, end - offset) for start, end in chunk_bounds]
+                futures.append(executor.submit(
+                    _fit_windows, tasks, chunk_values, chunk_bounds, filter_warnings, timeout, sort_by
+                ))
+            results = [result for future in futures for result in future.result()]
+    columns = ["name", "parameters", "D", "p_value", "AD", "CvM", "AIC", "BIC"]
+    rows = [
+        {key: result.get(key) for key in columns} if result is not None else {}
+        for result in results
+    ]
+    return pd.DataFrame(rows, index=data.index[[end - 1 for end in ends]], columns=columns)[::-1]
+
+
+def fit_expanding(data, min_periods, step=1, **kwargs):
+    """Fits the values in expanding windows of a time series to random variables, see fit_rolling().
+
+    Args:
+        data (pandas.Series or pandas.DataFrame): A time series in reverse order.
+        min_periods (int): Number of values in the first window.
+        step (int, optional): Number of values between the ends of consecutive windows. Defaults to 1.
+
+    Returns:
+        pandas.DataFrame: The best fit of each window, see fit_rolling().
+    """
+    return fit_rolling(data, min_periods, step, expanding=True, **kwargs)
+
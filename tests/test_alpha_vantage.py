@@ -0,0 +1,190 @@
+"""Contains tests for the alpha_vantage module.
+The tests use a local HTTP server as a stub of the AlphaVantage API.
+"""
+import time
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs
+from requests.exceptions import RequestException
+from virgo_stock.alpha_vantage import AlphaVantageAPI, TokenBucket, DailyLimitExceeded
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Responds CSV data with the length of the symbol in the query string as the close price.
+    Responds a rate limit note if the API key starts with "exhausted".
+    Responds an error message if the symbol is "INVALID".
+    """
+    # Number of requests being processed and the max of it.
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+    delay = 0.2
+    # Keeps the connections alive.
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        cls = StubHandler
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        query = parse_qs(urlparse(self.path).query)
+        symbol = query.get("symbol", [""])[0]
+        time.sleep(cls.delay)
+        if symbol == "INVALID":
+            content_type = "application/json"
+            body = '{"Error Message": "Invalid API call. Please retry or visit the documentation."}'
+        elif query.get("function", [""])[0] == "TIME_SERIES_INTRADAY":
+            content_type = "application/x-download"
+            body = "timestamp,open,high,low,close,volume\n" + "".join([
+                "2019-01-02 %02d:%02d:00,1,2,0.5,1.5,100\n" % (15 - i // 60, 59 - i % 60) for i in range(390)
+            ])
+        elif query.get("apikey", [""])[0].startswith("exhausted"):
+            content_type = "application/json"
+            body = '{"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}'
+        else:
+            content_type = "application/x-download"
+            body = "timestamp,open,high,low,close,volume\n2019-01-02,1,2,0.5,%s,100\n" % len(symbol)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+        with cls.lock:
+            cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class TestAlphaVantageAPI(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubServer(("127.0.0.1", 0), StubHandler)
+        cls.base_url = "http://127.0.0.1:%s/query" % cls.server.server_address[1]
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(2, 0.5)
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        # The 3rd and 4th acquisitions wait for the tokens to be returned.
+        self.assertGreaterEqual(time.monotonic() - start, 0.5)
+        self.assertEqual(bucket.available(), 0)
+
+    def test_get_dataframes(self):
+        web_api = AlphaVantageAPI("stub_concurrent", base_url=self.base_url)
+        web_api.set_limit(100)
+        symbols = ["A", "BB", "CCC", "DDDD", "EEEEE", "FFFFFF", "GGGGGGG", "HHHHHHHH"]
+        StubHandler.max_active = 0
+        start = time.monotonic()
+        results = web_api.get_dataframes(symbols, max_workers=8, function="TIME_SERIES_DAILY_ADJUSTED")
+        elapsed = time.monotonic() - start
+        self.assertEqual(list(results.keys()), symbols)
+        for symbol, df in results.items():
+            self.assertEqual(df["close"][0], len(symbol))
+        self.assertGreater(StubHandler.max_active, 1)
+        self.assertLess(elapsed, StubHandler.delay * len(symbols))
+
+    def test_rate_limit(self):
+        web_api = AlphaVantageAPI("stub_limited", base_url=self.base_url)
+        web_api.set_limit(3)
+        AlphaVantageAPI.buckets["stub_limited"].period = 1
+        start = time.monotonic()
+        results = web_api.get_dataframes(["A", "B", "C", "D"], function="TIME_SERIES_DAILY_ADJUSTED")
+        self.assertEqual(len(results), 4)
+        # The 4th request waits for the 1st token to be returned.
+        self.assertGreaterEqual(time.monotonic() - start, 1)
+
+    def test_key_pool(self):
+        keys = ["stub_pool_1", "stub_pool_2"]
+        web_api = AlphaVantageAPI(keys, base_url=self.base_url)
+        web_api.set_limit(2)
+        start = time.monotonic()
+        results = web_api.get_dataframes(["A", "B", "C", "D"], function="TIME_SERIES_DAILY_ADJUSTED")
+        self.assertEqual(len(results), 4)
+        # The requests are distributed to both keys without waiting.
+        self.assertLess(time.monotonic() - start, 5)
+        for key in keys:
+            self.assertEqual(len(AlphaVantageAPI.histories[key]), 2)
+            self.assertEqual(AlphaVantageAPI.bucket(key).available(), 0)
+            self.assertEqual(AlphaVantageAPI.daily_bucket(key).available(), 498)
+
+    def test_key_failover(self):
+        web_api = AlphaVantageAPI(["exhausted_key", "stub_failover"], base_url=self.base_url)
+        web_api.set_limit(10)
+        df = web_api.get_dataframe(symbol="AAPL", function="TIME_SERIES_DAILY_ADJUSTED")
+        self.assertEqual(df["close"][0], 4)
+        # The exhausted key will not be used in the current minute.
+        self.assertEqual(AlphaVantageAPI.bucket("exhausted_key").available(), 0)
+        self.assertEqual(len(AlphaVantageAPI.histories["exhausted_key"]), 1)
+
+    def test_daily_limit(self):
+        web_api = AlphaVantageAPI("stub_daily", base_url=self.base_url)
+        web_api.set_limit(10, daily_limit=1)
+        web_api.get_dataframe(symbol="AAPL", function="TIME_SERIES_DAILY_ADJUSTED")
+        start = time.monotonic()
+        with self.assertRaises(DailyLimitExceeded):
+            web_api.get_dataframe(symbol="AAPL", function="TIME_SERIES_DAILY_ADJUSTED")
+        # The request is not retried.
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_session_reuse(self):
+        web_api = AlphaVantageAPI("stub_session", base_url=self.base_url)
+        web_api.set_limit(10)
+        for symbol in ["A", "B", "C"]:
+            web_api.get_dataframe(symbol=symbol, function="TIME_SERIES_DAILY_ADJUSTED")
+        latency = web_api.latency()
+        self.assertEqual(latency["requests"], 3)
+        # The connection is established once and re-used by the following requests.
+        self.assertEqual(latency["new_connections"], 1)
+        self.assertGreater(latency["wait"], 0)
+
+    def test_concurrent_connect_time(self):
+        web_api = AlphaVantageAPI("stub_connect", base_url=self.base_url)
+        web_api.set_limit(10)
+        web_api.get_dataframes(["A", "BB", "CCC", "DDDD"], max_workers=4, function="TIME_SERIES_DAILY_ADJUSTED")
+        web_api.get_dataframes(["A", "BB"], max_workers=2, function="TIME_SERIES_DAILY_ADJUSTED")
+        pools = web_api.session.get_adapter(self.base_url).poolmanager.pools
+        connections = sum(pools.get(key).num_connections for key in pools.keys())
+        # Connections established by other threads are not counted for a request.
+        latency = web_api.latency()
+        self.assertEqual(latency["requests"], 6)
+        self.assertEqual(latency["new_connections"], connections)
+        self.assertGreater(latency["connect"], 0)
+        for metric in web_api.metrics:
+            self.assertEqual(metric["connect"] > 0, metric["new_connection"])
+
+    def test_streaming_dataframe(self):
+        web_api = AlphaVantageAPI("stub_streaming", base_url=self.base_url)
+        web_api.set_limit(10)
+        df = web_api.get_dataframe(symbol="AAPL", function="TIME_SERIES_INTRADAY", interval="1min")
+        self.assertEqual(len(df), 390)
+        self.assertEqual(str(df["timestamp"].dtype)[:10], "datetime64")
+        self.assertEqual(str(df["timestamp"][0]), "2019-01-02 15:59:00")
+        with self.assertRaises(ValueError):
+            web_api.get_dataframe(symbol="INVALID", function="TIME_SERIES_DAILY_ADJUSTED")
+
+    def test_stream_closed_on_error(self):
+        class ErrorResponse:
+            status_code = 500
+            closed = False
+
+            def close(self):
+                self.closed = True
+        response = ErrorResponse()
+        with self.assertRaises(RequestException):
+            AlphaVantageAPI._AlphaVantageAPI__check_stream(response)
+        # The connection is released before the request is retried.
+        self.assertTrue(response.closed)
@@ -1,18 +1,21 @@
 """Contains tests for the source module.
 """
 import datetime
+import io
 import unittest
 import logging
+import numpy as np
 import pandas as pd
 
 import os
 import sys
 import time
 import shutil
+import tempfile
 from tests.base import TestWithAlphaVantage
 from Aries.storage import StorageFolder
 from virgo_stock.alpha_vantage import AlphaVantageAPI
-from virgo_stock.source import DataSourceInterface, AlphaVantage
+from virgo_stock.source import DataSourceInterface, AlphaVantage, CacheIndex, NumpySerializer
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +27,12 @@ class TestDataSource(TestWithAlphaVantage):
         if os.path.exists(self.cache):
             shutil.rmtree(self.cache)
 
+    def cache_file_names(self):
+        """Lists the cache files, excluding the index file.
+        """
+        file_names = [os.path.basename(f) for f in StorageFolder(self.cache).file_names]
+        return [f for f in file_names if f != CacheIndex.filename]
+
     def assert_data_frame(self, df):
         self.assertIsNotNone(df)
         self.assertEqual(len(df.columns), 8, df.columns)
@@ -49,14 +58,181 @@ class TestDataSource(TestWithAlphaVantage):
         data_source = AlphaVantage(self.api_key, cache_folder=self.cache)
         df1 = data_source.get_daily_series("AAPL")
         self.assert_data_frame(df1)
-        filenames = StorageFolder(self.cache).file_names
+        filenames = self.cache_file_names()
         self.assertEqual(len(filenames), 1, "Files: %s" % filenames)
         # Get data again, cached data should be returned.
         df2 = data_source.get_daily_series("AAPL")
         self.assert_data_frame(df1)
         self.assertEqual(len(df1), len(df2))
-        filenames = StorageFolder(self.cache).file_names
+        filenames = self.cache_file_names()
         self.assertEqual(len(filenames), 1, "Files: %s" % filenames)
+        # The index contains the cache file.
+        index = CacheIndex(self.cache, [AlphaVantage.daily_series_type])
+        self.assertEqual(list(index.files("AAPL", AlphaVantage.daily_series_type).keys()), filenames)
+
+
+class TestSerializers(unittest.TestCase):
+    def test_numpy_round_trip(self):
+        df = pd.DataFrame({
+            "timestamp": pd.date_range("2020-01-01", periods=3),
+            "close": [1.0, np.nan, 3.0],
+            "note": ["a", np.nan, "c"],
+        })
+        serializer = NumpySerializer()
+        f = io.BytesIO()
+        serializer.dump(df, f)
+        f.seek(0)
+        loaded = serializer.load(f)
+        self.assertEqual(list(loaded.columns), list(df.columns))
+        self.assertTrue(np.isnan(loaded["close"][1]))
+        # Missing values in object columns are not loaded as the string "nan".
+        self.assertEqual(loaded["note"].isna().tolist(), [False, True, False])
+        self.assertEqual(loaded["note"][2], "c")
+        self.assertEqual(loaded["timestamp"].tolist(), df["timestamp"].tolist())
+
+
+class TestCacheIndex(unittest.TestCase):
+    series_type = AlphaVantage.daily_series_type
+
+    def setUp(self):
+        self.cache = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache)
+
+    def file_name(self, symbol, date="2020-01-02"):
+        return "%s_%s_%s.npz" % (symbol, self.series_type, date)
+
+    def test_shared_folder(self):
+        index_a = CacheIndex(self.cache, [self.series_type])
+        index_b = CacheIndex(self.cache, [self.series_type])
+        self.assertEqual(index_a.data, {})
+        self.assertEqual(index_b.data, {})
+        index_a.add(self.file_name("AAPL"))
+        index_b.add(self.file_name("MSFT"))
+        with index_b.batch():
+            index_b.add(self.file_name("AAPL", "2020-01-03"))
+            index_b.remove(self.file_name("AAPL"))
+        # The changes of both instances are kept in the index file.
+        index = CacheIndex(self.cache, [self.series_type])
+        self.assertEqual(list(index.files("AAPL", self.series_type)), [self.file_name("AAPL", "2020-01-03")])
+        self.assertEqual(list(index.files("MSFT", self.series_type)), [self.file_name("MSFT")])
+        # The index is reloaded when the index file is saved by others.
+        self.assertEqual(list(index_a.files("MSFT", self.series_type)), [self.file_name("MSFT")])
+        self.assertEqual(list(index_a.files("AAPL", self.series_type)), [self.file_name("AAPL", "2020-01-03")])
+
+    def test_deleted_cache_file(self):
+        requests = []
+
+        def request_data(symbol, series_type, output_size, **kwargs):
+            requests.append(symbol)
+            return pd.DataFrame({
+                "timestamp": pd.date_range("2020-01-01", periods=3)[::-1],
+                "close": [3.0, 2.0, 1.0],
+            })
+        data_source = AlphaVantage("stub", cache_folder=self.cache)
+        data_source._AlphaVantage__request_data = request_data
+        self.assertEqual(len(data_source.get_daily_series("AAPL")), 3)
+        self.assertEqual(len(data_source.get_daily_series("AAPL")), 3)
+        self.assertEqual(len(requests), 1)
+        # Delete the cache file without updating the index.
+        file_names = list(data_source.index.files("AAPL", self.series_type))
+        self.assertEqual(len(file_names), 1)
+        os.remove(os.path.join(self.cache, file_names[0]))
+        # The data is requested again.
+        self.assertEqual(len(data_source.get_daily_series("AAPL")), 3)
+        self.assertEqual(len(requests), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.cache, file_names[0])))
+
+
+class TestDailyCache(unittest.TestCase):
+    series_type = AlphaVantage.daily_series_type
+
+    def setUp(self):
+        self.cache = tempfile.mkdtemp()
+        self.requests = []
+
+    def tearDown(self):
+        shutil.rmtree(self.cache)
+
+    def file_name(self, date, extension=".npz"):
+        return "AAPL_%s_%s%s" % (self.series_type, date, extension)
+
+    def cache_file_names(self):
+        return sorted(f for f in os.listdir(self.cache) if f.endswith((".npz", ".csv")))
+
+    def write_cache_file(self, df, date):
+        with open(os.path.join(self.cache, self.file_name(date)), "wb") as f:
+            NumpySerializer().dump(df, f)
+
+    def data_source(self, response=None):
+        def request_data(symbol, series_type, output_size, **kwargs):
+            self.requests.append(symbol)
+            return response.copy()
+        data_source = AlphaVantage("stub", cache_folder=self.cache)
+        data_source._AlphaVantage__request_data = request_data
+        return data_source
+
+    @staticmethod
+    def daily_data(dates, close):
+        return pd.DataFrame({"timestamp": pd.to_datetime(dates), "close": close})
+
+    def test_merge_daily_cache(self):
+        # Legacy cache files with overlapping dates, the latest file takes precedence.
+        self.write_cache_file(self.daily_data(["2020-01-03", "2020-01-02", "2020-01-01"], [13.0, 12.0, 11.0]),
+                              "2020-01-03")
+        self.write_cache_file(self.daily_data(["2020-01-02", "2020-01-01", "2019-12-31"], [102.0, 101.0, 100.0]),
+                              "2020-01-02")
+        # The response overlaps the cached data, with rows newer and older than the cached data.
+        response = self.daily_data(["2020-01-05", "2020-01-04", "2020-01-03", "2019-12-30"], [25.0, 24.0, 23.0, 20.0])
+        df = self.data_source(response).get_daily_series("AAPL")
+        self.assertEqual(len(self.requests), 1)
+        expected = self.daily_data(
+            ["2020-01-05", "2020-01-04", "2020-01-03", "2020-01-02", "2020-01-01", "2019-12-31", "2019-12-30"],
+            [25.0, 24.0, 13.0, 12.0, 11.0, 100.0, 20.0]
+        ).set_index("timestamp")
+        pd.testing.assert_frame_equal(df, expected)
+        # The legacy files are replaced by one merged file.
+        today = self.file_name(datetime.datetime.now().strftime(AlphaVantage.date_fmt))
+        self.assertEqual(self.cache_file_names(), [today])
+        data_source = self.data_source(response)
+        self.assertEqual(list(data_source.index.files("AAPL", self.series_type)), [today])
+        pd.testing.assert_frame_equal(data_source.get_daily_series("AAPL"), expected)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_migrate_csv_cache(self):
+        today = datetime.datetime.now().strftime(AlphaVantage.date_fmt)
+        df = pd.DataFrame({
+            "timestamp": pd.to_datetime(["2020-01-03", "2020-01-02", "2020-01-01"]),
+            "close": [3.0, np.nan, 1.0],
+            "note": ["a", np.nan, "c"],
+        })
+        # CSV cache file saved by previous versions.
+        df.to_csv(os.path.join(self.cache, self.file_name(today, ".csv")))
+        data_source = self.data_source()
+        self.assertEqual(list(data_source.index.files("AAPL", self.series_type)), [self.file_name(today, ".csv")])
+        expected = df.set_index("timestamp")
+        pd.testing.assert_frame_equal(data_source.get_daily_series("AAPL"), expected)
+        self.assertEqual(self.requests, [])
+        # The CSV file is replaced by a NumPy file.
+        self.assertEqual(self.cache_file_names(), [self.file_name(today)])
+        self.assertEqual(list(data_source.index.files("AAPL", self.series_type)), [self.file_name(today)])
+        # The migrated file is read without changes.
+        pd.testing.assert_frame_equal(self.data_source().get_daily_series("AAPL"), expected)
+        self.assertEqual(self.requests, [])
+
+    def test_merge_deleted_cache_file(self):
+        self.write_cache_file(self.daily_data(["2020-01-02", "2020-01-01"], [12.0, 11.0]), "2020-01-02")
+        self.write_cache_file(self.daily_data(["2019-12-31"], [100.0]), "2019-12-31")
+        data_source = self.data_source(self.daily_data(["2020-01-03", "2020-01-02"], [23.0, 22.0]))
+        self.assertEqual(len(data_source.index.files("AAPL", self.series_type)), 2)
+        # Delete a cache file without updating the index.
+        os.remove(os.path.join(self.cache, self.file_name("2019-12-31")))
+        df = data_source.get_daily_series("AAPL")
+        self.assertEqual(df["close"].tolist(), [23.0, 12.0, 11.0])
+        today = self.file_name(datetime.datetime.now().strftime(AlphaVantage.date_fmt))
+        self.assertEqual(self.cache_file_names(), [today])
+        self.assertEqual(list(data_source.index.files("AAPL", self.series_type)), [today])
 
 
 # class TestAlphaVantageAPI(TestWithAlphaVantage):
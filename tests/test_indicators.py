@@ -7,8 +7,8 @@ import unittest
 import pandas as pd
 import numpy as np
 from tests.base import TestWithAlphaVantage
-from virgo_stock.stock import Stock
-from virgo_stock.indicators import IndicatorSeries, SMA, EMA
+from virgo_stock.stock import Stock, DataSeries
+from virgo_stock.indicators import IndicatorSeries, SMA, EMA, IndicatorCache, RSI, MACD, ATR, Stochastic, OBV, VWAP
 
 
 class TestIndicatorSeries(TestWithAlphaVantage):
@@ -23,6 +23,48 @@ class TestIndicatorSeries(TestWithAlphaVantage):
         self.assertIn(2, series.local_minimums().tolist())
         self.assertIn(3, series.local_maximums().tolist())
 
+    def test_series_cross(self):
+        series_n = [3, 1, 1, 3, 3, 1]
+        series_k = [2, 2, 2, 2, 2, 2]
+        # Data is in reverse order, series_n breaks above series_k at 0 and 4, crosses below at 2.
+        self.assertEqual(IndicatorSeries.series_cross(series_n, series_k), [0, 4])
+        above, below = IndicatorSeries.cross_positions(series_n, series_k)
+        self.assertEqual(above.tolist(), [0, 4])
+        self.assertEqual(below.tolist(), [2])
+        self.assertEqual(IndicatorSeries.series_cross(series_k, series_n), [2])
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def test_indicator_cache(self):
+        cache = IndicatorCache()
+        df = DataSeries({"close": [3.0, 2.0, 1.0]}, index=pd.date_range("2020-01-01", periods=3)[::-1])
+        calls = []
+
+        def calculate():
+            calls.append(1)
+            return df["close"].to_numpy() * 2
+        value = cache.get(df, "SMA", (2, ), "close", calculate)
+        self.assertFalse(value.flags.writeable)
+        cache.get(df, "SMA", (2, ), "close", calculate)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # Modified values are re-calculated after invalidation.
+        df.loc[df.index[0], "close"] = 5.0
+        cache.invalidate(df)
+        value = cache.get(df, "SMA", (2, ), "close", calculate)
+        self.assertEqual(value[0], 10.0)
+        self.assertEqual(len(calls), 2)
+
+    def test_reassigned_column(self):
+        index = pd.date_range("2020-01-01", periods=4)[::-1]
+        for df in [pd.DataFrame({"close": [4.0, 3.0, 2.0, 1.0]}, index=index),
+                   DataSeries({"close": [4.0, 3.0, 2.0, 1.0]}, index=index)]:
+            self.assertEqual(SMA(df, 2).tolist()[:3], [3.5, 2.5, 1.5])
+            # Indicators are re-calculated after a column is replaced, without invalidation.
+            df["close"] = df["close"] * 2
+            self.assertEqual(SMA(df, 2).tolist()[:3], [7.0, 5.0, 3.0])
+            self.assertAlmostEqual(EMA(df, 2).tolist()[0], pd.Series([2.0, 4.0, 6.0, 8.0]).ewm(span=2).mean().iloc[-1])
+
 
 class TestMovingAverage(TestWithAlphaVantage):
     def assert_set_values_equal(self, expect_dates, actual_timestamps):
@@ -52,6 +94,9 @@ class TestMovingAverage(TestWithAlphaVantage):
         death_crosses = SMA.death_cross(daily_series)
         self.assert_set_values_equal(expect_golden_crosses, golden_crosses)
         self.assert_set_values_equal(expect_death_crosses, death_crosses)
+        crosses = SMA.crosses(daily_series, [(50, 200)])
+        self.assert_set_values_equal(expect_golden_crosses, crosses[(50, 200)]["golden_cross"])
+        self.assert_set_values_equal(expect_death_crosses, crosses[(50, 200)]["death_cross"])
 
     def test_ema(self):
         expect_golden_crosses = {
@@ -98,3 +143,55 @@ class TestBollinger(TestWithAlphaVantage):
             if row.isnull().sum() == 0:
                 self.assertGreater(row['BB_upper'], row['BB_sma'])
                 self.assertGreater(row['BB_sma'], row['BB_lower'])
+
+
+class TestOscillators(unittest.TestCase):
+    def setUp(self):
+        # Data in reverse order.
+        index = pd.date_range("2020-01-01", periods=6, name="timestamp")[::-1]
+        self.df = DataSeries({
+            "high": [15.0, 14.0, 13.0, 12.0, 11.0, 10.0],
+            "low": [13.0, 12.0, 11.0, 10.0, 9.0, 8.0],
+            "close": [14.0, 12.0, 12.0, 11.0, 10.0, 9.0],
+            "volume": [100, 200, 300, 400, 500, 600],
+        }, index=index)
+
+    def test_rsi(self):
+        rsi = RSI(self.df, 2)
+        self.assertEqual(rsi.name, "RSI_2")
+        # The price never drops.
+        self.assertEqual(rsi.iloc[0], 100)
+        self.assertTrue(np.isnan(rsi.iloc[-1]))
+
+    def test_wilder_rsi(self):
+        # Closes in ascending order: 1, 2, 1, 3, 2, 4
+        index = pd.date_range("2020-01-01", periods=6, name="timestamp")[::-1]
+        df = DataSeries({"close": [4.0, 2.0, 3.0, 1.0, 2.0, 1.0]}, index=index)
+        # The first averages are the simple means of the first 3 gains (1, 0, 2) and losses (0, 1, 0),
+        #   i.e. 1 and 1/3, then: gain = (2 * 1 + 0) / 3, loss = (2 * 1/3 + 1) / 3, and so on.
+        np.testing.assert_allclose(
+            RSI(df, 3), [75.0, 100.0 - 100.0 / 2.2, 75.0, np.nan, np.nan, np.nan], equal_nan=True
+        )
+
+    def test_macd(self):
+        macd = MACD(self.df, 2, 3, 2)
+        self.assertEqual(list(macd.columns), ["MACD", "MACD_signal", "MACD_hist"])
+        np.testing.assert_allclose(macd["MACD_hist"], macd["MACD"] - macd["MACD_signal"])
+
+    def test_atr(self):
+        atr = ATR(self.df, 2)
+        # The true range is 2 for the first data point, and 3 after the gap up on the latest data point.
+        self.assertAlmostEqual(atr.iloc[0], 2.5)
+
+    def test_stochastic(self):
+        stochastic = Stochastic(self.df, 3, 2)
+        # The latest close 14 is in the middle of the range from 11 to 15.
+        self.assertAlmostEqual(stochastic["STOCH_k"].iloc[0], 75)
+        self.assertEqual(stochastic["STOCH_d"].isna().sum(), 3)
+
+    def test_obv_and_vwap(self):
+        obv = OBV(self.df)
+        self.assertEqual(obv.tolist(), [1300, 1200, 1200, 900, 500, 0])
+        vwap = VWAP(self.df)
+        self.assertAlmostEqual(vwap.iloc[-1], 9.0)
+        np.testing.assert_allclose(VWAP(self.df, session="D"), [14.0, 38.0 / 3, 12.0, 11.0, 10.0, 9.0])
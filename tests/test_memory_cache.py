@@ -0,0 +1,66 @@
+"""Contains tests for the memory_cache module.
+"""
+import datetime
+import unittest
+import numpy as np
+import pandas as pd
+from virgo_stock.source import DataSourceInterface
+from virgo_stock.memory_cache import MemoryCache, CachedDataSource
+
+
+class CountingDataSource(DataSourceInterface):
+    """A data source generating daily data and counting the number of requests.
+    """
+    def __init__(self):
+        self.requests = 0
+
+    def get_daily_series(self, symbol, start=None, end=None):
+        self.requests += 1
+        index = pd.date_range("2015-01-01", "2016-12-31", freq="B", name="timestamp")[::-1]
+        return pd.DataFrame({
+            "open": np.arange(len(index), dtype=float),
+            "close": np.arange(len(index), dtype=float),
+        }, index=index)
+
+
+class TestMemoryCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        value = pd.DataFrame({"a": np.zeros(1000)})
+        size = MemoryCache.sizeof(value)
+        cache = MemoryCache(max_bytes=size * 2)
+        cache.put("a", value)
+        cache.put("b", value)
+        # Access "a" so that "b" becomes the least recently used.
+        self.assertIsNotNone(cache.get("a"))
+        cache.put("c", value)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.size, size * 2)
+
+    def test_expiration(self):
+        cache = MemoryCache()
+        cache.put("a", 1, ttl=datetime.timedelta(seconds=-1))
+        cache.put("b", 2)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+
+class TestCachedDataSource(unittest.TestCase):
+    def test_daily_series(self):
+        source = CountingDataSource()
+        data_source = CachedDataSource(source)
+        df = data_source.get_daily_series("AAPL", "2016-01-01", "2016-01-31")
+        self.assertEqual(len(df), 21)
+        self.assertEqual(str(df.index[0])[:10], "2016-01-29")
+        self.assertEqual(str(df.index[-1])[:10], "2016-01-01")
+        # The second query is served from memory.
+        df = data_source.get_daily_series("AAPL", "2015-06-01")
+        self.assertEqual(str(df.index[-1])[:10], "2015-06-01")
+        self.assertEqual(len(data_source.get_daily_series("AAPL")), len(source.get_daily_series("AAPL")))
+        self.assertEqual(source.requests, 2)
+        self.assertEqual(data_source.cache.hits, 2)
+        self.assertEqual(data_source.cache.misses, 1)
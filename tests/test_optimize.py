@@ -0,0 +1,67 @@
+"""Contains tests for the optimize module.
+"""
+import unittest
+import numpy as np
+import pandas as pd
+from virgo_stock.stock import DataSeries
+from virgo_stock.strategy import Strategy, GoldenCrossStrategy
+from virgo_stock.optimize import parameter_grid, split_windows, sweep, walk_forward
+
+
+def random_series(periods, seed):
+    rng = np.random.RandomState(seed)
+    index = pd.date_range("2000-01-01", periods=periods, freq="B", name="timestamp")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+    df = DataSeries({
+        "open": close,
+        "high": close * 1.01,
+        "low": close * 0.99,
+        "close": close,
+        "volume": rng.randint(100, 1000, periods),
+    }, index=index)
+    return df[::-1]
+
+
+class TestOptimize(unittest.TestCase):
+    def setUp(self):
+        self.frames = {"AAA": random_series(1500, 1), "BBB": random_series(1200, 2)}
+        self.grid = {"short_term": [10, 20], "long_term": [50, 100], "initial_cash": [5000]}
+
+    def test_parameter_grid(self):
+        self.assertEqual(len(parameter_grid(self.grid)), 4)
+        self.assertEqual(split_windows(10, 2), [(-9, -4), (-4, 1)])
+        self.assertEqual(split_windows(3, 3), [(-2, -1), (-1, 0), (0, 1)])
+        # Windows cannot be empty.
+        with self.assertRaises(ValueError):
+            split_windows(3, 5)
+
+    def test_sweep(self):
+        results = sweep(GoldenCrossStrategy, self.grid, self.frames, max_workers=2)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(sorted(results[results["name"] == "AAA"]["rank"].tolist()), [1, 2, 3, 4])
+        row = results.iloc[0]
+        strategy = GoldenCrossStrategy.from_parameters(
+            self.frames[row["name"]], row["short_term"], row["long_term"], row["initial_cash"]
+        )
+        self.assertAlmostEqual(strategy.evaluate(), row["profit"])
+
+    def test_walk_forward(self):
+        results = walk_forward(GoldenCrossStrategy, self.grid, self.frames, n_windows=2, max_workers=1)
+        self.assertEqual(len(results), 4)
+        self.assertIn("in_sample_profit", results.columns)
+        # The out-of-sample windows follow the in-sample windows.
+        windows = split_windows(len(self.frames["AAA"]), 3)
+        aaa = results[results["name"] == "AAA"]
+        self.assertEqual(list(zip(aaa["from_t"], aaa["to_t"])), windows[1:])
+
+    def test_walk_forward_parameters(self):
+        # Parameters are matched by position, including values not equal in pandas.
+        grid = {"initial_cash": [5000], "label": [None, np.nan, "a"]}
+        results = walk_forward(Strategy, grid, {"AAA": random_series(30, 1)}, n_windows=2, max_workers=1)
+        self.assertEqual(len(results), 2)
+        with self.assertRaises(ValueError):
+            walk_forward(Strategy, grid, {"AAA": random_series(2, 1)}, n_windows=2, max_workers=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Contains tests for the pattern module.
+"""
+import unittest
+import pandas as pd
+from virgo_stock import pattern
+from virgo_stock.universe import StockUniverse
+
+
+class TestPattern(unittest.TestCase):
+    def setUp(self):
+        # Data in reverse order.
+        index = pd.date_range("2020-01-01", periods=4, name="timestamp")[::-1]
+        self.df = pd.DataFrame({
+            "open": [9.0, 10.5, 10.2, 10.0],
+            "high": [9.2, 10.8, 10.6, 10.5],
+            "low": [8.0, 10.1, 9.9, 9.8],
+            "close": [9.1, 10.2, 10.4, 10.3],
+            "volume": [100, 100, 100, 100],
+        }, index=index)
+
+    def test_find_pattern(self):
+        def drop_more_than_five_percent(df, i):
+            if i + 1 >= len(df):
+                return False
+            prev = df.iloc[i + 1]['close']
+            return (prev - df.iloc[i]['low']) / prev > 0.05
+        self.assertEqual(pattern.find_pattern(self.df, drop_more_than_five_percent), [0])
+        self.assertEqual(pattern.find_pattern(self.df, pattern.drop_more_than_five_percent), [0])
+        self.assertTrue(pattern.drop_more_than_five_percent(self.df, 0))
+
+    def test_row_calls(self):
+        calls = []
+
+        def expression(data):
+            calls.append(1)
+            return data["low"] > pattern.previous(data["high"])
+        gap_up = pattern.Pattern("gap_up", expression)
+        expected = gap_up.evaluate(self.df).tolist()
+        self.assertEqual([gap_up(self.df, i) for i in range(len(self.df))], expected)
+        # The pattern is evaluated once for the row calls.
+        self.assertEqual(len(calls), 2)
+
+    def test_row_calls_after_modification(self):
+        df = pd.DataFrame({"low": [9.9, 10.0], "close": [10.0, 10.0]})
+        self.assertFalse(pattern.drop_more_than_five_percent(df, 0))
+        # The pattern is evaluated again after a column is replaced.
+        df["low"] = [1.0, 10.0]
+        self.assertTrue(pattern.drop_more_than_five_percent(df, 0))
+
+    def test_scan(self):
+        results = pattern.scan(self.df)
+        self.assertEqual(results["gap_down"].tolist(), [True, False, False, False])
+        self.assertEqual(results["inside_bar"].tolist(), [False, False, False, False])
+        self.assertEqual(results["bearish_engulfing"].tolist(), [False, True, False, False])
+        universe = StockUniverse.from_frames({"AAA": self.df, "BBB": self.df})
+        panels = pattern.scan(universe, [pattern.gap_down])
+        self.assertEqual(panels["gap_down"]["BBB"].tolist(), [True, False, False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
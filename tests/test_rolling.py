@@ -0,0 +1,52 @@
+"""Contains tests for the rolling module.
+"""
+import unittest
+import numpy as np
+import pandas as pd
+from virgo_stock import rolling
+from virgo_stock.stock import DataSeries
+
+
+class TestRolling(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        index = pd.date_range("2019-01-01", periods=300, freq="B", name="timestamp")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))
+        # Data in reverse order.
+        self.df = DataSeries({"close": close}, index=index)[::-1]
+
+    def test_ascending(self):
+        values = self.df.ascending("close")
+        self.assertTrue(np.shares_memory(values, self.df["close"].to_numpy()))
+        self.assertEqual(values[0], self.df["close"].iloc[-1])
+
+    def test_window_functions(self):
+        series = self.df["close"]
+        values = self.df.ascending("close")
+        np.testing.assert_allclose(
+            rolling.rolling_mean(values, 20)[::-1],
+            series[::-1].rolling(20).mean()[::-1].to_numpy()
+        )
+        np.testing.assert_allclose(
+            rolling.rolling_std(values, 20)[::-1],
+            series[::-1].rolling(20).std()[::-1].to_numpy()
+        )
+        np.testing.assert_allclose(
+            rolling.ewm_mean(values, 20)[::-1],
+            series[::-1].ewm(span=20).mean()[::-1].to_numpy()
+        )
+        # 2-D arrays are calculated by columns.
+        matrix = np.stack([values, values * 2], axis=1)
+        np.testing.assert_allclose(rolling.rolling_mean(matrix, 5)[:, 1], rolling.rolling_mean(values * 2, 5))
+
+    def test_wilder_mean(self):
+        values = np.array([1.0, 0.0, 2.0, 0.0, 2.0])
+        # Seeded with the simple mean of the first 3 values, then average += (value - average) / 3.
+        np.testing.assert_allclose(
+            rolling.wilder_mean(values, 3), [np.nan, np.nan, 1.0, 2.0 / 3, 10.0 / 9], equal_nan=True
+        )
+        self.assertTrue(np.isnan(rolling.wilder_mean(values[:2], 3)).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Contains tests for the statistics.rv module.
+"""
+import unittest
+import numpy as np
+import pandas as pd
+import scipy.stats
+from statistics import rv
+
+
+class TestFitDistributions(unittest.TestCase):
+    def setUp(self):
+        self.samples = scipy.stats.norm.rvs(1, 2, size=2000, random_state=0)
+        rv.fit_cache.clear()
+
+    def test_fit_distributions(self):
+        fits = rv.fit_distributions(self.samples, cache=False)
+        self.assertEqual(fits[0]["name"], "norm")
+        np.testing.assert_allclose(fits[0]["parameters"], [1, 2], atol=0.1)
+        # Fitting in parallel produces the same results.
+        parallel_fits = rv.fit_distributions(self.samples, max_workers=2, cache=False)
+        self.assertEqual([fit["name"] for fit in parallel_fits], [fit["name"] for fit in fits])
+
+    def test_screening_and_cache(self):
+        fits = rv.fit_distributions(self.samples, subsample=200, abandon_ratio=1.5)
+        self.assertEqual(fits[0]["name"], "norm")
+        self.assertLess(len(fits), len(rv.fit_test_continuous_rv()))
+        self.assertEqual(len(rv.fit_cache.entries), len(fits))
+        cached = rv.fit_distributions(self.samples, [scipy.stats.norm])[0]
+        self.assertEqual(cached["parameters"], fits[0]["parameters"])
+        self.assertEqual(cached["D"], fits[0]["D"])
+
+    def test_goodness_of_fit(self):
+        parameters = scipy.stats.norm.fit(self.samples)
+        statistics = rv.goodness_of_fit(scipy.stats.norm, np.sort(self.samples), parameters)
+        ks = scipy.stats.kstest(self.samples, scipy.stats.norm.cdf, args=parameters)
+        self.assertAlmostEqual(statistics["D"], ks.statistic)
+        self.assertAlmostEqual(statistics["p_value"], ks.pvalue)
+        cvm = scipy.stats.cramervonmises(self.samples, scipy.stats.norm.cdf, args=parameters)
+        self.assertAlmostEqual(statistics["CvM"], cvm.statistic)
+        self.assertAlmostEqual(statistics["AIC"], 4 - 2 * np.sum(scipy.stats.norm.logpdf(self.samples, *parameters)))
+        fits = rv.fit_distributions(self.samples, sort_by="mean_rank")
+        self.assertEqual(fits[0]["name"], "norm")
+        self.assertEqual(fits[0]["AIC_rank"], 1)
+
+    def test_fit_rolling(self):
+        index = pd.date_range("2020-01-01", periods=600, name="timestamp")[::-1]
+        series = pd.Series(self.samples[:600], index=index)
+        rv_list = [scipy.stats.norm, scipy.stats.uniform]
+        fits = rv.fit_rolling(series, 200, step=100, rv_list=rv_list)
+        # Windows end at the 200th, 300th, ..., 600th value, in reverse order.
+        self.assertEqual(list(fits.index), list(index[[0, 100, 200, 300, 400]]))
+        self.assertTrue((fits["name"] == "norm").all())
+        expected = rv._fit(scipy.stats.norm, self.samples[200:400])
+        np.testing.assert_allclose(fits.loc[index[200], "parameters"], expected["parameters"], rtol=1e-3)
+        parallel_fits = rv.fit_rolling(series, 200, step=100, rv_list=rv_list, max_workers=2)
+        np.testing.assert_allclose(parallel_fits["D"], fits["D"], rtol=1e-3)
+        expanding = rv.fit_expanding(pd.DataFrame({"close": series}), 300, step=300, rv_list=rv_list)
+        self.assertEqual(len(expanding), 2)
+        expected = rv._fit(scipy.stats.norm, self.samples[:600])
+        self.assertAlmostEqual(expanding["D"].iloc[0], expected["D"], places=3)
+
+
+class TestRegistry(unittest.TestCase):
+    def test_registry(self):
+        registry = rv.registry()
+        self.assertIs(rv.registry(), registry)
+        self.assertEqual(registry["norm"].n_parameters, 2)
+        self.assertEqual(registry["gamma"].n_parameters, 3)
+        self.assertTrue(registry["poisson"].discrete)
+        self.assertIn(scipy.stats.norm, rv.continuous_rvs())
+        self.assertIn(scipy.stats.poisson, rv.discrete_rvs())
+
+    def test_candidates(self):
+        signed = [-0.02, 0.01, 0.03]
+        names = [candidate.name for candidate in rv.candidates(signed)]
+        self.assertIn("norm", names)
+        # Positive-only random variables cannot fit negative samples.
+        self.assertNotIn("lognorm", names)
+        self.assertIn("lognorm", [candidate.name for candidate in rv.candidates([0.02, 0.01, 0.03])])
+        # Bounded supports are moved by loc and scale.
+        uniform = scipy.stats.uniform(-0.05, 0.1).rvs(size=100, random_state=1)
+        names = [candidate.name for candidate in rv.candidates(uniform)]
+        self.assertIn("uniform", names)
+        self.assertIn("triang", names)
+        fast = rv.candidates(signed, max_fit_cost="fast")
+        self.assertTrue(set(fast).issubset(set(rv.candidates(signed))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,15 @@
 """
 import datetime
 import unittest
+import numpy as np
 import pandas as pd
 
 import os
 import sys
 from tests.base import TestWithAlphaVantage
 from virgo_stock import sp500, plotly
+from virgo_stock.source import DataSourceInterface
+from virgo_stock.stock import Stock
 
 
 class TestDataSource(TestWithAlphaVantage):
@@ -54,6 +57,19 @@ class TestDataSource(TestWithAlphaVantage):
         actual_df = stock.monthly_series("2015-01-01", "2017-01-01")
         self.assert_data_frame_index(actual_df, expect_df)
 
+    def test_quarterly_series(self):
+        """Tests if the quarterly series is consistent with the monthly series.
+        """
+        stock = self.get_stock("AAPL")
+        monthly = stock.monthly_series("2015-01-01", "2017-01-01")
+        quarterly = stock.quarterly_series("2015-01-01", "2017-01-01")
+        self.assertEqual(len(quarterly), 8)
+        # Aggregates every 3 months into one quarter.
+        expect_df = stock.aggregate(monthly, 3)
+        self.assert_data_frame_index(quarterly, expect_df)
+        for column in ["open", "high", "low", "close", "volume"]:
+            self.assertEqual(quarterly[column].tolist(), expect_df[column].tolist())
+
     def test_download_sp500(self):
         symbol_list = sp500.download_symbols()
         self.assertGreaterEqual(len(symbol_list), 500)
@@ -64,3 +80,50 @@ class TestDataSource(TestWithAlphaVantage):
         stock = self.get_stock("AAPL")
         daily_data = stock.daily_series("2015-01-01", "2017-01-01")
         html = plotly.Candlestick(daily_data).to_html()
+
+
+class CountingDataSource(DataSourceInterface):
+    """A data source generating daily data and counting the number of requests.
+    """
+    def __init__(self):
+        self.requests = 0
+
+    def get_daily_series(self, symbol, start=None, end=None):
+        self.requests += 1
+        index = pd.date_range("2015-01-01", "2016-12-31", freq="B", name="timestamp")[::-1]
+        values = np.arange(len(index), dtype=float)[::-1]
+        df = pd.DataFrame({
+            "open": values,
+            "high": values + 1,
+            "low": values - 1,
+            "close": values + 0.5,
+            "volume": np.ones(len(index)),
+        }, index=index)
+        return df[(df.index >= (start or "1800-01-01")) & (df.index <= (end or "2100-01-01"))]
+
+
+class TestCachedStock(unittest.TestCase):
+    def test_daily_series(self):
+        source = CountingDataSource()
+        stock = Stock("AAPL", source)
+        df = stock.daily_series("2016-01-01", "2016-01-31")
+        self.assertEqual(len(df), 21)
+        self.assertEqual(str(df.index[0])[:10], "2016-01-29")
+        self.assertEqual(str(df.index[-1])[:10], "2016-01-01")
+        self.assertEqual(len(stock.daily_series("2015-06-01", "2015-06-30")), 22)
+        self.assertEqual(source.requests, 1)
+        stock.refresh()
+        stock.daily_series()
+        self.assertEqual(source.requests, 2)
+
+    def test_aggregate_series(self):
+        source = CountingDataSource()
+        stock = Stock("AAPL", source)
+        for rule in ["W", "M", "Q", 5]:
+            for start, end in [("2015-03-04", "2016-08-10"), ("2015-03-04", "2015-03-05"), ("2015-05-10", "2015-07-02")]:
+                expect_df = Stock.aggregate(source.get_daily_series("AAPL", start, end), rule)
+                actual_df = stock.aggregate_series(rule, start, end)
+                pd.testing.assert_frame_equal(pd.DataFrame(actual_df), pd.DataFrame(expect_df), check_freq=False)
+        # One request for each expected data frame, and one for the stock.
+        self.assertEqual(source.requests, 13)
+
@@ -8,7 +8,7 @@ import os
 import sys
 from tests.base import TestWithAlphaVantage
 from virgo_stock.stock import Stock
-from virgo_stock.strategy import Strategy, GoldenCrossStrategy
+from virgo_stock.strategy import Strategy, GoldenCrossStrategy, Ledger, Bar, TradingHistory
 from virgo_stock.indicators import SMA
 
 
@@ -36,3 +36,124 @@ class TestStrategy(TestWithAlphaVantage):
         self.assertEqual(len(strategy.trading_history), 8)
         self.assertEqual(round(strategy.value()), 8796)
         self.assertEqual(round(strategy.profit()), 3796)
+
+    def test_backtest(self):
+        """Tests if the vectorized backtest produces the same results as evaluate().
+        """
+        stock = Stock("AAPL", self.data_source)
+        df = stock.daily_series("2003-01-01", "2013-01-01")
+        golden_crosses = SMA.golden_cross(df)
+        death_crosses = SMA.death_cross(df)
+        strategy = GoldenCrossStrategy(df, initial_cash=5000, golden_crosses=golden_crosses, death_crosses=death_crosses)
+        profit = strategy.backtest()
+        self.assertEqual(round(profit), 3796)
+        self.assertEqual(len(strategy.trading_history), 8)
+        self.assertEqual(round(strategy.value()), 8796)
+        expected = GoldenCrossStrategy(df, initial_cash=5000, golden_crosses=golden_crosses, death_crosses=death_crosses)
+        expected.evaluate()
+        self.assertEqual(strategy.trading_history, expected.trading_history)
+        results = strategy.simulate()
+        self.assertEqual(round(results["value"].iloc[0]), 8796)
+        self.assertEqual(results["position"].iloc[0], strategy.position())
+
+
+class TestLedger(unittest.TestCase):
+    def test_ledger(self):
+        history = [(10.0, 2, -5), (12.0, -1, -3), (5.0, 1, None)]
+        ledger = Ledger().sync(history)
+        self.assertEqual(ledger.position(-6), 1)
+        self.assertEqual(ledger.position(-4), 3)
+        self.assertEqual(ledger.position(0), 2)
+        self.assertEqual(ledger.cost(0), 5 + 20 - 12)
+        # Trades earlier than the last trade rebuild the ledger.
+        history.append((8.0, 1, -4))
+        self.assertEqual(ledger.sync(history).position(-4), 4)
+        positions, costs = ledger.cumulative([-6, -4, 0])
+        self.assertEqual(positions.tolist(), [1, 4, 3])
+        self.assertEqual(costs.tolist(), [5, 33, 21])
+
+    def test_modified_history(self):
+        # Modifications of a plain list are detected if the last trade is changed.
+        history = [(1.0, 5, 0)]
+        ledger = Ledger().sync(history)
+        history[0] = (1.0, 7, 0)
+        self.assertEqual(ledger.sync(history).position(0), 7)
+        history.pop()
+        history.append((1.0, 3, 0))
+        self.assertEqual(ledger.sync(history).position(0), 3)
+        # Any modification of a TradingHistory is detected.
+        history = TradingHistory([(1.0, 5, -1), (1.0, 2, 0)])
+        ledger = Ledger().sync(history)
+        self.assertEqual(ledger.position(0), 7)
+        history[0] = (1.0, 1, -1)
+        self.assertEqual(ledger.sync(history).position(0), 3)
+        del history[1]
+        history.append((1.0, 4, 0))
+        self.assertEqual(ledger.sync(history).position(0), 5)
+        self.assertEqual(ledger.sync(history).cost(-1), 1.0)
+
+
+class TestEquityCurve(unittest.TestCase):
+    def test_equity_curve(self):
+        index = pd.date_range("2020-01-01", periods=4, name="timestamp")[::-1]
+        df = pd.DataFrame({
+            "open": [4.0, 3.0, 2.0, 1.0],
+            "high": [4.5, 3.5, 2.5, 1.5],
+            "low": [3.5, 2.5, 1.5, 0.5],
+            "close": [4.2, 3.2, 2.2, 1.2],
+            "volume": [400, 300, 200, 100],
+        }, index=index)
+        strategy = Strategy(df, initial_cash=100)
+        strategy.trade(1.0, 2, -3)
+        strategy.trade(3.0, -1, -1)
+        curve = strategy.equity_curve()
+        self.assertEqual(list(curve.index), list(df.index))
+        for i, t in enumerate(range(0, -4, -1)):
+            self.assertAlmostEqual(curve["value"].iloc[i], strategy.value(t))
+            self.assertEqual(curve["position"].iloc[i], strategy.position(t))
+            self.assertAlmostEqual(curve["cash"].iloc[i], strategy.cash(t))
+        self.assertEqual(len(strategy.equity_curve(-2, 0)), 2)
+
+
+class TestBar(unittest.TestCase):
+    def test_prices(self):
+        index = pd.date_range("2020-01-01", periods=3, name="timestamp")[::-1]
+        df = pd.DataFrame({
+            "open": [3.0, 2.0, 1.0],
+            "high": [3.5, 2.5, 1.5],
+            "low": [2.5, 1.5, 0.5],
+            "close": [3.2, 2.2, 1.2],
+            "volume": [300, 200, 100],
+            "signal": [1, 0, 0],
+        }, index=index)
+        strategy = Strategy(df)
+        bar = strategy.prices(-1)
+        self.assertIsInstance(bar, Bar)
+        self.assertEqual(bar.name, df.iloc[1].name)
+        self.assertEqual(bar.high, 2.5)
+        self.assertEqual(bar["low"], 1.5)
+        self.assertEqual(strategy.prices(0).signal, 1)
+        self.assertIsNone(strategy.prices(-3))
+        # Trades outside of the low-high range are not executed.
+        self.assertEqual(strategy.trade(3.0, 1, -1), 0)
+        self.assertEqual(strategy.trade(2.0, 1, -1), 2.0)
+
+    def test_empty_backtest(self):
+        index = pd.date_range("2020-01-01", periods=3, name="timestamp")[::-1]
+        df = pd.DataFrame({
+            "open": [3.0, 2.0, 1.0],
+            "high": [3.5, 2.5, 1.5],
+            "low": [2.5, 1.5, 0.5],
+            "close": [3.2, 2.2, 1.2],
+            "volume": [300, 200, 100],
+        }, index=index)
+        strategy = Strategy(df)
+        # Empty time ranges, including from_t > to_t.
+        for from_t, to_t in [(-1, -1), (0, -1), (-5, -5)]:
+            results = strategy.simulate(from_t, to_t)
+            self.assertEqual(len(results), 0)
+            self.assertIn("value", results.columns)
+            self.assertEqual(strategy.backtest(from_t, to_t), 0.0)
+            self.assertEqual(strategy.backtest(from_t, to_t), Strategy(df).evaluate(from_t, to_t))
+        self.assertEqual(strategy.trading_history, [])
+
@@ -0,0 +1,58 @@
+"""Contains tests for the streaming module.
+"""
+import unittest
+import numpy as np
+import pandas as pd
+from virgo_stock.stock import DataSeries
+from virgo_stock.indicators import SMA, EMA, BollingerBands
+from virgo_stock.streaming import StreamingSMA, StreamingEMA, StreamingBollinger
+
+
+class TestStreamingIndicators(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        index = pd.date_range("2019-01-01", periods=400, freq="B", name="timestamp")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))
+        # Data in reverse order.
+        self.df = DataSeries({"close": close}, index=index)[::-1]
+        # The latest 100 bars are processed one by one.
+        self.history = self.df.iloc[100:]
+        self.bars = [row for _, row in self.df.iloc[:100][::-1].iterrows()]
+
+    def assert_consistent(self, streaming_values, batch_series):
+        np.testing.assert_allclose(streaming_values[::-1], batch_series.iloc[:100].to_numpy())
+
+    def test_sma(self):
+        sma = StreamingSMA.from_data_frame(self.history, 20)
+        values = [sma.update(bar) for bar in self.bars]
+        self.assert_consistent(values, SMA(self.df, 20))
+        self.assertTrue(np.isnan(StreamingSMA(3).update(1.0)))
+
+    def test_ema(self):
+        ema = StreamingEMA.from_data_frame(self.history, 20)
+        values = [ema.update(bar) for bar in self.bars]
+        self.assert_consistent(values, EMA(self.df, 20))
+
+    def test_bollinger(self):
+        bollinger = StreamingBollinger.from_data_frame(self.history, 20, 2)
+        values = [bollinger.update(bar) for bar in self.bars]
+        bands = BollingerBands(self.df, 20, 2)
+        for column in ["BB_upper", "BB_lower", "BB_sma"]:
+            self.assert_consistent([v[column] for v in values], bands[column])
+
+    def test_missing_values(self):
+        prices = pd.Series([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0, 8.0])
+        sma = StreamingSMA(3)
+        np.testing.assert_allclose([sma.update(p) for p in prices], prices.rolling(3).mean())
+        ema = StreamingEMA(3)
+        np.testing.assert_allclose([ema.update(p) for p in prices], prices.ewm(span=3).mean())
+        bollinger = StreamingBollinger(3, 2)
+        values = [bollinger.update(p) for p in prices]
+        np.testing.assert_allclose([v["BB_sma"] for v in values], prices.rolling(3).mean())
+        np.testing.assert_allclose(
+            [v["BB_upper"] for v in values], prices.rolling(3).mean() + 2 * prices.rolling(3).std()
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Contains tests for the universe module.
+"""
+import unittest
+import numpy as np
+import pandas as pd
+from virgo_stock.universe import StockUniverse
+from virgo_stock.indicators import SMA
+
+
+def random_series(start, periods, seed):
+    rng = np.random.RandomState(seed)
+    index = pd.date_range(start, periods=periods, freq="B", name="timestamp")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+    df = pd.DataFrame({
+        "open": close,
+        "high": close * 1.01,
+        "low": close * 0.99,
+        "close": close,
+        "volume": rng.randint(100, 1000, periods),
+    }, index=index)
+    return df[::-1]
+
+
+class TestStockUniverse(unittest.TestCase):
+    def setUp(self):
+        self.frames = {
+            "AAA": random_series("2015-01-01", 600, 1),
+            "BBB": random_series("2015-06-01", 400, 2),
+        }
+        self.universe = StockUniverse.from_frames(self.frames)
+
+    def test_alignment(self):
+        universe = self.universe
+        self.assertEqual(len(universe.timestamps), 600)
+        self.assertTrue(universe.timestamps.is_monotonic_decreasing)
+        self.assertEqual(universe.data["close"].shape, (600, 2))
+        # BBB has no data before 2015-06-01
+        self.assertEqual(int(np.isnan(universe.data["close"][:, 1]).sum()), 600 - 400)
+        series = universe.series("BBB")
+        self.assertEqual(series["close"].tolist(), self.frames["BBB"]["close"].tolist())
+
+    def test_rolling_mean(self):
+        sma = self.universe.rolling_mean(20)
+        for j, symbol in enumerate(self.universe.symbols):
+            expected = SMA(self.frames[symbol], 20)
+            actual = pd.Series(sma[:, j], index=self.universe.timestamps).reindex(expected.index)
+            np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-10)
+
+    def test_golden_crosses(self):
+        golden_crosses = self.universe.golden_crosses(20, 50)
+        death_crosses = self.universe.death_crosses(20, 50)
+        for symbol in self.universe.symbols:
+            expected = SMA.crosses(self.frames[symbol], [(20, 50)])[(20, 50)]
+            self.assertEqual(
+                golden_crosses.index[golden_crosses[symbol]].tolist(), expected["golden_cross"].tolist()
+            )
+            self.assertEqual(
+                death_crosses.index[death_crosses[symbol]].tolist(), expected["death_cross"].tolist()
+            )
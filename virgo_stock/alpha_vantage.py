@@ -4,33 +4,249 @@ import requests
 import time
 import datetime
 import io
+import json
 import logging
+import threading
 import pandas as pd
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 from Aries.tasks import FunctionTask
 from Aries.web import WebAPI
 logger = logging.getLogger(__name__)
 
 
+class RateLimitException(RequestException):
+    """Raised when the response from AlphaVantage contains a note indicating that the rate limit is reached.
+    """
+    pass
+
+
+class DailyLimitExceeded(Exception):
+    """Raised when all API keys have reached the daily limit.
+    This is not a RequestException, so that the request is not retried, as the limit will not be reset soon.
+    """
+    pass
+
+
+# Seconds spent on establishing connections by the request being sent in the current thread.
+_connect_timer = threading.local()
+
+
+class TimedConnectionMixin:
+    """Records the time for establishing a connection in the connect timer of the current thread.
+    """
+    def connect(self):
+        start = time.monotonic()
+        try:
+            return super().connect()
+        finally:
+            _connect_timer.seconds = getattr(_connect_timer, "seconds", 0.0) + time.monotonic() - start
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """A HTTPAdapter recording the time for establishing connections for each request.
+
+    The seconds spent on connecting are stored in the "connect_time" attribute of the response,
+        which is 0 if the request is sent with a connection kept alive.
+    The time is recorded for each request separately, even if requests are sent concurrently by multiple threads.
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        _connect_timer.seconds = 0.0
+        response = super().send(request, **kwargs)
+        response.connect_time = _connect_timer.seconds
+        return response
+
+
+class ResponseStream(io.RawIOBase):
+    """A read-only file object streaming the body of a response.
+
+    The first chunk of the body is read when initializing the stream,
+        so that the format of the body can be sniffed before parsing.
+    The time spent on reading the body is added to the "transfer" of the metric, if a metric is given.
+
+    Attributes:
+        head (bytes): The first chunk of the body.
+
+    """
+    def __init__(self, response, chunk_size=64 * 1024, metric=None):
+        self.response = response
+        self.metric = metric
+        self.__chunks = response.iter_content(chunk_size=chunk_size)
+        self.__buffer = b""
+        self.__read_chunk()
+        self.head = self.__buffer
+
+    def __read_chunk(self):
+        start = time.monotonic()
+        self.__buffer = next(self.__chunks, b"")
+        if self.metric is not None:
+            self.metric["transfer"] += time.monotonic() - start
+        return self.__buffer
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        # Skip empty chunks
+        while not self.__buffer:
+            if not self.__read_chunk():
+                return 0
+        size = min(len(b), len(self.__buffer))
+        b[:size] = self.__buffer[:size]
+        self.__buffer = self.__buffer[size:]
+        return size
+
+    def is_json(self):
+        """Checks if the body is JSON by the first non-whitespace character.
+        """
+        return self.head.lstrip()[:1] == b"{"
+
+    def close(self):
+        self.response.close()
+        super().close()
+
+
+class TokenBucket:
+    """A thread-safe rate limiter allowing at most "capacity" acquisitions in any "period" of seconds.
+
+    The bucket starts with "capacity" tokens.
+    Each acquire() takes a token from the bucket and the token is returned to the bucket "period" seconds later.
+    When the bucket is empty, acquire() blocks until a token is returned.
+    Comparing with a bucket refilling at a constant rate, this allows a full burst of requests
+        without exceeding the limit in any sliding window.
+
+    Attributes:
+        capacity (int): Max number of acquisitions in a period.
+        period (float): Length of the period in seconds.
+
+    """
+    def __init__(self, capacity, period=60):
+        self.capacity = capacity
+        self.period = period
+        # Times (time.monotonic()) when the tokens in use will be returned.
+        self.__returns = deque()
+        self.__condition = threading.Condition()
+
+    def __release(self, now):
+        while self.__returns and self.__returns[0] <= now:
+            self.__returns.popleft()
+
+    def available(self):
+        """Number of tokens available now.
+        """
+        with self.__condition:
+            self.__release(time.monotonic())
+            return max(self.capacity - len(self.__returns), 0)
+
+    def wait_time(self):
+        """Time in seconds until a token is available.
+        """
+        with self.__condition:
+            now = time.monotonic()
+            self.__release(now)
+            if len(self.__returns) < self.capacity:
+                return 0
+            return self.__returns[len(self.__returns) - self.capacity] - now
+
+    def try_acquire(self):
+        """Takes a token from the bucket if there is one available, without blocking.
+
+        Returns:
+            bool: True if a token is taken, otherwise False.
+        """
+        with self.__condition:
+            now = time.monotonic()
+            self.__release(now)
+            if len(self.__returns) < self.capacity:
+                self.__returns.append(now + self.period)
+                return True
+            return False
+
+    def exhaust(self):
+        """Takes all available tokens, e.g. when the server indicates the limit is reached.
+        """
+        with self.__condition:
+            now = time.monotonic()
+            self.__release(now)
+            while len(self.__returns) < self.capacity:
+                self.__returns.append(now + self.period)
+
+    def acquire(self):
+        """Takes a token from the bucket, blocks until a token is available.
+
+        Returns:
+            float: The time in seconds spent on waiting.
+        """
+        start = time.monotonic()
+        with self.__condition:
+            while True:
+                now = time.monotonic()
+                self.__release(now)
+                if len(self.__returns) < self.capacity:
+                    self.__returns.append(now + self.period)
+                    return now - start
+                wait_seconds = self.__returns[len(self.__returns) - self.capacity] - now
+                logger.debug("Wait %s seconds..." % wait_seconds)
+                self.__condition.wait(wait_seconds)
+
+    def set_capacity(self, capacity):
+        with self.__condition:
+            self.capacity = capacity
+            self.__condition.notify_all()
+
+
 class AlphaVantageAPI(WebAPI):
     """Provides methods to access AlphaVantage API.
     The free Alpha Vantage API key has a limit of 5 requests per miniute and 500 requests per day.
     This class keeps the recent request histories of each API key 
         using the "histories" static attribute.
-    Base on the "histories", it will wait (sleep) automatically before making new requests
+    The requests of each API key are limited by a TokenBucket, which is shared by all instances and threads.
+    It will wait (sleep) automatically before making new requests
         when there are already 5 requests in the last minute.
     Also, it will retry automatically when an error occurs.
     From the user perspective, it just looks like the request is taking a long time.
     Users do not need to worry about the delay and retry.
 
-    This class only handles the 5 requests per minute limit.
-    This class does not limit the number of request per day.
-    If the API key has been used to make more than 500 requests per day,
-        an RequestException will be raised.
+    The requests of each API key are also limited to 500 in any 24 hours.
+    Multiple API keys can be used by a single instance.
+    Each request will be sent with the API key having the most remaining budget,
+        i.e. the most available requests in the current minute and then in the current day.
+    If the server indicates that the limit of an API key is reached,
+        the request will be sent again with another API key.
+    If all API keys have been used to make more than 500 requests per day,
+        a DailyLimitExceeded exception will be raised without retrying.
 
     This class uses python requests package.
     See https://2.python-requests.org/en/master/user/advanced/#request-and-response-objects
+    Each instance owns a requests Session, which keeps the connections alive and re-use them.
+    The latency of recent requests are stored in the "metrics" attribute.
     
     Attributes:
         limits and histories are static properties.
@@ -38,23 +254,50 @@ class AlphaVantageAPI(WebAPI):
         limits (dict): A dictionary storing the rate limit per minute for each API key.
             key (str): API key.
             value (int): limit per minute. Default to 5.
+        daily_limits (dict): A dictionary storing the rate limit per day for each API key.
+            key (str): API key.
+            value (int): limit per day. Default to 500.
         histories (dict): A dictionary storing the recent API requests times and URLs.
             key (str): API key.
             value (deque): A deque of dictionaries. Each dictionary has two keys: "time" and "url".
                 "time" stores a datetime instance of the time when the request was made.
                 "url: stores the url of the request as a string.
+        buckets (dict): A dictionary storing the TokenBucket limiting the requests per minute of each API key.
+        daily_buckets (dict): A dictionary storing the TokenBucket limiting the requests per day of each API key.
         
-        api_key: The Alpha Vantage API key.
+        api_key: The (first) Alpha Vantage API key.
+        api_keys: A list of Alpha Vantage API keys used by this instance.
+        session: A requests Session with a connection pool.
+        timeout: Timeout for each request, see the "timeout" argument of requests.
+        metrics (deque): Latency of the recent requests. Each item is a dictionary with the following keys:
+            "url": The url of the request.
+            "new_connection": Whether a new connection is established for the request.
+            "connect": Seconds for establishing the connection, 0 if a connection kept alive is re-used.
+            "wait": Seconds between sending the request and receiving the response headers,
+                excluding the time for connecting to the server.
+            "transfer": Seconds for receiving the response body.
         
     """
     limits = {}
+    daily_limits = {}
     histories = {}
+    buckets = {}
+    daily_buckets = {}
+    # Lock for updating buckets and histories
+    lock = threading.RLock()
 
-    def __init__(self, api_key, **kwargs):
+    def __init__(self, api_key, base_url="https://www.alphavantage.co/query",
+                 pool_size=10, timeout=(10, 120), gzip=True, max_metrics=1000, **kwargs):
         """Initialize the API with API key.
         
         Args:
-            api_key (str): Alpha Vantage API key
+            api_key (str or list): Alpha Vantage API key, or a list of API keys.
+            base_url (str, optional): The endpoint of the API.
+            pool_size (int, optional): Max number of connections kept alive. Defaults to 10.
+            timeout (optional): Timeout in seconds for each request,
+                either a number or a (connect, read) tuple. Defaults to (10, 120).
+            gzip (bool, optional): Whether to accept gzip compressed response. Defaults to True.
+            max_metrics (int, optional): Max number of requests to keep in metrics. Defaults to 1000.
             kwargs: Can be use to specify query string to be included in all requests.
                 e.g. To request full size output every time: outputsize="full"
 
@@ -62,21 +305,157 @@ class AlphaVantageAPI(WebAPI):
             https://www.alphavantage.co/support/
         
         """
-        self.api_key = api_key
-        self.histories[api_key] = deque()
-        base_url = "https://www.alphavantage.co/query"
-        super().__init__(base_url, apikey=api_key, **kwargs)
+        if isinstance(api_key, (list, tuple)):
+            self.api_keys = list(api_key)
+        else:
+            self.api_keys = [api_key]
+        if not self.api_keys:
+            raise ValueError("At least one API key is required.")
+        self.api_key = self.api_keys[0]
+        for key in self.api_keys:
+            self.histories[key] = deque()
+        self.timeout = timeout
+        self.metrics = deque(maxlen=max_metrics)
+        self.session = requests.Session()
+        adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate" if gzip else "identity"
+        super().__init__(base_url, apikey=self.api_key, **kwargs)
 
-    def set_limit(self, limit):
+    def __request(self, url, stream=False):
+        """Sends a GET request with the session and records the latency.
+
+        Args:
+            url (str): The url of the request.
+            stream (bool, optional): Whether to stream the response body. Defaults to False.
+                If stream is False, the response body will be loaded before returning.
+                Otherwise the body should be read with a ResponseStream.
+
+        Returns: A Response Object, and the metric (dictionary) of the request.
+        """
+        start = time.monotonic()
+        response = self.session.get(url, timeout=self.timeout, stream=True)
+        headers_received = time.monotonic()
+        if not stream:
+            # Load the content
+            response.content
+        # Including the connections established for redirects.
+        connect = sum(getattr(r, "connect_time", 0.0) for r in response.history + [response])
+        metric = {
+            "url": url,
+            "new_connection": connect > 0,
+            "connect": connect,
+            "wait": headers_received - start - connect,
+            "transfer": time.monotonic() - headers_received,
+        }
+        self.metrics.append(metric)
+        return response, metric
+
+    def latency(self):
+        """Summarizes the latency of recent requests.
+
+        The time for establishing connections is measured for each request (see TimedHTTPAdapter).
+
+        Returns:
+            dict: A dictionary with the following keys:
+                "requests": Number of requests.
+                "new_connections": Number of requests with new connection.
+                "connect": Average seconds for establishing a new connection.
+                "wait": Average seconds between sending the request and receiving the response headers,
+                    excluding the time for establishing connections.
+                "transfer": Average seconds for receiving the response body.
+        """
+        metrics = list(self.metrics)
+        summary = {
+            "requests": len(metrics),
+            "new_connections": 0,
+            "connect": None,
+            "wait": None,
+            "transfer": None,
+        }
+        if not metrics:
+            return summary
+        connects = [m["connect"] for m in metrics if m["new_connection"]]
+        summary["new_connections"] = len(connects)
+        if connects:
+            summary["connect"] = sum(connects) / len(connects)
+        summary["wait"] = sum(m["wait"] for m in metrics) / len(metrics)
+        summary["transfer"] = sum(m["transfer"] for m in metrics) / len(metrics)
+        return summary
+
+    @classmethod
+    def bucket(cls, api_key):
+        """Gets the TokenBucket limiting the requests of an API key.
+        """
+        with cls.lock:
+            bucket = cls.buckets.get(api_key)
+            if bucket is None:
+                bucket = TokenBucket(cls.limits.get(api_key, 5), 61)
+                cls.buckets[api_key] = bucket
+            return bucket
+
+    @classmethod
+    def daily_bucket(cls, api_key):
+        """Gets the TokenBucket limiting the requests of an API key in a day.
+        """
+        with cls.lock:
+            bucket = cls.daily_buckets.get(api_key)
+            if bucket is None:
+                bucket = TokenBucket(cls.daily_limits.get(api_key, 500), 24 * 60 * 60)
+                cls.daily_buckets[api_key] = bucket
+            return bucket
+
+    def set_limit(self, limit, daily_limit=None):
         """Sets the limit of per miniute requests.
         By default, each API key will have a per minute limit of 5 requests.
         This method allows the user to set a customied limit.
+        The limits will be set for all API keys of this instance.
         
         Args:
             limit (int): Limit for number of requests per minute.
+            daily_limit (int, optional): Limit for number of requests per day.
+                Defaults to None, i.e. the daily limit will not be changed.
+
+        """
+        for api_key in self.api_keys:
+            self.limits[api_key] = limit
+            self.bucket(api_key).set_capacity(limit)
+            if daily_limit is not None:
+                self.daily_limits[api_key] = daily_limit
+                self.daily_bucket(api_key).set_capacity(daily_limit)
+
+    def __acquire_key(self):
+        """Selects an API key for the next request and takes a token from its buckets.
+        This method blocks until the rate limit allows a request.
+
+        The API key with the most available requests in the current minute is selected.
+        If there are multiple such keys, the one with the most available requests in the current day is selected.
+
+        Returns:
+            str: The API key for the next request.
+
+        Raises:
+            DailyLimitExceeded: Raise if all API keys have reached the daily limit.
 
         """
-        self.limits[self.api_key] = limit
+        while True:
+            with self.lock:
+                budgets = [
+                    (self.bucket(key).available(), self.daily_bucket(key).available(), key)
+                    for key in self.api_keys
+                ]
+                budgets = [b for b in budgets if b[1] > 0]
+                if not budgets:
+                    raise DailyLimitExceeded("All API keys have reached the daily limit.")
+                minute_budget, daily_budget, api_key = max(budgets, key=lambda b: (b[0], b[1]))
+                if minute_budget > 0:
+                    self.bucket(api_key).try_acquire()
+                    self.daily_bucket(api_key).try_acquire()
+                    return api_key
+                wait_seconds = min(self.bucket(b[2]).wait_time() for b in budgets)
+            logger.debug("Wait %s seconds..." % wait_seconds)
+            time.sleep(wait_seconds)
 
     @staticmethod
     def __try(func, max_retry=5, **kwargs):
@@ -102,12 +481,24 @@ class AlphaVantageAPI(WebAPI):
         )
         return response
 
+    @staticmethod
+    def __check_status(response):
+        """Checks if the response status code is 200.
+        """
+        if response.status_code != 200:
+            raise RequestException(
+                "Unexpected Status Code: %s" % response.status_code,
+                response=response
+            )
+
     @staticmethod
     def __check_response(response):
         """Checks if the response is valid.
         
         Args:
             response: Response Object.
+
+        Returns: The Response Object.
         
         Raises:
             RequestException: Raise if
@@ -117,20 +508,58 @@ class AlphaVantageAPI(WebAPI):
 
         """
         # Status code should be 200
-        if response.status_code != 200:
-            raise RequestException(
-                "Unexpected Status Code: %s" % response.status_code,
-                response=response
-            )
+        AlphaVantageAPI.__check_status(response)
 
-        # Check if the request is over rate limit
+        # AlphaVantage send errors in JSON
+        # Return if the data is not JSON.
+        if response.content.lstrip()[:1] != b"{":
+            return response
         try:
             json_data = response.json()
         except ValueError:
-            # Return if the data is not JSON.
-            # AlphaVantage send errors in JSON
-            return
+            return response
+        AlphaVantageAPI.__check_json(json_data, response)
+        return response
+
+    @staticmethod
+    def __check_stream(response, metric=None):
+        """Checks if the response is valid without loading the body, unless the body is JSON.
+
+        Args:
+            response: Response Object, with the body not loaded.
+            metric (dict, optional): The metric of the request.
+
+        Returns:
+            ResponseStream: A file object for reading the body.
+
+        Raises:
+            RequestException: See __check_response().
+            ValueError: Raise if the body is JSON but does not indicate an error.
+
+        """
+        try:
+            AlphaVantageAPI.__check_status(response)
+            stream = ResponseStream(response, metric=metric)
+        except Exception:
+            # Release the connection of the unread response before the request is retried.
+            response.close()
+            raise
+        if not stream.is_json():
+            return stream
+        # JSON body is small, load all of it.
+        with stream:
+            content = stream.read()
+        try:
+            json_data = json.loads(content.decode())
+        except ValueError:
+            raise RequestException("The response contains invalid JSON.", response=response)
+        AlphaVantageAPI.__check_json(json_data, response)
+        raise ValueError("Unexpected JSON response: %s" % content[:200])
 
+    @staticmethod
+    def __check_json(json_data, response):
+        """Checks if the JSON data contains an error message or a note from the server.
+        """
         if len(json_data) == 1:
             val = next(iter(json_data.values()))
             if isinstance(val, str):
@@ -138,16 +567,16 @@ class AlphaVantageAPI(WebAPI):
                     logger.debug(val)
                     raise ValueError(str(json_data))
                 else:
-                    raise RequestException(
+                    raise RateLimitException(
                         str(json_data),
                         response=response,
                     )
 
-    def __clean_history(self):
+    def __clean_history(self, api_key):
         """Removes the history of longer than 1 minute ago.
         """
         # Get history of this API key
-        history = self.histories.get(self.api_key, deque())
+        history = self.histories.setdefault(api_key, deque())
 
         # Remove history that is more than 1 minutes ago
         while len(history) > 0:
@@ -156,8 +585,6 @@ class AlphaVantageAPI(WebAPI):
                 history.popleft()
             else:
                 break
-        # 
-        self.histories[self.api_key] = history
 
     def __get(self, **kwargs):
         """Requests data
@@ -165,6 +592,20 @@ class AlphaVantageAPI(WebAPI):
         
         Returns: A Response Object
         """
+        return self.__send(self.__check_response, False, **kwargs)
+
+    def __send(self, check, stream, **kwargs):
+        """Sends a request and checks the response.
+        If the rate limit of an API key is reached, the request will be sent again with another API key.
+
+        Args:
+            check: A function checking the response, e.g. __check_response() or __check_stream().
+                The function should accept the response and the metric as arguments.
+            stream (bool): Whether to stream the response body.
+            kwargs: Query strings in the request.
+
+        Returns: The value returned by the check function.
+        """
         # Replace "." with "-", and remove "^".
         # otherwise there will be an error when getting data from AlphaVantage.
         logger.debug("Getting AlphaVantage Data...%s" % kwargs)
@@ -172,30 +613,31 @@ class AlphaVantageAPI(WebAPI):
         if symbol:
             kwargs["symbol"] = symbol.replace(".", "-").replace("^", "")
 
-        # Build request URL
-        url = self.build_url("", **kwargs)
+        # Try each API key at most once if the rate limit is reached.
+        for attempt in range(len(self.api_keys)):
+            # Wait if the limit has been reached
+            api_key = self.__acquire_key()
 
-        self.__clean_history()
-        history = self.histories.get(self.api_key, deque())
-        
-        # Wait if there are more items than the limit in the history
-        limit = self.limits.get(self.api_key, 5)
-        if len(history) >= limit:
-            item = history[-limit]
-            wait_time = item.get("time") + datetime.timedelta(seconds=61) - datetime.datetime.now()
-            wait_seconds = wait_time.total_seconds()
-            logger.debug("Wait %s seconds..." % wait_seconds)
-            time.sleep(wait_seconds)
-        
-        # Add this request to history
-        history.append({"time": datetime.datetime.now(), "url": url})
-        self.histories[self.api_key] = history
-        
-        # Request Data
-        response = requests.get(url)
+            # Build request URL
+            url = self.build_url("", **dict(kwargs, apikey=api_key))
 
-        self.__check_response(response)
-        return response
+            # Add this request to history
+            with self.lock:
+                self.__clean_history(api_key)
+                self.histories[api_key].append({"time": datetime.datetime.now(), "url": url})
+
+            # Request Data
+            response, metric = self.__request(url, stream)
+            try:
+                result = check(response, metric) if stream else check(response)
+            except RateLimitException:
+                # Mark the API key as exhausted for the current minute and try another one.
+                logger.debug("Rate limit reached for API key ending with %s." % api_key[-4:])
+                self.bucket(api_key).exhaust()
+                if attempt == len(self.api_keys) - 1:
+                    raise
+                continue
+            return result
 
     def __get_json(self, **kwargs):
         """Requests JSON data
@@ -274,17 +716,69 @@ class AlphaVantageAPI(WebAPI):
         kwargs.update({
             "datatype": "csv"
         })
-        response = self.get(max_retry, **kwargs)
-        buffer = io.BytesIO(response.content)
+        return self.__try(self.__get_dataframe, max_retry, **kwargs)
+
+    def __get_dataframe(self, **kwargs):
+        """Requests CSV data and parses the response body as a stream.
+        The body is parsed while it is being received,
+            without holding a copy of the whole body in memory.
+
+        Returns: A pandas dataframe.
+        """
+        with self.__send(self.__check_stream, True, **kwargs) as stream:
+            df = pd.read_csv(io.BufferedReader(stream))
+        return self.parse_timestamp(df)
+
+    @staticmethod
+    def parse_timestamp(df):
+        """Converts the "timestamp" column of a data frame to datetime, in place.
+        The format of the timestamp is determined by the length of the first value.
+        The column will not be converted if the values do not match the format.
+
+        Returns: The data frame.
+        """
+        if "timestamp" not in df.columns or df.empty:
+            return df
+        timestamp = df["timestamp"]
+        first = str(timestamp.iloc[0])
+        fmt = "%Y-%m-%d" if len(first) == 10 else "%Y-%m-%d %H:%M:%S"
         try:
-            df = pd.read_csv(
-                buffer, 
-                parse_dates=["timestamp"],
-                infer_datetime_format=True
-            )
-        except:
-            buffer.seek(0)
-            df = pd.read_csv(
-                buffer
-            )
+            df["timestamp"] = pd.to_datetime(timestamp, format=fmt)
+        except (ValueError, TypeError):
+            logger.debug("Failed to parse timestamp: %s" % first)
         return df
+
+    def get_dataframes(self, symbols, max_workers=None, max_retry=5, **kwargs):
+        """Requests data of multiple symbols concurrently and read them into Pandas Data Frames.
+
+        The requests are made in a thread pool.
+        The number of requests is still limited by the TokenBucket of the API keys,
+            i.e. requests are sent as soon as the rate limit allows.
+
+        Args:
+            symbols (list): A list of symbols, e.g. ["AAPL", "MSFT"].
+            max_workers (int, optional): Max number of concurrent requests.
+                Defaults to None, i.e. the total per minute limit of the API keys.
+            max_retry (int, optional): Max number of retry for each request. Defaults to 5.
+            kwargs: Query strings for all requests, e.g. function="TIME_SERIES_DAILY_ADJUSTED".
+
+        Returns:
+            dict: A dictionary mapping each symbol to a pandas dataframe.
+                The value will be None if the request failed.
+
+        """
+        if not max_workers:
+            max_workers = sum(self.bucket(key).capacity for key in self.api_keys)
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                symbol: executor.submit(self.get_dataframe, max_retry, symbol=symbol, **kwargs)
+                for symbol in symbols
+            }
+            for symbol, future in futures.items():
+                try:
+                    results[symbol] = future.result()
+                except Exception as ex:
+                    logger.error("Failed to get data for %s: %s: %s" % (symbol, type(ex), str(ex)))
+                    results[symbol] = None
+        return results
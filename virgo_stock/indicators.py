@@ -4,9 +4,181 @@ All technical indicators should be initialized with a pandas DataFrame containin
 The data frame should have timestamp as index, as well as 5 columns:
     open, high, low, close and volume.
 The data frame stores data in reverse order, i.e. the first row is the latest data.
+
+The calculations shared by indicators (e.g. moving averages) are memoized in IndicatorCache,
+    so that indicators of the same data frame do not calculate the same values again.
+Moving windows are calculated on ascending views of the values (see rolling.py),
+    the results are reversed views presented in the same order as the data frame.
 """
+import threading
+import weakref
+import numpy as np
 import pandas as pd
 from .series import TimeSeries, TimeDataFrame
+from . import rolling
+
+
+class IndicatorCache:
+    """Memoizes indicator calculations for each data frame.
+
+    Calculated values are stored for each data frame (by identity) and keyed by
+        (indicator name, parameters, source column, data version).
+    The entries of a data frame are removed when the data frame is garbage collected.
+
+    The data version changes when invalidate() is called with the data frame,
+        or when the number of rows or the first/last timestamp of the data frame changes.
+    Each value also records the buffers (data pointer and length) of its source columns,
+        so that the value is re-calculated after a source column is replaced, e.g. df["close"] = df["close"] * 2.
+    The source arrays are referenced by the cached value, so that their memory cannot be reused by a new column.
+    Call invalidate() after modifying the values of a data frame in place.
+
+    Cached values are read-only NumPy arrays.
+
+    Attributes:
+        hits (int): Number of calculations served from the cache.
+        misses (int): Number of calculations performed.
+
+    """
+    def __init__(self):
+        # Maps id(data_frame) to a dictionary with keys: "ref", "version", "fingerprint" and "values".
+        self.__entries = {}
+        self.__lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def __fingerprint(data_frame):
+        if len(data_frame) == 0:
+            return (0, )
+        values = data_frame.index.values
+        return len(values), values[0], values[-1]
+
+    @staticmethod
+    def __sources(data_frame, column):
+        """Gets the arrays of the source columns, column may contain multiple names separated by "/".
+        """
+        names = column.split("/") if isinstance(column, str) else [column]
+        sources = []
+        for name in names:
+            try:
+                sources.append(data_frame[name].values)
+            except (KeyError, TypeError, IndexError):
+                continue
+        return sources
+
+    @staticmethod
+    def __signature(sources):
+        signature = []
+        for values in sources:
+            interface = getattr(values, "__array_interface__", None)
+            if interface is None:
+                signature.append((id(values), len(values)))
+            else:
+                signature.append((interface["data"][0], len(values)))
+        return tuple(signature)
+
+    def __entry(self, data_frame):
+        key = id(data_frame)
+        entry = self.__entries.get(key)
+        if entry is None or entry["ref"]() is not data_frame:
+            entry = {
+                "ref": weakref.ref(data_frame, lambda ref: self.__entries.pop(key, None)),
+                "version": 0,
+                "fingerprint": self.__fingerprint(data_frame),
+                "values": {},
+            }
+            self.__entries[key] = entry
+        elif entry["fingerprint"] != self.__fingerprint(data_frame):
+            self.__bump(entry, data_frame)
+        return entry
+
+    def __bump(self, entry, data_frame):
+        entry["version"] += 1
+        entry["fingerprint"] = self.__fingerprint(data_frame)
+        entry["values"] = {}
+
+    def get(self, data_frame, name, parameters, column, func):
+        """Gets a calculated value from the cache, or calculates and caches it.
+
+        Args:
+            data_frame (pandas.DataFrame): The data frame of the source data.
+            name (str): Name of the indicator or calculation, e.g. "SMA".
+            parameters (tuple): Parameters of the calculation.
+            column (str): The source column in the data frame.
+            func: A function without argument, which calculates the value as a numpy array.
+
+        Returns:
+            numpy.ndarray: The calculated value (read-only).
+        """
+        sources = self.__sources(data_frame, column)
+        signature = self.__signature(sources)
+        with self.__lock:
+            entry = self.__entry(data_frame)
+            key = (name, tuple(parameters), column, entry["version"])
+            cached = entry["values"].get(key)
+            if cached is not None and cached[0] == signature:
+                self.hits += 1
+                return cached[1]
+        value = np.asarray(func())
+        value.flags.writeable = False
+        with self.__lock:
+            self.misses += 1
+            entry = self.__entry(data_frame)
+            entry["values"][(name, tuple(parameters), column, entry["version"])] = (signature, value, sources)
+        return value
+
+    def invalidate(self, data_frame=None):
+        """Invalidates the cached values of a data frame, or all data frames if data_frame is None.
+        """
+        with self.__lock:
+            if data_frame is None:
+                for entry in self.__entries.values():
+                    entry["version"] += 1
+                    entry["values"] = {}
+                return
+            entry = self.__entries.get(id(data_frame))
+            if entry is not None and entry["ref"]() is data_frame:
+                self.__bump(entry, data_frame)
+
+
+# The cache shared by all indicators
+cache = IndicatorCache()
+
+
+def rolling_mean(data_frame, column, n_point):
+    """Calculates the simple moving average of a column, using the shared cache.
+
+    Returns:
+        numpy.ndarray: The moving average, in reverse order.
+    """
+    return cache.get(
+        data_frame, "SMA", (n_point, ), column,
+        lambda: rolling.rolling_mean(rolling.ascending(data_frame, column), n_point)[::-1]
+    )
+
+
+def rolling_std(data_frame, column, n_point):
+    """Calculates the moving standard deviation of a column, using the shared cache.
+
+    Returns:
+        numpy.ndarray: The moving standard deviation, in reverse order.
+    """
+    return cache.get(
+        data_frame, "STD", (n_point, ), column,
+        lambda: rolling.rolling_std(rolling.ascending(data_frame, column), n_point)[::-1]
+    )
+
+
+def ewm_mean(data_frame, column, span):
+    """Calculates the exponential moving average of a column, using the shared cache.
+
+    Returns:
+        numpy.ndarray: The exponential moving average, in reverse order.
+    """
+    return cache.get(
+        data_frame, "EMA", (span, ), column,
+        lambda: rolling.ewm_mean(rolling.ascending(data_frame, column), span)[::-1]
+    )
 
 
 class IndicatorSeries(TimeSeries):
@@ -68,6 +240,28 @@ class IndicatorSeries(TimeSeries):
     def local_maximums(self):
         return self[(self.shift(1) < self) & (self.shift(-1) < self)]
 
+    @staticmethod
+    def cross_positions(series_n, series_k):
+        """Finds the positions where series_n crossing series_k in both directions, in one vectorized pass.
+        Since the data is in reverse order, series_n breaking above series_k at position i means
+            series_n is above series_k at position i and below series_k at position i + 1.
+
+        Args:
+            series_n: A pandas series or array-like.
+            series_k: A pandas series or array-like, with the same length as series_n.
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray): Two arrays of integer positions, where
+                series_n breaking above series_k, and where series_n crossing below series_k.
+
+        """
+        diff = np.asarray(series_n, dtype=float) - np.asarray(series_k, dtype=float)
+        current = diff[:-1]
+        previous = diff[1:]
+        above = np.flatnonzero((current > 0) & (previous < 0))
+        below = np.flatnonzero((current < 0) & (previous > 0))
+        return above, below
+
     @staticmethod
     def series_cross(series_n, series_k):
         """Finds the indices where series_n breaking above series_k.
@@ -81,11 +275,8 @@ class IndicatorSeries(TimeSeries):
             list: A list of indices where series_n breaking above series_k.
 
         """
-        crosses = []
-        for i in range(0, len(series_n.index) - 1):
-            if series_n[i + 1] < series_k[i + 1] and series_n[i] > series_k[i]:
-                crosses.append(i)
-        return crosses
+        above, _ = IndicatorSeries.cross_positions(series_n, series_k)
+        return above.tolist()
 
     def breaking_above(self, series):
         """Finds the timestamps where the moving average breaking above another series.
@@ -162,6 +353,31 @@ class MovingAverage(IndicatorSeries):
         series_k = cls(data_frame, k)
         return MovingAverage.series_cross(series_n, series_k)
 
+    @classmethod
+    def crosses(cls, data_frame, pairs):
+        """Finds the golden crosses and death crosses for multiple pairs of short-term and long-term windows.
+        The moving average of each window is calculated only once.
+
+        Args:
+            data_frame: A pandas data frame containing stock data.
+            pairs (list): A list of (short_term, long_term) tuples, e.g. [(50, 200), (20, 50)].
+
+        Returns:
+            dict: A dictionary mapping each (short_term, long_term) tuple to a dictionary with two keys:
+                "golden_cross": Timestamps where short-term moving average breaking above long-term moving average.
+                "death_cross": Timestamps where short-term moving average crossing below long-term moving average.
+        """
+        windows = set([n for pair in pairs for n in pair])
+        averages = {n: cls(data_frame, n).to_numpy() for n in windows}
+        results = {}
+        for short_term, long_term in pairs:
+            golden, death = cls.cross_positions(averages[short_term], averages[long_term])
+            results[(short_term, long_term)] = {
+                "golden_cross": data_frame.index[golden],
+                "death_cross": data_frame.index[death],
+            }
+        return results
+
     @classmethod
     def golden_cross(cls, data_frame, short_term=50, long_term=200):
         """Finds the timestamps where short-term moving average breaking above 
@@ -192,8 +408,8 @@ class SMA(MovingAverage):
         Returns:
             pandas.Series: a pandas series containing the simple moving average.
         """
-        series = self.df[self.series_type][::-1].rolling(self.n_point).mean()[::-1]
-        return series
+        values = rolling_mean(self.df, self.series_type, self.n_point)
+        return pd.Series(values, index=self.df.index)
 
 
 class EMA(MovingAverage):
@@ -215,8 +431,8 @@ class EMA(MovingAverage):
         Returns:
             pandas.Series: a pandas series containing the exponential moving average.
         """
-        series = self.df[self.series_type][::-1].ewm(span=self.n_point).mean()[::-1]
-        return series
+        values = ewm_mean(self.df, self.series_type, self.n_point)
+        return pd.Series(values, index=self.df.index)
 
 
 class BollingerSeries(IndicatorSeries):
@@ -240,9 +456,9 @@ class BollingerSeries(IndicatorSeries):
         return 'BB_%s_%+d' % (self.n_point, self.k_std)
 
     def calculate(self):
-        moving_average = self.df[self.series_type][::-1].rolling(self.n_point).mean()[::-1]
-        standard_deviation = self.df[self.series_type][::-1].rolling(self.n_point).std()[::-1]
-        return moving_average.add(self.k_std * standard_deviation)
+        moving_average = rolling_mean(self.df, self.series_type, self.n_point)
+        standard_deviation = rolling_std(self.df, self.series_type, self.n_point)
+        return pd.Series(moving_average + self.k_std * standard_deviation, index=self.df.index)
 
 
 class BollingerBands(IndicatorDataFrame):
@@ -270,3 +486,201 @@ class BollingerBands(IndicatorDataFrame):
             self.prefix + "_lower": lower,
             self.prefix + "_sma": sma
         }
+
+
+class RSI(IndicatorSeries):
+    """Relative Strength Index, which measures the speed and change of price movements, ranging from 0 to 100.
+    The average gain and loss are calculated with Wilder's smoothing.
+
+    See Also:
+        https://en.wikipedia.org/wiki/Relative_strength_index
+    """
+
+    _metadata = IndicatorSeries._metadata + ['n_point', 'series_type']
+
+    def __init__(self, data_frame, n_point=14, series_type='close', name=None):
+        self.n_point = n_point
+        self.series_type = series_type
+        IndicatorSeries.__init__(self, data_frame, name)
+
+    def default_name(self):
+        return 'RSI_%s' % self.n_point
+
+    def calculate(self):
+        def rsi():
+            changes = np.diff(rolling.ascending(self.df, self.series_type), prepend=np.nan)
+            gains = rolling.wilder_mean(np.where(changes > 0, changes, 0.0)[1:], self.n_point)
+            losses = rolling.wilder_mean(np.where(changes < 0, -changes, 0.0)[1:], self.n_point)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = 100.0 - 100.0 / (1.0 + gains / losses)
+            # There is no change for the first data point.
+            return np.concatenate([[np.nan], values])[::-1]
+        values = cache.get(self.df, "RSI", (self.n_point, ), self.series_type, rsi)
+        return pd.Series(values, index=self.df.index)
+
+
+class MACD(IndicatorDataFrame):
+    """Moving Average Convergence/Divergence, including 3 columns:
+        MACD: the difference between the fast and slow EMA.
+        MACD_signal: the EMA of the MACD.
+        MACD_hist: the difference between the MACD and the signal.
+
+    See Also:
+        https://en.wikipedia.org/wiki/MACD
+    """
+
+    _metadata = IndicatorDataFrame._metadata + ['fast', 'slow', 'signal', 'series_type', 'prefix']
+
+    def __init__(self, data_frame, fast=12, slow=26, signal=9, series_type='close', prefix="MACD"):
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+        self.series_type = series_type
+        self.prefix = prefix
+        IndicatorDataFrame.__init__(self, data_frame)
+
+    def calculate(self):
+        def macd_signal():
+            macd = ewm_mean(self.df, self.series_type, self.fast) - ewm_mean(self.df, self.series_type, self.slow)
+            return np.stack([macd, rolling.ewm_mean(macd[::-1], self.signal)[::-1]])
+        macd, signal = cache.get(
+            self.df, "MACD", (self.fast, self.slow, self.signal), self.series_type, macd_signal
+        )
+        return {
+            self.prefix: pd.Series(macd, index=self.df.index),
+            self.prefix + "_signal": pd.Series(signal, index=self.df.index),
+            self.prefix + "_hist": pd.Series(macd - signal, index=self.df.index),
+        }
+
+
+class ATR(IndicatorSeries):
+    """Average True Range, the Wilder's moving average of the true range, which measures volatility.
+    The true range of the first data point is high - low.
+
+    See Also:
+        https://en.wikipedia.org/wiki/Average_true_range
+    """
+
+    _metadata = IndicatorSeries._metadata + ['n_point']
+
+    def __init__(self, data_frame, n_point=14, name=None):
+        self.n_point = n_point
+        IndicatorSeries.__init__(self, data_frame, name)
+
+    def default_name(self):
+        return 'ATR_%s' % self.n_point
+
+    @staticmethod
+    def true_range(data_frame):
+        """Calculates the true range in ascending order.
+        """
+        high = rolling.ascending(data_frame, "high")
+        low = rolling.ascending(data_frame, "low")
+        previous_close = np.roll(rolling.ascending(data_frame, "close"), 1)
+        true_range = np.maximum(high, previous_close) - np.minimum(low, previous_close)
+        if len(true_range):
+            true_range[0] = high[0] - low[0]
+        return true_range
+
+    def calculate(self):
+        values = cache.get(
+            self.df, "ATR", (self.n_point, ), "high/low/close",
+            lambda: rolling.wilder_mean(self.true_range(self.df), self.n_point)[::-1]
+        )
+        return pd.Series(values, index=self.df.index)
+
+
+class Stochastic(IndicatorDataFrame):
+    """Stochastic Oscillator, including 2 columns:
+        STOCH_k: %K, the position of the close relative to the high-low range of the last n_point data points.
+        STOCH_d: %D, the simple moving average of %K over d_point data points.
+
+    See Also:
+        https://en.wikipedia.org/wiki/Stochastic_oscillator
+    """
+
+    _metadata = IndicatorDataFrame._metadata + ['n_point', 'd_point', 'prefix']
+
+    def __init__(self, data_frame, n_point=14, d_point=3, prefix="STOCH"):
+        self.n_point = n_point
+        self.d_point = d_point
+        self.prefix = prefix
+        IndicatorDataFrame.__init__(self, data_frame)
+
+    def calculate(self):
+        def stochastic():
+            close = rolling.ascending(self.df, "close")
+            highest = rolling.rolling_max(rolling.ascending(self.df, "high"), self.n_point)
+            lowest = rolling.rolling_min(rolling.ascending(self.df, "low"), self.n_point)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                k = 100.0 * (close - lowest) / (highest - lowest)
+            return np.stack([k, rolling.rolling_mean(k, self.d_point)])[:, ::-1]
+        k, d = cache.get(self.df, "STOCH", (self.n_point, self.d_point), "high/low/close", stochastic)
+        return {
+            self.prefix + "_k": pd.Series(k, index=self.df.index),
+            self.prefix + "_d": pd.Series(d, index=self.df.index),
+        }
+
+
+class OBV(IndicatorSeries):
+    """On-Balance Volume, the cumulative volume added on up days and subtracted on down days.
+    The OBV of the first data point is 0.
+
+    See Also:
+        https://en.wikipedia.org/wiki/On-balance_volume
+    """
+
+    def default_name(self):
+        return 'OBV'
+
+    def calculate(self):
+        def obv():
+            close = rolling.ascending(self.df, "close")
+            volume = rolling.ascending(self.df, "volume").astype(float)
+            direction = np.sign(np.diff(close, prepend=close[:1]))
+            return np.cumsum(direction * volume)[::-1]
+        values = cache.get(self.df, "OBV", (), "close/volume", obv)
+        return pd.Series(values, index=self.df.index)
+
+
+class VWAP(IndicatorSeries):
+    """Volume Weighted Average Price, the cumulative average of the typical price (high + low + close) / 3,
+        weighted by volume.
+
+    Args:
+        session (str, optional): A pandas frequency (e.g. "D") to reset the cumulation at each period,
+            which is commonly used for intraday data.
+            Defaults to None, i.e. the average is cumulated from the first data point.
+
+    See Also:
+        https://en.wikipedia.org/wiki/Volume-weighted_average_price
+    """
+
+    _metadata = IndicatorSeries._metadata + ['session']
+
+    def __init__(self, data_frame, session=None, name=None):
+        self.session = session
+        IndicatorSeries.__init__(self, data_frame, name)
+
+    def default_name(self):
+        return 'VWAP'
+
+    def calculate(self):
+        def vwap():
+            high = rolling.ascending(self.df, "high")
+            low = rolling.ascending(self.df, "low")
+            close = rolling.ascending(self.df, "close")
+            volume = rolling.ascending(self.df, "volume").astype(float)
+            price_volume = np.cumsum((high + low + close) / 3.0 * volume)
+            total_volume = np.cumsum(volume)
+            if self.session and len(volume):
+                periods = self.df.index[::-1].floor(self.session).asi8
+                starts = np.flatnonzero(np.diff(periods, prepend=periods[0] - 1))
+                # Position of the first data point of the session, for each data point
+                session_start = starts[np.searchsorted(starts, np.arange(len(volume)), side="right") - 1]
+                price_volume = price_volume - np.concatenate([[0.0], price_volume])[session_start]
+                total_volume = total_volume - np.concatenate([[0.0], total_volume])[session_start]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return (price_volume / total_volume)[::-1]
+        values = cache.get(self.df, "VWAP", (self.session, ), "high/low/close/volume", vwap)
+        return pd.Series(values, index=self.df.index)
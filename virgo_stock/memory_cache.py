@@ -0,0 +1,215 @@
+"""Contains classes for caching data in memory.
+
+MemoryCache is a size-bounded LRU cache with expiration time for each entry.
+CachedDataSource wraps a DataSourceInterface and keeps the results in a MemoryCache,
+    so that repeated queries in a long-running process do not go back to the data source.
+"""
+import sys
+import datetime
+import logging
+import threading
+import pandas as pd
+from collections import OrderedDict
+from .series import slice_time
+from .source import DataSourceInterface
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """A thread-safe least recently used (LRU) cache bounded by the total size (in bytes) of the values.
+
+    Each entry may have an expiration time (TTL). Expired entries are removed when they are accessed.
+    When the total size exceeds max_bytes, the least recently used entries will be evicted.
+
+    Attributes:
+        max_bytes (int): Max total size of the cached values.
+        size (int): Total size of the cached values.
+        hits (int): Number of get() calls returning cached value.
+        misses (int): Number of get() calls returning None.
+        evictions (int): Number of entries evicted due to the size limit.
+
+    """
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        """Initializes a memory cache.
+
+        Args:
+            max_bytes (int, optional): Max total size of the cached values. Defaults to 512MB.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Maps key to (value, size, expiration time)
+        self.__entries = OrderedDict()
+        self.__lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            return entry is not None and not self.__expired(entry)
+
+    @staticmethod
+    def __expired(entry):
+        expiration = entry[2]
+        return expiration is not None and expiration <= datetime.datetime.now()
+
+    @staticmethod
+    def sizeof(value):
+        """Estimates the size of a value in bytes.
+        """
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(deep=True).sum())
+        if isinstance(value, pd.Series):
+            return int(value.memory_usage(deep=True))
+        return sys.getsizeof(value)
+
+    def get(self, key, default=None):
+        """Gets a value from the cache and marks it as most recently used.
+
+        Returns: The cached value, or default if the key is not in the cache or the value is expired.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and self.__expired(entry):
+                self.__remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, ttl=None):
+        """Puts a value into the cache.
+        Values larger than max_bytes will not be cached.
+
+        Args:
+            key: A hashable key.
+            value: The value to be cached.
+            ttl (datetime.timedelta, optional): Time to live. Defaults to None (never expire).
+        """
+        size = self.sizeof(value)
+        expiration = datetime.datetime.now() + ttl if ttl is not None else None
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+            if size > self.max_bytes:
+                logger.debug("Value of %s bytes is too large to be cached." % size)
+                return
+            self.__entries[key] = (value, size, expiration)
+            self.size += size
+            while self.size > self.max_bytes:
+                oldest = next(iter(self.__entries))
+                logger.debug("Evicting %s from memory cache..." % str(oldest))
+                self.__remove(oldest)
+                self.evictions += 1
+
+    def __remove(self, key):
+        entry = self.__entries.pop(key)
+        self.size -= entry[1]
+
+    def invalidate(self, key=None):
+        """Removes an entry from the cache. All entries will be removed if key is None.
+        """
+        with self.__lock:
+            if key is None:
+                self.__entries.clear()
+                self.size = 0
+            elif key in self.__entries:
+                self.__remove(key)
+
+    def stats(self):
+        """Gets the statistics of the cache as a dictionary.
+        """
+        return {
+            "entries": len(self.__entries),
+            "size": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class CachedDataSource(DataSourceInterface):
+    """Implements the DataSourceInterface by caching the results of another data source in memory.
+
+    The full daily history of each symbol is requested from the data source once
+        and daily series of any date range are sliced from the cached data.
+    Intraday series are cached by symbol and date.
+
+    The expiration time of the cached data follows the data source,
+        i.e. the daily_cache_expiration (days) and intraday_cache_expiration (minutes) attributes.
+    Intraday data of past days never expires.
+    Use the "cache" attribute to access the statistics (hits and misses) or invalidate the data.
+
+    """
+    date_fmt = "%Y-%m-%d"
+
+    def __init__(self, data_source, max_bytes=512 * 1024 * 1024):
+        """Initializes the data source.
+
+        Args:
+            data_source (DataSourceInterface): The data source providing the data.
+            max_bytes (int, optional): Max total size of the data cached in memory. Defaults to 512MB.
+        """
+        self.data_source = data_source
+        self.cache = MemoryCache(max_bytes)
+        # Expiration time for daily cache data (days)
+        self.daily_cache_expiration = getattr(data_source, "daily_cache_expiration", 1)
+        # Expiration time for intraday cache data (minutes)
+        self.intraday_cache_expiration = getattr(data_source, "intraday_cache_expiration", 30)
+
+    def __daily_data(self, symbol):
+        """Gets the full daily series data of a symbol.
+        """
+        today = datetime.datetime.now().strftime(self.date_fmt)
+        key = (str(symbol).upper(), "daily", today)
+        df = self.cache.get(key)
+        if df is None:
+            df = self.data_source.get_daily_series(symbol)
+            self.cache.put(key, df, datetime.timedelta(days=self.daily_cache_expiration))
+        return df
+
+    def get_daily_series(self, symbol, start=None, end=None):
+        """Gets a pandas data frame of daily stock data.
+
+        Args:
+            symbol: The symbol of the equity/stock, e.g. AAPL.
+            start: Starting date for the time series, e.g. 2017-01-21.
+            end: Ending date for the time series, e.g. 2017-02-22.
+
+        Returns: A pandas data frame of daily series data.
+        """
+        df = slice_time(self.__daily_data(symbol), start, end).copy()
+        df.symbol = symbol
+        return df
+
+    def get_intraday_series(self, symbol, date=None):
+        """Gets a pandas data frame of intraday stock data.
+
+        Args:
+            symbol (str): The name of the equity/stock.
+            date (str, optional): Date, e.g. 2017-02-12. Defaults to None.
+
+        Returns: A pandas data frame of intraday series data.
+        """
+        today = datetime.datetime.now().strftime(self.date_fmt)
+        key = (str(symbol).upper(), "intraday", date)
+        df = self.cache.get(key)
+        if df is None:
+            df = self.data_source.get_intraday_series(symbol, date)
+            if df is None:
+                return None
+            ttl = None
+            if date is None or date >= today:
+                ttl = datetime.timedelta(minutes=self.intraday_cache_expiration)
+            self.cache.put(key, df, ttl)
+        df = df.copy()
+        df.symbol = symbol
+        return df
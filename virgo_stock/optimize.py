@@ -0,0 +1,296 @@
+"""Contains functions for optimizing the parameters of trading strategies.
+
+sweep() evaluates a strategy with every combination of parameters in a grid,
+    on multiple stocks and optionally multiple time windows,
+    and returns a table of the results ranked by a metric (e.g. profit).
+walk_forward() selects the best parameters in each window and evaluates them in the following window.
+
+The evaluations run in a process pool.
+The stock data are copied into shared memory once, instead of being pickled for every evaluation.
+Each worker process attaches the shared memory and builds the data frames once,
+    so that indicators cached for a data frame (see indicators.IndicatorCache) are reused across parameters.
+
+The strategy class must be importable by the worker processes, i.e. defined at the top level of a module.
+Strategies are initialized with Strategy.from_parameters(), which sub-classes can override
+    to derive the initialization arguments from the parameters, e.g. GoldenCrossStrategy.
+
+Example:
+    results = sweep(
+        GoldenCrossStrategy,
+        {"short_term": [20, 50], "long_term": [100, 200], "initial_cash": [5000]},
+        ["AAPL", "MSFT"],
+        data_source=data_source
+    )
+
+"""
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from .stock import DataSeries
+from .universe import StockUniverse
+logger = logging.getLogger(__name__)
+
+fields = ["open", "high", "low", "close", "volume"]
+
+# Data frames in a worker process, keyed by name.
+_frames = {}
+# Shared memory blocks attached by a worker process.
+_blocks = []
+
+
+def parameter_grid(grid):
+    """Expands a parameter grid to a list of parameter combinations.
+
+    Args:
+        grid (dict): A dictionary mapping parameter names to lists of values.
+
+    Returns:
+        list: A list of dictionaries, each is a combination of parameters.
+    """
+    names = list(grid.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*[grid[name] for name in names])]
+
+
+def split_windows(n_rows, n_windows):
+    """Splits the time points of a data frame into consecutive windows with (almost) equal length.
+
+    Args:
+        n_rows (int): Number of rows in the data frame.
+        n_windows (int): Number of windows.
+
+    Returns:
+        list: A list of (from_t, to_t) tuples in chronological order, to_t is excluded.
+
+    Raises:
+        ValueError: n_rows is less than n_windows, i.e. some windows would be empty.
+    """
+    if n_windows < 1 or n_rows < n_windows:
+        raise ValueError("Cannot split %s rows into %s windows." % (n_rows, n_windows))
+    bounds = np.linspace(1 - n_rows, 1, n_windows + 1).round().astype(int)
+    return [(int(bounds[i]), int(bounds[i + 1])) for i in range(n_windows)]
+
+
+def load_frames(data, data_source=None, start=None, end=None):
+    """Gets the data frames to be used in an optimization.
+
+    Args:
+        data: A dictionary mapping names to data frames, a list of data frames,
+            a list of symbols to be loaded from data_source, or a StockUniverse.
+
+    Returns:
+        dict: A dictionary mapping names to data frames.
+    """
+    if isinstance(data, dict):
+        return dict(data)
+    if isinstance(data, StockUniverse):
+        return {symbol: data.series(symbol) for symbol in data.symbols if symbol not in data.failed}
+    data = list(data)
+    if all(isinstance(item, pd.DataFrame) for item in data):
+        return {getattr(df, "symbol", None) or str(i): df for i, df in enumerate(data)}
+    universe = StockUniverse(data, data_source).load(start, end)
+    return load_frames(universe)
+
+
+def evaluate(strategy_class, df, parameters, windows):
+    """Evaluates a strategy with a combination of parameters in each time window.
+    The vectorized Strategy.backtest() is used if the strategy implements signals(),
+        otherwise Strategy.evaluate() is used.
+
+    Args:
+        strategy_class: A sub-class of Strategy.
+        df (pandas.DataFrame): The stock data.
+        parameters (dict): Parameters for initializing the strategy with from_parameters().
+        windows: A list of (from_t, to_t) tuples, or the number of windows to be split from the data.
+
+    Returns:
+        list: A list of dictionaries, each contains the results of a time window,
+            including the position of the window in the list of windows.
+    """
+    if isinstance(windows, int):
+        windows = split_windows(len(df), windows)
+    rows = []
+    for window, (from_t, to_t) in enumerate(windows):
+        if from_t is None:
+            from_t = 1 - len(df)
+        strategy = strategy_class.from_parameters(df, **parameters)
+        try:
+            profit = strategy.backtest(from_t, to_t)
+        except NotImplementedError:
+            strategy = strategy_class.from_parameters(df, **parameters)
+            profit = strategy.evaluate(from_t, to_t)
+        curve = strategy.equity_curve(from_t, to_t)["value"].to_numpy()[::-1]
+        drawdown = np.max(np.maximum.accumulate(curve) - curve) if len(curve) else 0.0
+        rows.append({
+            "window": window,
+            "from_t": from_t,
+            "to_t": to_t,
+            "profit": profit,
+            "value": curve[-1] if len(curve) else strategy.initial_cash,
+            "trades": len(strategy.trading_history),
+            "max_drawdown": drawdown,
+        })
+    return rows
+
+
+def _attach(specs):
+    """Initializes a worker process by building the data frames from shared memory.
+    """
+    for name, (values_name, index_name, n_rows) in specs.items():
+        values_block = shared_memory.SharedMemory(name=values_name)
+        index_block = shared_memory.SharedMemory(name=index_name)
+        _blocks.extend([values_block, index_block])
+        values = np.ndarray((n_rows, len(fields)), dtype=np.float64, buffer=values_block.buf)
+        index = np.ndarray((n_rows, ), dtype=np.int64, buffer=index_block.buf)
+        _frames[name] = DataSeries(
+            values, index=pd.DatetimeIndex(index.view("datetime64[ns]"), name="timestamp"),
+            columns=fields, copy=False
+        )
+
+
+def _run(task):
+    name, strategy_class, combination, parameters, windows = task
+    rows = evaluate(strategy_class, _frames[name], parameters, windows)
+    for row in rows:
+        row.update(parameters)
+        row["name"] = name
+        row["combination"] = combination
+    return rows
+
+
+def _share(frames):
+    """Copies the data frames into shared memory blocks.
+
+    Returns:
+        (dict, list): The specifications for attaching the blocks, and the blocks created.
+    """
+    specs = {}
+    blocks = []
+    for name, df in frames.items():
+        n_rows = len(df)
+        values_block = shared_memory.SharedMemory(create=True, size=max(1, n_rows * len(fields) * 8))
+        blocks.append(values_block)
+        index_block = shared_memory.SharedMemory(create=True, size=max(1, n_rows * 8))
+        blocks.append(index_block)
+        values = np.ndarray((n_rows, len(fields)), dtype=np.float64, buffer=values_block.buf)
+        for j, field in enumerate(fields):
+            values[:, j] = df[field].to_numpy(dtype=float) if field in df.columns else np.nan
+        index = np.ndarray((n_rows, ), dtype=np.int64, buffer=index_block.buf)
+        index[:] = pd.DatetimeIndex(df.index).values.astype("datetime64[ns]").view(np.int64)
+        specs[name] = (values_block.name, index_block.name, n_rows)
+    return specs, blocks
+
+
+def rank(results, metric="profit"):
+    """Ranks the results by a metric within each data frame and time window, 1 being the best.
+    """
+    results = results.copy()
+    results["rank"] = results.groupby(["name", "window"])[metric].rank(ascending=False, method="min")
+    results["rank"] = results["rank"].astype(int)
+    return results.sort_values(["name", "window", "rank"], kind="stable").reset_index(drop=True)
+
+
+def sweep(strategy_class, grid, data, windows=None, metric="profit", max_workers=None,
+          data_source=None, start=None, end=None):
+    """Evaluates a strategy with every combination of parameters in a grid.
+
+    Args:
+        strategy_class: A sub-class of Strategy, defined at the top level of a module.
+        grid (dict): A dictionary mapping parameter names to lists of values.
+            The parameters are passed to strategy_class.from_parameters().
+        data: A dictionary mapping names to data frames, a list of data frames,
+            a list of symbols to be loaded from data_source, or a StockUniverse.
+        windows (optional): A list of (from_t, to_t) tuples, or the number of consecutive windows to split the data.
+            Defaults to None, i.e. the whole data.
+        metric (str, optional): The metric for ranking the results in descending order. Defaults to "profit".
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            The evaluations run in the current process if max_workers is 1.
+        data_source (DataSourceInterface, optional): The data source for loading symbols.
+        start, end (optional): The date range for loading symbols.
+
+    Returns:
+        pandas.DataFrame: The results with columns name, the parameters, combination, window, from_t, to_t,
+            profit, value, trades, max_drawdown and rank.
+            combination is the position of the parameters in parameter_grid(grid),
+            and window is the position of the time window in windows.
+    """
+    frames = load_frames(data, data_source, start, end)
+    if windows is None:
+        windows = [(None, 1)]
+    combinations = parameter_grid(grid)
+    tasks = [
+        (name, strategy_class, combination, parameters, windows)
+        for name in frames for combination, parameters in enumerate(combinations)
+    ]
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    rows = []
+    if max_workers <= 1 or len(tasks) <= 1:
+        for name, _, combination, parameters, _ in tasks:
+            for row in evaluate(strategy_class, frames[name], parameters, windows):
+                row.update(parameters)
+                row["name"] = name
+                row["combination"] = combination
+                rows.append(row)
+    else:
+        specs, blocks = _share(frames)
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach, initargs=(specs, )) as executor:
+                chunk_size = max(1, len(tasks) // (max_workers * 4))
+                for task_rows in executor.map(_run, tasks, chunksize=chunk_size):
+                    rows.extend(task_rows)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    columns = ["name"] + list(grid.keys()) + [
+        "combination", "window", "from_t", "to_t", "profit", "value", "trades", "max_drawdown"
+    ]
+    return rank(pd.DataFrame(rows, columns=columns), metric)
+
+
+def walk_forward(strategy_class, grid, data, n_windows=4, metric="profit", **kwargs):
+    """Walk-forward optimization.
+    The data of each stock is split into n_windows + 1 consecutive windows.
+    The parameters with the best metric in each window (in-sample)
+        are evaluated in the following window (out-of-sample).
+
+    Args:
+        strategy_class: A sub-class of Strategy, defined at the top level of a module.
+        grid (dict): A dictionary mapping parameter names to lists of values.
+        data: A dictionary mapping names to data frames, a list of data frames,
+            a list of symbols to be loaded from data_source, or a StockUniverse.
+        n_windows (int, optional): Number of out-of-sample windows. Defaults to 4.
+        metric (str, optional): The metric for selecting the parameters. Defaults to "profit".
+        Additional keyword arguments are passed to sweep().
+
+    Returns:
+        pandas.DataFrame: A data frame with a row for each stock and out-of-sample window, including
+            name, the selected parameters, from_t, to_t, the in-sample metric and the out-of-sample results.
+
+    Raises:
+        ValueError: A data frame has less than n_windows + 1 rows.
+    """
+    results = sweep(strategy_class, grid, data, windows=n_windows + 1, metric=metric, **kwargs)
+    parameters = list(grid.keys())
+    rows = []
+    for name, group in results.groupby("name", sort=False):
+        for window in range(n_windows):
+            # The results are sorted by rank in each window.
+            best = group[group["window"] == window].iloc[0]
+            selected = group[group["window"] == window + 1]
+            # Parameters are matched by the position in the grid, as None or NaN values are not equal in pandas.
+            test = selected[selected["combination"] == best["combination"]].iloc[0]
+            row = {"name": name}
+            row.update({parameter: best[parameter] for parameter in parameters})
+            row.update({
+                "from_t": test["from_t"],
+                "to_t": test["to_t"],
+                "in_sample_" + metric: best[metric],
+            })
+            row.update({key: test[key] for key in ["profit", "value", "trades", "max_drawdown"]})
+            rows.append(row)
+    return pd.DataFrame(rows)
@@ -1,18 +1,182 @@
+"""Contains functions and patterns for finding price patterns in stock data.
+
+A Pattern is declared as a vectorized expression over the columns of the stock data,
+    which is evaluated for all rows in one pass, instead of calling a Python function for each row.
+The expression takes a dictionary mapping column names (open, high, low, close, volume) to arrays,
+    and returns a boolean array with the same shape.
+As the data is stored in reverse order, previous(values, n) gets the values n rows earlier.
+
+The arrays can be 1-D (a data frame of a stock) or 2-D (timestamps x symbols, see StockUniverse),
+    so that patterns can be scanned on many stocks at once.
+
+Example:
+    gap_up = Pattern("gap_up", lambda data: data["low"] > previous(data["high"]))
+    results = scan(df, [gap_up, inside_bar])
+
+"""
+import numpy as np
+import pandas as pd
+from .indicators import cache
+from .universe import StockUniverse
+
+
+def previous(values, n=1):
+    """Gets the values n rows earlier, for data in reverse order.
+    The last n rows (which have no earlier data) are NaN.
+
+    Args:
+        values (numpy.ndarray): 1-D or 2-D array in reverse order.
+        n (int, optional): Number of rows. Defaults to 1.
+
+    Returns:
+        numpy.ndarray: An array with the same shape as values.
+    """
+    result = np.full(values.shape, np.nan)
+    if n < len(values):
+        result[:len(values) - n] = values[n:]
+    return result
+
+
+def columns(data):
+    """Gets the columns of stock data as a dictionary of float arrays.
+
+    Args:
+        data: A pandas data frame, a StockUniverse or a dictionary of arrays.
+
+    Returns:
+        dict: A dictionary mapping column names to arrays.
+    """
+    if isinstance(data, StockUniverse):
+        return data.data
+    if isinstance(data, pd.DataFrame):
+        return {column: data[column].to_numpy(dtype=float) for column in data.columns if column in Pattern.fields}
+    return data
+
+
+class Pattern:
+    """Represents a pattern declared as a vectorized expression.
+
+    Attributes:
+        name (str): The name of the pattern.
+        expression: A function taking a dictionary of column arrays and returning a boolean array.
+    """
+    fields = ["open", "high", "low", "close", "volume"]
+
+    def __init__(self, name, expression):
+        self.name = name
+        self.expression = expression
+
+    def evaluate(self, data):
+        """Evaluates the pattern for all rows.
+
+        Args:
+            data: A pandas data frame, a StockUniverse or a dictionary of arrays.
+
+        Returns:
+            numpy.ndarray: A boolean array, True if the pattern is found at the row.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.asarray(self.expression(columns(data)), dtype=bool)
+
+    def __call__(self, df, i):
+        """Checks if the pattern is found at row i, for compatibility with row functions in find_pattern().
+        The pattern is evaluated for all rows of a data frame once,
+            and the results are memoized in the indicator cache for checking other rows.
+        The memoized results are keyed by the buffers of the columns,
+            so the pattern is evaluated again after a column of the data frame is replaced.
+        """
+        if isinstance(df, pd.DataFrame):
+            values = cache.get(df, "Pattern", (self.name, self.expression), "/".join(self.fields),
+                               lambda: self.evaluate(df))
+            return bool(values[i])
+        return bool(self.evaluate(df)[i])
+
+    def __repr__(self):
+        return "Pattern(%s)" % self.name
+
+
+def drop_more_than(percent):
+    """Creates a pattern, which the low is more than a percentage lower than the previous close.
+
+    Args:
+        percent (float): The percentage, e.g. 5 for 5%.
+    """
+    def expression(data):
+        previous_close = previous(data["close"])
+        return (previous_close - data["low"]) / previous_close > percent / 100.0
+    return Pattern("drop_more_than_%s_percent" % percent, expression)
+
+
+drop_more_than_five_percent = drop_more_than(5)
+gap_up = Pattern("gap_up", lambda data: data["low"] > previous(data["high"]))
+gap_down = Pattern("gap_down", lambda data: data["high"] < previous(data["low"]))
+inside_bar = Pattern(
+    "inside_bar",
+    lambda data: (data["high"] < previous(data["high"])) & (data["low"] > previous(data["low"]))
+)
+outside_bar = Pattern(
+    "outside_bar",
+    lambda data: (data["high"] > previous(data["high"])) & (data["low"] < previous(data["low"]))
+)
+bullish_engulfing = Pattern(
+    "bullish_engulfing",
+    lambda data: (
+        (previous(data["close"]) < previous(data["open"]))
+        & (data["close"] > data["open"])
+        & (data["open"] <= previous(data["close"]))
+        & (data["close"] >= previous(data["open"]))
+    )
+)
+bearish_engulfing = Pattern(
+    "bearish_engulfing",
+    lambda data: (
+        (previous(data["close"]) > previous(data["open"]))
+        & (data["close"] < data["open"])
+        & (data["open"] >= previous(data["close"]))
+        & (data["close"] <= previous(data["open"]))
+    )
+)
+patterns = [
+    drop_more_than_five_percent, gap_up, gap_down, inside_bar, outside_bar, bullish_engulfing, bearish_engulfing
+]
+
+
+def scan(data, pattern_list=None):
+    """Scans multiple patterns in stock data.
+
+    Args:
+        data: A pandas data frame of a stock, or a StockUniverse of multiple stocks.
+        pattern_list (list, optional): A list of Pattern objects. Defaults to all patterns in this module.
+
+    Returns: For a data frame, a boolean data frame with the same index and a column for each pattern.
+        For a StockUniverse, a dictionary mapping each pattern name to a boolean data frame of timestamps x symbols.
+    """
+    if pattern_list is None:
+        pattern_list = patterns
+    arrays = columns(data)
+    if isinstance(data, StockUniverse):
+        return {
+            pattern.name: pd.DataFrame(pattern.evaluate(arrays), index=data.timestamps, columns=data.symbols)
+            for pattern in pattern_list
+        }
+    return pd.DataFrame({pattern.name: pattern.evaluate(arrays) for pattern in pattern_list}, index=data.index)
+
 
-    
 def find_pattern(df, pattern_func):
+    """Finds the rows matching a pattern.
+
+    Args:
+        df (pandas.DataFrame): Stock data in reverse order.
+        pattern_func: A Pattern, or a function taking (df, i) and returning True if the pattern is found at row i.
+            A Pattern is evaluated for all rows at once.
+
+    Returns:
+        list: A list of row positions.
+    """
+    if isinstance(pattern_func, Pattern):
+        return np.flatnonzero(pattern_func.evaluate(df)).tolist()
     points = []
     for i in range(len(df)):
         if pattern_func(df, i):
             points.append(i)
     return points
-
-
-def drop_more_than_five_percent(df, i):
-    if i + 1 >= len(df):
-        return False
-    prev = df.iloc[i + 1]['close']
-    low = df.iloc[i]['low']
-    if (prev - low) / prev > 0.05:
-        return True
-    return False
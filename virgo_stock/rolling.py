@@ -0,0 +1,114 @@
+"""Contains functions for calculating moving window statistics on NumPy arrays in ascending order.
+
+Data frames in this package store data in reverse order, i.e. the first row is the latest data.
+Moving window calculations must be done in chronological (ascending) order.
+Reversing a pandas series with [::-1] creates a new series and a new index,
+    and the result must be reversed again (another series and index) to align with the data frame.
+Instead, the functions here operate on ascending views of the underlying arrays.
+Reversing a NumPy array with [::-1] creates a view without copying the data,
+    so a calculation costs only the allocation of the result.
+
+The functions accept 1-D arrays or 2-D arrays (timestamps x columns) in ascending order,
+    and calculate along the first axis with the window functions of pandas,
+    i.e. the results are the same as rolling() and ewm() of pandas.
+
+Example:
+    # Simple moving average of the close prices of a DataSeries, in reverse order.
+    values = rolling_mean(ascending(df, "close"), 20)[::-1]
+
+"""
+import numpy as np
+import pandas as pd
+
+
+def ascending(data_frame, column):
+    """Gets the values of a column in ascending (chronological) order.
+
+    Args:
+        data_frame (pandas.DataFrame): Data frame with data in reverse order.
+        column (str): The column name.
+
+    Returns:
+        numpy.ndarray: A view of the values in ascending order.
+            The view shares memory with the data frame when the column is stored as a NumPy array.
+    """
+    return data_frame[column].to_numpy()[::-1]
+
+
+def wrap(values):
+    """Wraps an array as a pandas series (1-D) or data frame (2-D) without copying the values.
+    The index is a RangeIndex, which is not reversed or aligned in the calculations.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        return pd.Series(values, copy=False)
+    return pd.DataFrame(values, copy=False)
+
+
+def rolling_mean(values, n_point):
+    """Calculates the simple moving average, same as pandas rolling(n_point).mean().
+
+    Args:
+        values (numpy.ndarray): 1-D or 2-D array in ascending order.
+        n_point (int): The number of data points in each window.
+
+    Returns:
+        numpy.ndarray: The moving averages in ascending order, with the same shape as values.
+            The first n_point - 1 rows are NaN.
+    """
+    return wrap(values).rolling(n_point).mean().to_numpy()
+
+
+def rolling_std(values, n_point):
+    """Calculates the moving standard deviation, same as pandas rolling(n_point).std().
+
+    Args:
+        values (numpy.ndarray): 1-D or 2-D array in ascending order.
+        n_point (int): The number of data points in each window.
+
+    Returns:
+        numpy.ndarray: The moving standard deviations in ascending order, with the same shape as values.
+            The first n_point - 1 rows are NaN.
+    """
+    return wrap(values).rolling(n_point).std().to_numpy()
+
+
+def ewm_mean(values, span):
+    """Calculates the exponential moving average, same as pandas ewm(span=span).mean().
+
+    Args:
+        values (numpy.ndarray): 1-D or 2-D array in ascending order.
+        span (float): The span of the exponential weights.
+
+    Returns:
+        numpy.ndarray: The exponential moving averages in ascending order, with the same shape as values.
+    """
+    return wrap(values).ewm(span=span).mean().to_numpy()
+
+
+def rolling_max(values, n_point):
+    """Calculates the moving maximum, same as pandas rolling(n_point).max().
+    """
+    return wrap(values).rolling(n_point).max().to_numpy()
+
+
+def rolling_min(values, n_point):
+    """Calculates the moving minimum, same as pandas rolling(n_point).min().
+    """
+    return wrap(values).rolling(n_point).min().to_numpy()
+
+
+def wilder_mean(values, n_point):
+    """Calculates the Wilder's moving average (smoothed moving average) used by RSI and ATR.
+    The first average is the simple mean of the first n_point values,
+        and each following average is an exponential moving average with alpha = 1 / n_point, i.e.
+        average = previous average + (value - previous average) / n_point.
+    The first n_point - 1 rows are NaN.
+    """
+    values = np.array(values, dtype=float)
+    if len(values) < n_point:
+        return np.full(values.shape, np.nan)
+    seeded = values.copy()
+    seeded[:n_point - 1] = np.nan
+    seeded[n_point - 1] = values[:n_point].mean(axis=0)
+    return wrap(seeded).ewm(alpha=1.0 / n_point, adjust=False).mean().to_numpy()
@@ -6,7 +6,7 @@ All sub-classes of pandas DataFrame/Series must define properties in _metadata o
 See also: https://pandas.pydata.org/pandas-docs/stable/development/extending.html
 
 """
-from pandas import Series, DataFrame
+from pandas import Series, DataFrame, Timestamp
 
 
 class TimeSeries(Series):
@@ -28,3 +28,30 @@ class TimeDataFrame(DataFrame):
     @property
     def _constructor_sliced(self):
         return TimeSeries
+
+
+def slice_time(data, start=None, end=None):
+    """Selects the rows between start and end (inclusive) from data in reverse order.
+    The rows are located by binary search on the timestamp index.
+
+    Args:
+        data (pandas.DataFrame or pandas.Series): Data with timestamp as index.
+            The first row should contain the latest data.
+        start (str or datetime, optional): Starting date, e.g. 2017-01-21. Defaults to None.
+        end (str or datetime, optional): Ending date, e.g. 2017-02-22. Defaults to None.
+            If start or end is None, the selection will not be bounded on that side.
+
+    Returns: A slice of the data, in reverse order.
+    """
+    n = len(data)
+    # Timestamps in ascending order, this is a view of the index values.
+    timestamps = data.index.values[::-1]
+    low = timestamps.searchsorted(to_datetime64(start), side="left") if start is not None else 0
+    high = timestamps.searchsorted(to_datetime64(end), side="right") if end is not None else n
+    return data.iloc[n - high:n - low]
+
+
+def to_datetime64(value):
+    """Converts a date string or datetime object to numpy datetime64.
+    """
+    return Timestamp(value).to_datetime64()
@@ -1,7 +1,17 @@
 import os
+import io
+import json
+import tempfile
+import threading
+import contextlib
+import numpy as np
 import pandas as pd
 import datetime
 import logging
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 from Aries.storage import StorageFolder, StorageFile
 from .alpha_vantage import AlphaVantageAPI
 from .stock import Stock
@@ -67,6 +77,383 @@ class DataSourceInterface:
         return Stock(symbol, self)
 
 
+class CacheSerializer:
+    """Reads and writes cached data frames.
+
+    This is the base class for cache file formats.
+    Each sub-class handles files with a particular extension.
+    The data frames are stored without index.
+    Both dump() and load() operates on file objects, which are opened in binary mode
+        if the "binary" attribute is True.
+
+    Sub-classes must implement:
+        1. dump(), to write a data frame to a file object.
+        2. load(), to read a data frame from a file object.
+
+    """
+    extension = None
+    binary = False
+
+    @staticmethod
+    def available():
+        """Checks if the dependencies of this serializer are installed.
+        """
+        return True
+
+    def dump(self, df, f):
+        raise NotImplementedError()
+
+    def load(self, f):
+        raise NotImplementedError()
+
+    @staticmethod
+    def from_extension(extension):
+        """Gets a serializer for files with a particular extension.
+
+        Args:
+            extension (str): File extension including ".", e.g. ".csv".
+                Files without extension are considered as CSV files.
+
+        Returns:
+            CacheSerializer: A serializer instance, or None if the extension is not supported.
+        """
+        if not extension:
+            return CSVSerializer()
+        for serializer_class in serializer_classes:
+            if serializer_class.extension == extension and serializer_class.available():
+                return serializer_class()
+        return None
+
+
+class CSVSerializer(CacheSerializer):
+    """Stores data frame as CSV file.
+    CSV files are human readable but slow to load, mainly because of parsing the dates.
+    """
+    extension = ".csv"
+
+    def dump(self, df, f):
+        df.to_csv(f)
+
+    def load(self, f):
+        return pd.read_csv(f, index_col=0, parse_dates=['timestamp'])
+
+
+class NumpySerializer(CacheSerializer):
+    """Stores data frame as a bundle of NumPy arrays (.npz file), one array for each column.
+    The column names are stored in the "columns" array.
+    Timestamps are stored as datetime64, so that no parsing is needed when loading.
+    Object columns are stored as strings, with the missing values marked in a "null" array of the column.
+    """
+    extension = ".npz"
+    binary = True
+
+    def dump(self, df, f):
+        arrays = {"columns": np.array([str(column) for column in df.columns])}
+        for i, column in enumerate(df.columns):
+            values = df[column].to_numpy()
+            if values.dtype == object:
+                nulls = pd.isna(values)
+                if nulls.any():
+                    arrays["null_%d" % i] = nulls
+                values = values.astype(str)
+            arrays["column_%d" % i] = values
+        np.savez(f, **arrays)
+
+    def load(self, f):
+        # np.load() requires a seekable file object.
+        with np.load(io.BytesIO(f.read()), allow_pickle=False) as data:
+            columns = data["columns"].tolist()
+            values = {}
+            for i, column in enumerate(columns):
+                values[column] = data["column_%d" % i]
+                if "null_%d" % i in data:
+                    values[column] = values[column].astype(object)
+                    values[column][data["null_%d" % i]] = np.nan
+            return pd.DataFrame(values, columns=columns)
+
+
+class ParquetSerializer(CacheSerializer):
+    """Stores data frame as Apache Parquet file. This requires pyarrow.
+    """
+    extension = ".parquet"
+    binary = True
+
+    @staticmethod
+    def available():
+        try:
+            import pyarrow
+        except ImportError:
+            return False
+        return True
+
+    def dump(self, df, f):
+        df.reset_index(drop=True).to_parquet(f)
+
+    def load(self, f):
+        return pd.read_parquet(io.BytesIO(f.read()))
+
+
+class FeatherSerializer(ParquetSerializer):
+    """Stores data frame as Feather file. This requires pyarrow.
+    """
+    extension = ".feather"
+
+    def dump(self, df, f):
+        df.reset_index(drop=True).to_feather(f)
+
+    def load(self, f):
+        return pd.read_feather(io.BytesIO(f.read()))
+
+
+# Supported cache file formats
+serializer_classes = [CSVSerializer, NumpySerializer, ParquetSerializer, FeatherSerializer]
+
+
+class CacheIndex:
+    """Represents an index of the files in a cache folder, which is saved as a JSON file in the folder.
+
+    The index maps each symbol to series types, and each series type to the cache files.
+    For each file, the index stores the earliest and latest timestamp, as well as the number of rows:
+        {
+            "AAPL": {
+                "TIME_SERIES_DAILY_ADJUSTED": {
+                    "AAPL_TIME_SERIES_DAILY_ADJUSTED_2019-01-02.npz": {
+                        "start": "1999-11-01 00:00:00",
+                        "end": "2019-01-02 00:00:00",
+                        "rows": 4824
+                    }
+                }
+            }
+        }
+    With the index, cache files can be looked up without listing the files in the folder.
+    The index will be built by listing the folder, if the index file does not exist.
+    The index file is replaced atomically whenever the index is updated.
+    Use batch() to save the index only once for multiple updates.
+
+    A cache folder may be shared by multiple instances or processes.
+    When saving the index, the changes made by this instance (added and removed files)
+        are merged into the index file on disk, instead of overwriting the changes made by others.
+    For local folders, the merge is done while holding an exclusive lock on the folder,
+        and the index is reloaded when the index file is replaced by others.
+    Files added to the folder without updating the index are not reflected until rebuild() is called.
+
+    """
+    filename = "cache_index.json"
+
+    def __init__(self, folder, series_types):
+        """Initializes the index of a cache folder.
+
+        Args:
+            folder (str): Path of the cache folder.
+            series_types (list): Series types of the cache files, e.g. TIME_SERIES_DAILY_ADJUSTED.
+                The symbol and series type of each file are parsed from the filename.
+        """
+        self.folder = folder
+        self.series_types = series_types
+        self.path = os.path.join(folder, self.filename)
+        self.__lock = threading.RLock()
+        self.__batch_level = 0
+        # Changes not saved yet, a list of (symbol, series_type, filename, entry), entry is None for removal.
+        self.__changes = []
+        # Whether the index file should be replaced instead of merged, e.g. after rebuild().
+        self.__replace = False
+        self.__data = None
+        # Status of the index file when it was loaded or saved, for detecting changes made by others.
+        self.__file_status = None
+
+    @property
+    def data(self):
+        """The index as a dictionary.
+        """
+        with self.__lock:
+            if self.__data is None:
+                self.__data = self.__load()
+            else:
+                self.__reload()
+            return self.__data
+
+    def __status(self):
+        """Gets the status of the index file in a local folder, or None if it is not available.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def __read(self):
+        """Reads the index file.
+
+        Returns:
+            dict: The index, or None if the index file does not exist or is invalid.
+        """
+        storage_file = StorageFile(self.path)
+        if not storage_file.exists():
+            return None
+        status = self.__status()
+        try:
+            with storage_file('r') as f:
+                data = json.load(f)
+        except ValueError as ex:
+            logger.error("Failed to load cache index: %s" % str(ex))
+            return None
+        except FileNotFoundError:
+            return None
+        self.__file_status = status
+        return data
+
+    def __load(self):
+        data = self.__read()
+        if data is not None:
+            return data
+        self.__data = {}
+        self.rebuild()
+        return self.__data
+
+    def __reload(self):
+        """Reloads the index if the index file has been replaced by other instances or processes.
+        The changes not saved yet are applied to the reloaded index.
+        """
+        status = self.__status()
+        if status is None or status == self.__file_status or self.__replace:
+            return
+        data = self.__read()
+        if data is not None:
+            self.__data = self.__apply(data, self.__changes)
+
+    @staticmethod
+    def __apply(data, changes):
+        """Applies changes to an index dictionary.
+        """
+        for symbol, series_type, filename, entry in changes:
+            files = data.setdefault(symbol, {}).setdefault(series_type, {})
+            if entry is None:
+                files.pop(filename, None)
+            else:
+                files[filename] = entry
+        return data
+
+    def rebuild(self):
+        """Rebuilds the index by listing the files in the cache folder.
+        Timestamps and number of rows will not be available for the files.
+        """
+        logger.debug("Building cache index for %s..." % self.folder)
+        with self.batch():
+            self.__data = {}
+            self.__changes = []
+            self.__replace = True
+            for filename in StorageFolder(self.folder).file_names:
+                filename = os.path.basename(filename)
+                if filename != self.filename:
+                    self.add(filename)
+
+    def parse(self, filename):
+        """Parses the symbol and series type from a filename.
+
+        Returns:
+            (str, str): The symbol and series type, or (None, None) if filename is not a cache file.
+        """
+        for series_type in self.series_types:
+            token = "_%s_" % series_type
+            if token in filename:
+                return filename.split(token, 1)[0], series_type
+        return None, None
+
+    def add(self, filename, df=None):
+        """Adds a file to the index, or updates the entry of the file.
+
+        Args:
+            filename (str): The name of the cache file.
+            df (pandas.DataFrame, optional): The data stored in the file. Defaults to None.
+                The timestamps and number of rows will be stored if df is not None.
+        """
+        symbol, series_type = self.parse(filename)
+        if symbol is None:
+            return
+        entry = {"start": None, "end": None, "rows": None}
+        if df is not None:
+            entry["rows"] = len(df)
+            if "timestamp" in df.columns and not df.empty:
+                entry["start"] = str(df["timestamp"].min())
+                entry["end"] = str(df["timestamp"].max())
+        with self.__lock:
+            self.data.setdefault(symbol, {}).setdefault(series_type, {})[filename] = entry
+            self.__changes.append((symbol, series_type, filename, entry))
+            self.__save()
+
+    def remove(self, filename):
+        """Removes a file from the index.
+        """
+        symbol, series_type = self.parse(filename)
+        with self.__lock:
+            files = self.data.get(symbol, {}).get(series_type, {})
+            if filename in files:
+                del files[filename]
+                self.__changes.append((symbol, series_type, filename, None))
+                self.__save()
+
+    def files(self, symbol, series_type):
+        """Gets the entries of the cache files of a symbol and a series type.
+
+        Returns:
+            dict: A dictionary mapping filenames to the entries.
+        """
+        with self.__lock:
+            return dict(self.data.get(symbol, {}).get(series_type, {}))
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Context manager for saving the index only once for multiple updates.
+        """
+        with self.__lock:
+            self.__batch_level += 1
+            try:
+                yield self
+            finally:
+                self.__batch_level -= 1
+                self.__save()
+
+    @contextlib.contextmanager
+    def __folder_lock(self):
+        """Holds an exclusive lock on a local cache folder, so that processes save the index one at a time.
+        """
+        if fcntl is None or not os.path.isdir(self.folder):
+            yield
+            return
+        fd = os.open(self.folder, os.O_RDONLY)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def __save(self):
+        if self.__batch_level > 0 or not (self.__changes or self.__replace):
+            return
+        with self.__folder_lock():
+            data = None if self.__replace else self.__read()
+            if data is None:
+                data = self.__data
+            else:
+                # Merge the changes of this instance into the index saved by others.
+                data = self.__apply(data, self.__changes)
+            content = json.dumps(data)
+            if os.path.isdir(self.folder):
+                # Write to a temporary file and replace the index file.
+                fd, temp_path = tempfile.mkstemp(dir=self.folder, prefix=".", suffix=".tmp")
+                with os.fdopen(fd, 'w') as f:
+                    f.write(content)
+                os.replace(temp_path, self.path)
+            else:
+                # Objects in cloud storage are replaced atomically.
+                with StorageFile.init(self.path, 'w') as f:
+                    f.write(content)
+            self.__file_status = self.__status()
+        self.__data = data
+        self.__changes = []
+        self.__replace = False
+
+
 class AlphaVantage(DataSourceInterface):
     """Implements the DataSourceInterface by getting data from AlphaVantage
 
@@ -74,7 +461,10 @@ class AlphaVantage(DataSourceInterface):
 
     Data Cache:
     A cache data folder can be specified when initializing this data source.
-    CSV file containing the series will be saved into the cache data folder.
+    Files containing the series will be saved into the cache data folder.
+    The file format is determined by the serializer (NumpySerializer by default).
+    Cache files in other supported formats (e.g. CSV files saved by previous versions)
+        are read transparently and migrated to the format of the serializer.
     Mainly there are two types of cache data: TIME_SERIES_DAILY_ADJUSTED and INTRADAY.
 
     When cache folder is specified:
@@ -92,7 +482,7 @@ class AlphaVantage(DataSourceInterface):
         This file usually contains intraday data for the last a few days.
         The intraday data from AlphaVantage contains data for the last a few days only.
         The caching process also extracts intraday data for each day from the "cached" file.
-        The intraday data for each day will be saved as an independent CSV file.
+        The intraday data for each day will be saved as an independent file.
         These independent data files can be useful in the future,
              when the response from server on longer contain the data for "old days".
     
@@ -103,22 +493,27 @@ class AlphaVantage(DataSourceInterface):
     daily_series_type = "TIME_SERIES_DAILY_ADJUSTED"
     intraday_series_type = "TIME_SERIES_INTRADAY"
 
-    def __init__(self, api_key, cache_folder=None):
+    def __init__(self, api_key, cache_folder=None, serializer=None):
         """Initialize the AlphaVantage Data Source
         
         Args:
-            api_key (str): AlphaVantage API key.
+            api_key (str or list): AlphaVantage API key, or a list of API keys.
             cache_folder (str, optional): Path to local cache data folder. Defaults to None.
-                CSV file containing the series will be saved into the cache_folder
+                Files containing the series will be saved into the cache_folder
+            serializer (CacheSerializer, optional): Serializer for the cache files.
+                Defaults to None, i.e. NumpySerializer.
         """
         self.api_key = api_key
         self.cache = cache_folder
+        self.serializer = serializer if serializer else NumpySerializer()
         
         if self.cache:
             self.cache_folder = StorageFolder.init(self.cache)
             self.cache_folder.create()
+            self.index = CacheIndex(self.cache, [self.daily_series_type, self.intraday_series_type])
         else:
             self.cache_folder = None
+            self.index = None
 
         self.web_api = AlphaVantageAPI(api_key, datatype="csv")
 
@@ -171,15 +566,112 @@ class AlphaVantage(DataSourceInterface):
         if date is None:
             date = datetime.datetime.now().strftime(self.date_fmt)
         symbol = str(symbol).replace(".", "-")
-        filename = "%s_%s_%s.csv" % (symbol.upper(), series_type, date)
+        filename = "%s_%s_%s%s" % (symbol.upper(), series_type, date, self.serializer.extension)
         file_path = os.path.join(self.cache, filename)
         return file_path
 
-    def __daily_cache_prefix(self, symbol):
-        return "%s_%s_" % (str(symbol).replace(".", "-").upper(), self.daily_series_type)
+    def __symbol_key(self, symbol):
+        """The symbol as in the cache filenames.
+        """
+        return str(symbol).replace(".", "-").upper()
+
+    def __cache_files(self, symbol, series_type, prefix=""):
+        """Gets the cache files of a symbol from the index.
+        The files are not checked for existence, which requires a request for each file in cloud storage.
+        Files deleted without updating the index are removed from the index when they are read.
+
+        Args:
+            symbol (str): The symbol of the equity/stock.
+            series_type (str): Type of the data series.
+            prefix (str, optional): Prefix of the filenames without symbol and series type, e.g. "cached".
+
+        Returns:
+            list: A list of StorageFile objects.
+        """
+        files = self.index.files(self.__symbol_key(symbol), series_type)
+        prefix = "%s_%s_%s" % (self.__symbol_key(symbol), series_type, prefix)
+        return [StorageFile(os.path.join(self.cache, f)) for f in files.keys() if f.startswith(prefix)]
+
+    def __remove_missing_cache_file(self, storage_file):
+        """Removes a cache file from the index, which has been deleted, e.g. by other processes.
+        """
+        logger.debug("Cache file not found: %s" % storage_file.uri)
+        self.index.remove(os.path.basename(storage_file.uri))
+
+    def __find_cache_file(self, symbol, series_type, date):
+        """Finds an existing cache file in any supported format.
+        Files in the format of the serializer are preferred.
+
+        Returns:
+            StorageFile: The cache file, or None if there is no cache file.
+        """
+        file_path = self.__cache_file_path(symbol, series_type, date)
+        base_name = os.path.splitext(os.path.basename(file_path))[0]
+        files = self.index.files(self.__symbol_key(symbol), series_type)
+        extensions = [self.serializer.extension] + [
+            c.extension for c in serializer_classes if c.extension != self.serializer.extension
+        ]
+        for extension in extensions:
+            if base_name + extension in files:
+                return StorageFile(os.path.join(self.cache, base_name + extension))
+        return None
+
+    def __delete_cache_file(self, storage_file):
+        """Deletes a cache file and removes it from the index.
+        """
+        logger.debug("Deleting %s..." % storage_file.uri)
+        try:
+            storage_file.delete()
+        except FileNotFoundError:
+            logger.debug("Cache file not found: %s" % storage_file.uri)
+        self.index.remove(os.path.basename(storage_file.uri))
+
+    def __write_cache_file(self, df, file_path):
+        """Writes a data frame to a cache file using the serializer.
+        """
+        mode = 'wb' if self.serializer.binary else 'w'
+        with StorageFile.init(file_path, mode) as f:
+            self.serializer.dump(df, f)
+        self.index.add(os.path.basename(file_path), df)
+        return file_path
+
+    def __read_cache_file(self, storage_file, migrate=True):
+        """Reads a data frame from a cache file.
+        The format of the file is determined by the file extension.
+        Files in a format other than the one of the serializer will be migrated,
+            i.e. saved in the format of the serializer and deleted.
+
+        Args:
+            storage_file (StorageFile): A cache file.
+            migrate (bool, optional): Whether to migrate the file. Defaults to True.
+
+        Returns: A pandas data frame.
+        """
+        base_path, extension = os.path.splitext(storage_file.uri)
+        serializer = CacheSerializer.from_extension(extension)
+        if serializer is None:
+            raise ValueError("Unsupported cache file format: %s" % storage_file.uri)
+        mode = 'rb' if serializer.binary else 'r'
+        with storage_file(mode) as f:
+            df = serializer.load(f)
+        if migrate and extension != self.serializer.extension:
+            file_path = base_path + self.serializer.extension
+            logger.debug("Migrating %s to %s..." % (storage_file.uri, file_path))
+            with self.index.batch():
+                self.__write_cache_file(df, file_path)
+                self.__delete_cache_file(storage_file)
+        return df
+
+    def __read_existing_cache_file(self, storage_file):
+        """Reads a data frame from a cache file, which may have been deleted by other processes.
 
-    def __intraday_cache_prefix(self, symbol):
-        return "%s_%s_" % (str(symbol).replace(".", "-").upper(), self.intraday_series_type)
+        Returns: A pandas data frame, or None if the file does not exist.
+        """
+        try:
+            return self.__read_cache_file(storage_file)
+        except FileNotFoundError:
+            self.__remove_missing_cache_file(storage_file)
+            return None
 
     def __get_valid_daily_cache(self, symbol):
         """Gets the latest un-expired cache file for daily data.
@@ -192,17 +684,13 @@ class AlphaVantage(DataSourceInterface):
         """
         for i in range(self.daily_cache_expiration):
             d = datetime.datetime.now() - datetime.timedelta(days=i)
-            file_path = self.__cache_file_path(symbol, self.daily_series_type, d.strftime(self.date_fmt))
-            storage_file = StorageFile(file_path)
-            if storage_file.exists():
+            storage_file = self.__find_cache_file(symbol, self.daily_series_type, d.strftime(self.date_fmt))
+            if storage_file:
                 return storage_file
         return None
 
     def __get_all_daily_cache(self, symbol):
-        prefix = self.__daily_cache_prefix(symbol)
-        logger.debug("Getting cache files with prefix: %s" % prefix)
-        storage_files = StorageFolder(self.cache).filter_files(prefix)
-        return storage_files
+        return self.__cache_files(symbol, self.daily_series_type)
 
     def __save_data_frame(self, df, symbol, series_type):
         if df.empty:
@@ -210,33 +698,48 @@ class AlphaVantage(DataSourceInterface):
             return None
         file_path = self.__cache_file_path(symbol, series_type)
         logger.debug("Saving %s rows to... %s" % (len(df), file_path))
-        with StorageFile.init(file_path, 'w') as f:
-            df.to_csv(f)
-        return file_path
+        return self.__write_cache_file(df, file_path)
+
+    def __merge_daily_cache(self, df, storage_files):
+        """Merges newly requested daily data into the existing cache data.
+
+        Only the rows newer than the latest cached timestamp (or older than the earliest one)
+            are taken from the new data, i.e. existing cache data takes precedence.
+        Normally there is only one existing cache file, which contains the data merged previously.
+        Multiple cache files are concatenated and the duplicated timestamps are removed.
+
+        Args:
+            df (pandas.DataFrame): Newly requested daily data.
+            storage_files (list): A list of StorageFile objects of the existing cache files.
 
-    def __merge_daily_cache(self, storage_files):
-        # Read data from all files into a dictionary.
-        # This will eliminate duplicates.
-        data = {}
-        for storage_file in storage_files:
+        Returns: A pandas data frame of merged daily data, in reverse order.
+        """
+        cached = []
+        # The latest file comes first, so that its data will be kept when removing duplicates.
+        for storage_file in sorted(storage_files, key=lambda x: x.basename, reverse=True):
             try:
-                with storage_file('r') as f:
-                    df = pd.read_csv(f, index_col=0, parse_dates=['timestamp'])
+                # Files will be merged and deleted, there is no need to migrate them.
+                cached.append(self.__read_cache_file(storage_file, migrate=False))
+            except FileNotFoundError:
+                self.__remove_missing_cache_file(storage_file)
             except Exception as ex:
                 logger.error("%s: %s" % (type(ex), str(ex)))
-                continue
-            for index, row in df.iterrows():
-                key = row['timestamp']
-                if key in data:
-                    continue
-                data[key] = row
-        # Sort the keys in data
-        keys = list(data.keys())
-        keys.sort(reverse=True)
-        rows = [data[key] for key in keys]
-        merged_df = pd.DataFrame.from_records(rows)
-        merged_df.reset_index()
-        return merged_df
+        if not cached:
+            return df
+        if len(cached) == 1:
+            cached_df = cached[0]
+        else:
+            cached_df = pd.concat(cached, ignore_index=True).drop_duplicates("timestamp", keep="first")
+        if not cached_df["timestamp"].is_monotonic_decreasing:
+            cached_df = cached_df.sort_values("timestamp", ascending=False)
+
+        latest = cached_df["timestamp"].max()
+        earliest = cached_df["timestamp"].min()
+        newer = df[df["timestamp"] > latest].sort_values("timestamp", ascending=False)
+        older = df[df["timestamp"] < earliest].sort_values("timestamp", ascending=False)
+        logger.debug("Merging %s new rows into %s cached rows." % (len(newer) + len(older), len(cached_df)))
+        # The concatenated data frame is in reverse order without sorting.
+        return pd.concat([newer, cached_df, older], ignore_index=True)
 
     def __get_daily_data(self, symbol):
         """Gets all daily data as a panda data frame.
@@ -249,35 +752,32 @@ class AlphaVantage(DataSourceInterface):
         series_type = self.daily_series_type
         if self.cache:
             storage_file = self.__get_valid_daily_cache(symbol)
+            df = None
             if storage_file:
                 logger.debug("Reading existing data from %s" % storage_file.uri)
-                with storage_file('r') as f:
-                    df = pd.read_csv(f, index_col=0, parse_dates=['timestamp'])
-            else:
-
+                df = self.__read_existing_cache_file(storage_file)
+            if df is None:
                 df = self.__request_data(symbol, series_type, 'full')
                 if df.empty:
                     logger.warning("Data frame is empty.")
                     return pd.DataFrame(columns=['timestamp', 'open', 'close', 'high', 'low', 'volume'])
-                self.__save_data_frame(df, symbol, series_type)
 
                 # Merge existing daily data with the newly requested data
                 # Each AlphaVantage response contains only about 5000 previous data points.
                 # Older data are not in the new responses.
-                storage_files = self.__get_all_daily_cache(symbol)
-                if not storage_files:
-                    logger.debug("Data files not found in %s" % self.cache)
-                    return df
-                logger.debug("Merging %s files" % len(storage_files))
-                df = self.__merge_daily_cache(storage_files)
-                file_path = self.__save_data_frame(df, symbol, series_type)
-                # Delete old cache files.
-                storage_files.sort(key=lambda x: x.name, reverse=True)
-                for f in storage_files[1:]:
-                    if f.basename != os.path.basename(file_path):
-                        logger.debug("Deleting %s..." % f.uri)
-                        f.delete()
-
+                file_path = self.__cache_file_path(symbol, series_type)
+                storage_files = [
+                    f for f in self.__get_all_daily_cache(symbol)
+                    if f.basename != os.path.basename(file_path)
+                ]
+                if storage_files:
+                    logger.debug("Merging %s files" % len(storage_files))
+                    df = self.__merge_daily_cache(df, storage_files)
+                with self.index.batch():
+                    self.__save_data_frame(df, symbol, series_type)
+                    # Delete old cache files.
+                    for f in storage_files:
+                        self.__delete_cache_file(f)
         else:
             # Request data from server if no cache
             df = self.__request_data(symbol, series_type, 'full')
@@ -341,7 +841,7 @@ class AlphaVantage(DataSourceInterface):
 
         Returns (str): prefix for the temporary file name.
         """
-        prefix = "%s_%s_cached" % (symbol.upper(), self.intraday_series_type)
+        prefix = "%s_%s_cached" % (self.__symbol_key(symbol), self.intraday_series_type)
         return prefix
 
     def __intraday_cache_files(self, symbol):
@@ -354,12 +854,10 @@ class AlphaVantage(DataSourceInterface):
             list: A list of StorageFile objects.
         """
         prefix = self.__intraday_cache_file_prefix(symbol)
-        cached_files = []
-        cache_folder = StorageFolder(self.cache)
-        for f in cache_folder.files:
-            if f.basename.startswith(prefix):
-                cached_files.append(f)
-        return cached_files
+        return [
+            f for f in self.__cache_files(symbol, self.intraday_series_type, "cached")
+            if f.basename.startswith(prefix)
+        ]
 
     def __intraday_parse_time_from_filename(self, filename):
         """Parses the time information from intraday cache filename.
@@ -400,8 +898,7 @@ class AlphaVantage(DataSourceInterface):
                     if cached_time:
                         cached_file = f
                 else:
-                    logger.debug("Deleting cached file: %s" % f.uri)
-                    f.delete()
+                    self.__delete_cache_file(f)
             # Return the latest cache file if it is not expired.
             if cached_time:
                 if cached_time + datetime.timedelta(minutes=self.intraday_cache_expiration) > datetime.datetime.now():
@@ -421,27 +918,26 @@ class AlphaVantage(DataSourceInterface):
         cached_file = self.__intraday_valid_cache(symbol)
         if cached_file:
             logger.debug("Reading cached file: %s" % cached_file.uri)
-            with cached_file('r') as f:
-                df = pd.read_csv(f, index_col=0, parse_dates=['timestamp'])
-            return df
+            df = self.__read_existing_cache_file(cached_file)
+            if df is not None:
+                return df
         df = self.__request_data(symbol, series_type, 'full', interval="1min")
         file_path = os.path.join(self.cache, self.__intraday_cache_file_prefix(symbol)) \
-            + datetime.datetime.now().strftime(self.intraday_time_fmt)
+            + datetime.datetime.now().strftime(self.intraday_time_fmt) + self.serializer.extension
         logger.debug("Saving intraday data...")
-        with StorageFile.init(file_path, 'w') as f:
-            df.to_csv(f)
-        # Group data by date
-        groups = df.groupby(df['timestamp'].dt.normalize())
-        # Get the latest date in the data frame
-        dates = [str(name).split(" ")[0] for name, _ in groups]
-        latest = max(dates)
-        for name, group in groups:
-            date = str(name).split(" ")[0]
-            # The data for a date is complete if there is data at 1600 or the date is not the latest one
-            if not group[group.timestamp == date + " 16:00:00"].empty or date < latest:
-                date_file_path = self.__cache_file_path(symbol, series_type, date)
-                with StorageFile.init(date_file_path, 'w') as f:
-                    group.reset_index(drop=True).to_csv(f)
+        with self.index.batch():
+            self.__write_cache_file(df, file_path)
+            # Group data by date
+            groups = df.groupby(df['timestamp'].dt.normalize())
+            # Get the latest date in the data frame
+            dates = [str(name).split(" ")[0] for name, _ in groups]
+            latest = max(dates)
+            for name, group in groups:
+                date = str(name).split(" ")[0]
+                # The data for a date is complete if there is data at 1600 or the date is not the latest one
+                if not group[group.timestamp == date + " 16:00:00"].empty or date < latest:
+                    date_file_path = self.__cache_file_path(symbol, series_type, date)
+                    self.__write_cache_file(group.reset_index(drop=True), date_file_path)
         return df
 
     def get_intraday_series(self, symbol, date=None):
@@ -476,13 +972,12 @@ class AlphaVantage(DataSourceInterface):
 
             if self.cache:
                 # Check if data has been cached.
-                file_path = self.__cache_file_path(symbol, series_type, date)
-                storage_file = StorageFile(file_path)
-                if storage_file.exists():
-                    logger.debug("Reading existing data... %s" % file_path)
-                    with storage_file('r') as f:
-                        df = pd.read_csv(f, index_col=0, parse_dates=['timestamp'])
-                else:
+                storage_file = self.__find_cache_file(symbol, series_type, date)
+                df = None
+                if storage_file:
+                    logger.debug("Reading existing data... %s" % storage_file.uri)
+                    df = self.__read_existing_cache_file(storage_file)
+                if df is None:
                     df = self.__intraday_get_full_data(symbol)
                     df = df[(df['timestamp'] >= date) & (df['timestamp'] < next_date)]
             else:
@@ -497,30 +992,27 @@ class AlphaVantage(DataSourceInterface):
         df.symbol = symbol
         return df
 
-    def __get_last_cached(self, cached_files, prefix):
-        files = [f for f in cached_files if str(f).startswith(prefix)]
+    def __get_last_cached(self, symbol, series_type):
+        prefix = "%s_%s_" % (self.__symbol_key(symbol), series_type)
+        files = [
+            f for f in self.index.files(self.__symbol_key(symbol), series_type).keys()
+            if "cached" not in f
+        ]
         files.sort(reverse=True)
         if files:
             return {
-                "date": files[0].strip(prefix).strip(".csv"),
+                "date": os.path.splitext(files[0])[0][len(prefix):],
                 "path": os.path.join(self.cache, files[0]),
             }
         return {"date": None, "path": None}
 
     def last_cached(self, symbols):
-        cached_files = [f for f in self.cache_folder.file_names if "cached" not in f]
         data = []
         for symbol in symbols:
             entry = {
                 "symbol": symbol,
             }
-            entry["daily"] = self.__get_last_cached(
-                cached_files,
-                self.__daily_cache_prefix(symbol)
-            )
-            entry["intraday"] = self.__get_last_cached(
-                cached_files,
-                self.__intraday_cache_prefix(symbol)
-            )
+            entry["daily"] = self.__get_last_cached(symbol, self.daily_series_type)
+            entry["intraday"] = self.__get_last_cached(symbol, self.intraday_series_type)
             data.append(entry)
         return data
@@ -1,8 +1,9 @@
 import datetime
+import numpy as np
 import pandas as pd
 from collections import OrderedDict
-from .series import TimeDataFrame, TimeSeries
-from . import indicators
+from .series import TimeDataFrame, TimeSeries, slice_time
+from . import indicators, rolling
 
 
 class DataPoint:
@@ -78,6 +79,7 @@ class DataSeries(TimeDataFrame):
 
     def indicator(self, indicator_name, *args, **kwargs):
         """Gets a indicator
+        The calculations shared by indicators (e.g. moving averages) are cached for this data series.
         
         Args:
             indicator_name (str)): A class name in indicators.py as a string.
@@ -96,8 +98,45 @@ class DataSeries(TimeDataFrame):
         indicator_class = getattr(indicators, indicator_name)
         return indicator_class(self, *args, **kwargs)
 
+    def ascending(self, column="close"):
+        """Gets the values of a column in ascending (chronological) order.
+        The returned array is a view sharing memory with the data series, it should not be modified.
+
+        Args:
+            column (str, optional): The column name. Defaults to "close".
+
+        Returns:
+            numpy.ndarray: The values, the first element is the earliest data.
+        """
+        return rolling.ascending(self, column)
+
+    def invalidate_indicators(self):
+        """Invalidates the cached indicator calculations of this data series.
+        This should be called after modifying the values in place.
+        """
+        indicators.cache.invalidate(self)
+
 class Stock:
+    """Represents a stock, which provides the data series of a symbol from a data source.
+
+    The full daily history is loaded from the data source once (lazily, on the first request),
+        and daily series of any date range are sliced from it by binary search on the timestamps.
+    Series aggregated by calendar periods (e.g. weekly and monthly) are also calculated once from the full history.
+    The loaded data expires following the daily_cache_expiration (days) of the data source (1 day by default),
+        or when the date changes, i.e. the data is re-used in the same day.
+    Use refresh() to discard the loaded data, e.g. when the data source has been updated.
+
+    """
     date_fmt = "%Y-%m-%d"
+    # Aggregation rules for periods with fixed calendar boundaries.
+    # Keys are the rules accepted by aggregate(), values are the corresponding pandas period frequencies.
+    # Weekly periods end on Sunday, i.e. each week starts on Monday (ISO week).
+    period_aliases = {
+        "W": "W-SUN",
+        "M": "M",
+        "Q": "Q",
+        "Y": "Y",
+    }
 
     def __init__(self, symbol, data_source):
         """Initializes a Stock object.
@@ -108,7 +147,43 @@ class Stock:
         """
         self.symbol = symbol
         self.data_source = data_source
-        self.__daily_series = None
+        # Expiration time for the loaded data (days)
+        self.daily_cache_expiration = getattr(data_source, "daily_cache_expiration", 1)
+        self.__history = None
+        self.__loaded_at = None
+        # Series aggregated from the full history, keyed by the aggregation rule.
+        self.__aggregated = {}
+
+    @property
+    def expired(self):
+        """Indicates whether the loaded data is expired, or not loaded.
+        """
+        if self.__history is None:
+            return True
+        now = datetime.datetime.now()
+        if now.date() != self.__loaded_at.date():
+            return True
+        return now - self.__loaded_at >= datetime.timedelta(days=self.daily_cache_expiration)
+
+    def refresh(self):
+        """Discards the loaded data, so that the data will be loaded from the data source on the next request.
+        """
+        self.__history = None
+        self.__loaded_at = None
+        self.__aggregated = {}
+
+    def history(self):
+        """Gets the full daily history, which is loaded from the data source if not loaded or expired.
+        The returned data series is shared by the requests of this stock, it should not be modified.
+
+        Returns: A DataSeries with daily timestamp as index, the first row stores the latest data.
+        """
+        if self.expired:
+            self.refresh()
+            self.__history = DataSeries(self.data_source.get_daily_series(self.symbol))
+            self.__history.symbol = self.symbol
+            self.__loaded_at = datetime.datetime.now()
+        return self.__history
 
     @staticmethod
     def format_date_range(start, end):
@@ -144,7 +219,9 @@ class Stock:
 
         """
         start, end = Stock.format_date_range(start, end)
-        return DataSeries(self.data_source.get_daily_series(self.symbol, start, end))
+        df = slice_time(self.history(), start, end).copy()
+        df.symbol = self.symbol
+        return df
 
     def intraday_series(self, date=None):
         """Gets the intraday series.
@@ -157,71 +234,126 @@ class Stock:
         """
         return DataSeries(self.data_source.get_intraday_series(self.symbol, date))
 
-    def __aggregate_series(self, trans_func, start=None, end=None):
+    @staticmethod
+    def aggregate(df, rule):
+        """Aggregates stock data series into periods, e.g. weekly or monthly data.
+
+        The aggregation is vectorized, i.e. rows are grouped by a period key and
+            the open, high, low, close and volume of each group are calculated in one pass:
+            open: the open of the first data point in the period;
+            high: the highest high in the period;
+            low: the lowest low in the period;
+            close: the close of the last data point in the period;
+            volume: the sum of the volumes in the period.
+        This is the same as aggregating the DataPoint objects of each period with DataPoint.from_list().
+
+        Args:
+            df (pandas.DataFrame): Stock series data with timestamp as index, in reverse order.
+                The data frame should have at least 5 columns: open, high, low, close and volume.
+            rule: The aggregation rule, which can be:
+                An integer N, to aggregate every N data points (counting from the earliest one)
+                    into one data point, e.g. 5 for 5-day bars.
+                One of the period aliases in Stock.period_aliases, e.g. "W", "M", "Q" or "Y".
+                    Weeks start on Monday.
+                Any other pandas offset alias, e.g. "10D".
+                    See https://pandas.pydata.org/pandas-docs/stable/user_guide/timeseries.html#offset-aliases
+
+        Returns:
+            A DataSeries with timestamp as index, as well as 5 columns: open, high, low, close and volume.
+            The timestamp of each data point (data frame row) is the first timestamp of the aggregation period.
+            The first row stores the latest data.
+
+        """
+        attributes = ["open", "high", "low", "close", "volume"]
+        if df.empty:
+            aggregated_df = pd.DataFrame(columns=attributes, index=pd.DatetimeIndex([], name="timestamp"))
+            return DataSeries(aggregated_df)
+        # Work in chronological order so that "first" and "last" are the open and close of each period.
+        data = pd.DataFrame(
+            {attr: df[attr].to_numpy() for attr in attributes},
+            index=pd.to_datetime(df.index)
+        )[::-1]
+        data["timestamp"] = data.index
+        if isinstance(rule, int):
+            if rule < 1:
+                raise ValueError("The number of data points in each period must be positive.")
+            keys = np.arange(len(data)) // rule
+        elif rule in Stock.period_aliases:
+            keys = data.index.to_period(Stock.period_aliases[rule])
+        else:
+            keys = pd.Grouper(key="timestamp", freq=rule)
+        aggregated_df = data.groupby(keys, sort=True).agg(OrderedDict([
+            ("timestamp", "first"),
+            ("open", "first"),
+            ("high", "max"),
+            ("low", "min"),
+            ("close", "last"),
+            ("volume", "sum"),
+        ]))
+        # Offset aliases may generate empty periods, e.g. holidays.
+        aggregated_df = aggregated_df[aggregated_df["timestamp"].notnull()]
+        aggregated_df = aggregated_df.set_index("timestamp")[::-1]
+        return DataSeries(aggregated_df)
+
+    def aggregate_series(self, rule, start=None, end=None):
         """Gets aggregated stock data series.
 
         Args:
-            trans_func: A function transforms the timestamp to a string value.
-                Rows (data points) with the same transformed value will be aggregated to one row (single data point).
+            rule: The aggregation rule, see Stock.aggregate() for details.
             start: Starting date for the time series, e.g. 2017-01-21.
             end: Ending date for the time series, e.g. 2017-02-22.
 
         Returns:
-            A DataSeries with daily timestamp as index, as well as 5 columns: open, high, low, close and volume.
+            A DataSeries with timestamp as index, as well as 5 columns: open, high, low, close and volume.
             The timestamp of returned data point (data frame row) is the first timestamp of the aggregation period.
 
         """
-        attributes = ["open", "high", "low", "close", "volume"]
         start, end = Stock.format_date_range(start, end)
         df = self.daily_series(start, end)
-        # Initialization
-        aggregated_points = []
-        daily_points = []
-
-        # Loop through the data IN REVERSE ORDER
-        # The index may not start from 0 due to the filtering.
-        prev_date_transformed = 0
-        for timestamp, row in df.iterrows():
-            # Try to parse the time stamp if it is not already datetime.
-            if 'Timestamp' not in str(type(timestamp)):
-                timestamp = datetime.datetime.strptime(str(timestamp), "%Y-%m-%d")
-            date_transformed = trans_func(timestamp)
-
-            # A new period starts if the date_transformed is different from the previous date_transformed
-            if date_transformed != prev_date_transformed:
-                # # Save last period's data as a aggregated point and reset the daily list
-                if daily_points:
-                    # IMPORTANT: Reverse the daily point list
-                    daily_points.reverse()
-                    aggregated_dp = DataPoint.from_list(daily_points)
-                    aggregated_points.append(aggregated_dp)
-                    daily_points = []
-
-            prev_date_transformed = date_transformed
-            # Initialize a new daily data point
-            dp = DataPoint(timestamp, row["open"], row["high"], row["low"], row["close"], row["volume"])
-            daily_points.append(dp)
-
-        # Termination: Save the last aggregated point
-        if daily_points:
-            # IMPORTANT: Reverse the daily point list
-            daily_points.reverse()
-            aggregated_dp = DataPoint.from_list(daily_points)
-            aggregated_points.append(aggregated_dp)
-
-        # Generate a new data frame from OrderedDict to preserve the order of the columns
-        aggregated_df = pd.DataFrame(
-            OrderedDict(
-                [
-                    ("timestamp", pd.Series([p.timestamp for p in aggregated_points]))
-                ] + [
-                    (attr, pd.Series(getattr(p, attr) for p in aggregated_points))for attr in attributes
-                ]
-            )
-        )
-        aggregated_df.set_index("timestamp", inplace=True)
+        if rule in Stock.period_aliases and not df.empty:
+            aggregated_df = self.__slice_aggregated(rule, df)
+        else:
+            aggregated_df = self.aggregate(df, rule)
         aggregated_df.symbol = self.symbol
-        return DataSeries(aggregated_df)
+        return aggregated_df
+
+    def __slice_aggregated(self, rule, df):
+        """Gets the data series aggregated by calendar periods for the date range of a daily series.
+        The periods entirely in the date range are sliced from the aggregation of the full history,
+            while the first and last periods, which may be partially in the date range, are aggregated from df.
+
+        Args:
+            rule (str): One of the period aliases in Stock.period_aliases.
+            df (DataSeries): The daily series of the date range, which is not empty.
+
+        Returns: A DataSeries with the same rows as Stock.aggregate(df, rule).
+        """
+        if rule not in self.__aggregated:
+            self.__aggregated[rule] = self.aggregate(self.history(), rule)
+        first = pd.Timestamp(df.index[-1]).to_period(Stock.period_aliases[rule])
+        last = pd.Timestamp(df.index[0]).to_period(Stock.period_aliases[rule])
+        if first == last:
+            return self.aggregate(df, rule)
+        # Rows of df in the last and first periods.
+        n_last = len(slice_time(df, start=last.start_time))
+        n_first = len(slice_time(df, end=first.end_time))
+        if first + 1 < last:
+            middle = slice_time(self.__aggregated[rule], (first + 1).start_time, (last - 1).end_time)
+        else:
+            middle = self.__aggregated[rule].iloc[:0]
+        attributes = ["open", "high", "low", "close", "volume"]
+        edges = {
+            "open": (df["open"].iloc[n_last - 1], df["open"].iloc[-1]),
+            "high": (df["high"].iloc[:n_last].max(), df["high"].iloc[-n_first:].max()),
+            "low": (df["low"].iloc[:n_last].min(), df["low"].iloc[-n_first:].min()),
+            "close": (df["close"].iloc[0], df["close"].iloc[-n_first]),
+            "volume": (df["volume"].iloc[:n_last].sum(), df["volume"].iloc[-n_first:].sum()),
+        }
+        index = df.index[[n_last - 1]].append(middle.index).append(df.index[[-1]])
+        return DataSeries({
+            attr: np.concatenate([[edges[attr][0]], middle[attr].to_numpy(), [edges[attr][1]]])
+            for attr in attributes
+        }, index=pd.DatetimeIndex(index, name="timestamp"))
 
     def weekly_series(self, start=None, end=None):
         """Gets weekly stock data series.
@@ -235,18 +367,7 @@ class Stock:
             The timestamp of each data point (data frame row) is the first business day of the week.
 
         """
-        def transform_func(timestamp):
-            """Transforms a timestamp to a string of year and week of the year, e.g. "2010_25".
-
-            Args:
-                timestamp (datetime.datetime): Timestamp to be transformed.
-
-            Returns: A string with year and week of the year separated by "_" of the timestamp
-
-            """
-            return "%s_%s" % (timestamp.date().isocalendar()[0], timestamp.date().isocalendar()[1])
-
-        return self.__aggregate_series(transform_func, start, end)
+        return self.aggregate_series("W", start, end)
 
     def monthly_series(self, start=None, end=None):
         """Gets monthly stock data series.
@@ -260,14 +381,18 @@ class Stock:
             The timestamp of each data point (data frame row) is the first business day of the month.
 
         """
-        def transform_func(timestamp):
-            """Transforms a timestamp to a string of year and month, e.g. "2010_11".
+        return self.aggregate_series("M", start, end)
 
-            Args:
-                timestamp (datetime.datetime): Timestamp to be transformed.
+    def quarterly_series(self, start=None, end=None):
+        """Gets quarterly stock data series.
 
-            Returns: A string with year and month separated by "_" of the timestamp
+        Args:
+            start: Starting date for the time series, e.g. 2017-01-21.
+            end: Ending date for the time series, e.g. 2017-02-22.
 
-            """
-            return "%s_%s" % (timestamp.year, timestamp.month)
-        return self.__aggregate_series(transform_func, start, end)
+        Returns: A DataSeries with quarterly timestamp as index, 
+            as well as 5 columns: open, high, low, close and volume.
+            The timestamp of each data point (data frame row) is the first business day of the quarter.
+
+        """
+        return self.aggregate_series("Q", start, end)
@@ -1,3 +1,192 @@
+from array import array
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+from .indicators import SMA
+
+
+class Bar:
+    """Represents the prices of a stock at a time point, i.e. a row of the stock data frame.
+
+    This is a lightweight alternative to the pandas series returned by DataFrame.iloc[],
+        reading the values from the arrays precomputed by Strategy.
+    The prices can be accessed as attributes or items, e.g. bar.close or bar["close"],
+        and bar.name is the timestamp, same as a row of the data frame.
+    Other columns of the data frame are also accessible, but slower.
+    """
+    __slots__ = ("name", "open", "high", "low", "close", "volume", "data_frame", "row")
+    fields = ("open", "high", "low", "close", "volume")
+
+    def __init__(self, arrays, data_frame, row):
+        """Initializes a bar.
+
+        Args:
+            arrays (dict): A dictionary mapping "timestamp" and the fields to arrays.
+            data_frame (pandas.DataFrame): The stock data frame.
+            row (int): Position of the row in the data frame.
+        """
+        self.name = arrays["timestamp"][row]
+        self.open = arrays["open"][row]
+        self.high = arrays["high"][row]
+        self.low = arrays["low"][row]
+        self.close = arrays["close"][row]
+        self.volume = arrays["volume"][row]
+        self.data_frame = data_frame
+        self.row = row
+
+    def __getitem__(self, key):
+        if key in self.fields:
+            return getattr(self, key)
+        return self.data_frame[key].iloc[self.row]
+
+    def __getattr__(self, key):
+        # Only called for attributes other than the slots.
+        try:
+            return self.data_frame[key].iloc[self.row]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __repr__(self):
+        return "Bar(%s, open=%s, high=%s, low=%s, close=%s, volume=%s)" % (
+            self.name, self.open, self.high, self.low, self.close, self.volume
+        )
+
+
+class TradingHistory(list):
+    """Represents a trading history, a list of 3-tuples (price, shares, time).
+
+    This is a list counting the modifications other than adding trades at the end, e.g. replacing or removing trades,
+        so that a Ledger synchronized with the history can detect the modifications in O(1) and rebuild.
+    """
+    def __init__(self, *args):
+        list.__init__(self, *args)
+        self.revision = 0
+
+    def __modify(method):
+        def modify(self, *args, **kwargs):
+            self.revision += 1
+            return method(self, *args, **kwargs)
+        modify.__name__ = method.__name__
+        modify.__doc__ = method.__doc__
+        return modify
+
+    __setitem__ = __modify(list.__setitem__)
+    __delitem__ = __modify(list.__delitem__)
+    __imul__ = __modify(list.__imul__)
+    insert = __modify(list.insert)
+    pop = __modify(list.pop)
+    remove = __modify(list.remove)
+    reverse = __modify(list.reverse)
+    sort = __modify(list.sort)
+    clear = __modify(list.clear)
+    del __modify
+
+
+class Ledger:
+    """Maintains the cumulative position and cash flow of a trading history, indexed by time.
+
+    The trades are stored as compact arrays sorted by time,
+        so that the position and cash at any time can be queried with a binary search in O(log n).
+    The ledger is synchronized with a trading history (a list of 3-tuples (price, shares, time)) incrementally:
+        trades appended to the list are added to the ledger in O(1) if they are not earlier than the last trade,
+        otherwise the ledger is rebuilt.
+    The ledger is also rebuilt if the trades already added are modified.
+        Modifications of a TradingHistory are always detected,
+        while for other lists only the modifications changing the last added trade are detected.
+    Trades with time None are effective at all time.
+
+    Attributes:
+        times (array.array): The time of each trade in ascending order.
+        positions (list): The cumulative shares after each trade.
+            This is a list to keep the numeric type of shares, e.g. integer.
+        costs (array.array): The cumulative cost (price * shares) after each trade.
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.times = array("d")
+        self.positions = []
+        self.costs = array("d")
+        # Shares and cost of trades with time None
+        self.base_position = 0
+        self.base_cost = 0.0
+        # The trading history being synchronized, the number of trades added,
+        #   the last trade added and the revision of the history (for TradingHistory).
+        self.history = None
+        self.count = 0
+        self.last = None
+        self.revision = None
+
+    def add(self, price, shares, t):
+        """Adds a trade, which must not be earlier than the last trade in the ledger.
+        """
+        if t is None:
+            self.base_position += shares
+            self.base_cost += shares * price
+            return
+        self.times.append(t)
+        self.positions.append((self.positions[-1] if self.positions else 0) + shares)
+        self.costs.append((self.costs[-1] if self.costs else 0.0) + shares * price)
+
+    def sync(self, trading_history):
+        """Synchronizes the ledger with a trading history.
+        """
+        if (trading_history is not self.history
+                or len(trading_history) < self.count
+                or getattr(trading_history, "revision", None) != self.revision
+                or (self.count and trading_history[self.count - 1] is not self.last)):
+            self.clear()
+            self.history = trading_history
+        new_trades = trading_history[self.count:]
+        last_time = self.times[-1] if self.times else None
+        for price, shares, t in new_trades:
+            if t is not None and last_time is not None and t < last_time:
+                # Rebuild the ledger with trades sorted by time.
+                trades = sorted(trading_history, key=lambda trade: (trade[2] is not None, trade[2] or 0))
+                self.clear()
+                self.history = trading_history
+                for trade in trades:
+                    self.add(*trade)
+                break
+            self.add(price, shares, t)
+            if t is not None:
+                last_time = t
+        self.count = len(trading_history)
+        self.last = trading_history[-1] if self.count else None
+        self.revision = getattr(trading_history, "revision", None)
+        return self
+
+    def __index(self, t):
+        return bisect_right(self.times, t)
+
+    def position(self, t):
+        """The position at the close of time t.
+        """
+        i = self.__index(t)
+        return self.base_position + (self.positions[i - 1] if i else 0)
+
+    def cost(self, t):
+        """The total cost of trades up to the close of time t.
+        """
+        i = self.__index(t)
+        return self.base_cost + (self.costs[i - 1] if i else 0)
+
+    def cumulative(self, times):
+        """Gets the positions and costs at multiple time points.
+
+        Args:
+            times (numpy.ndarray): An array of time points.
+
+        Returns:
+            (numpy.ndarray, numpy.ndarray): The positions and total costs at the close of each time point.
+        """
+        indices = np.searchsorted(np.asarray(self.times), times, side="right")
+        positions = np.concatenate([[0], np.asarray(self.positions, dtype=float)])[indices]
+        costs = np.concatenate([[0.0], np.asarray(self.costs)])[indices]
+        return positions + self.base_position, costs + self.base_cost
+
+
 class Strategy:
     """Represents a trading strategy.
 
@@ -11,6 +200,8 @@ class Strategy:
 
     A new trading strategy can be defined as a sub-class.
     A sub-class should override the suggest() method with a new strategy.
+    Optionally, a sub-class can also override the signals() method to provide the same suggestions
+        for all time points at once as arrays, which enables the vectorized backtest() method.
     The __init__() constructor of the base class only require the series data of a particular stock.
     Additional keyword arguments passing into __init__() will become attributes of the strategy.
 
@@ -19,7 +210,12 @@ class Strategy:
             Each row should have at least 5 columns: open, high, low, close and volume.
             The first row contains the latest data.
         initial_cash (float): 
-        trading_history (list): A list of 3-tuples storing the trading history (price, shares, time)
+        trading_history (TradingHistory): A list of 3-tuples storing the trading history (price, shares, time)
+        ledger (Ledger): Cumulative position and cash of the trading history for fast queries.
+            The ledger is synchronized with the trading_history automatically.
+        arrays (dict): NumPy arrays of the timestamps, open, high, low, close and volume in the data frame,
+            for accessing the prices at each time point without pandas indexing.
+            The arrays are built when first used, and rebuilt if df is replaced.
     """
     
     HISTORY_PRICE = 0
@@ -41,11 +237,20 @@ class Strategy:
         """
         self.df = stock_data_frame
         self.initial_cash = initial_cash
-        self.trading_history = []
+        self.trading_history = TradingHistory()
+        self.ledger = Ledger()
         # Set additional keyword arguments as attributes.
         for key, value in kwargs.items():
             setattr(self, key, value)
 
+    @classmethod
+    def from_parameters(cls, stock_data_frame, **parameters):
+        """Initializes a strategy from a set of parameters, e.g. in a parameter sweep (see optimize.py).
+        By default, the parameters are passed to the constructor.
+        A sub-class can override this method to derive the constructor arguments from the parameters.
+        """
+        return cls(stock_data_frame, **parameters)
+
     def suggest(self, t=1):
         """Suggests the price and shares of stock to buy/sell at time t.
             assuming t=0 for now, t=1 means the next time point, e.g. tomorrow.
@@ -74,28 +279,19 @@ class Strategy:
     def position(self, t=0):
         """Position, i.e. the amount of stocks holding,  at the close of time t.
         """
-        pos = 0
-        for trade in self.trading_history:
-            if trade[self.HISTORY_TIME] is None or trade[self.HISTORY_TIME] <= t:
-                pos += trade[self.HISTORY_SHARES]
-        return pos
+        return self.ledger.sync(self.trading_history).position(t)
 
     def cash(self, t=0):
         """Cash available at the close of time t.
         """
-        c = self.initial_cash
-        for trade in self.trading_history:
-            if trade[self.HISTORY_TIME] is None or trade[self.HISTORY_TIME] <= t:
-                c -= trade[self.HISTORY_SHARES] * trade[self.HISTORY_PRICE]
-        return c
+        return self.initial_cash - self.ledger.sync(self.trading_history).cost(t)
     
     def equity(self, t=0):
         """The value of equity at the close of time t.
         """
-        prices = self.prices(t)
-        if prices is None:
+        if t > 0 or -t >= len(self.df):
             return 0
-        return self.position(t) * prices.close
+        return self.position(t) * self.arrays["close"][-t]
 
     def value(self, t=0):
         """The value of the sum of equity and cash at the close of time t.
@@ -105,12 +301,58 @@ class Strategy:
     def profit(self, t=0):
         return self.value(t) - self.initial_cash
 
+    def equity_curve(self, from_t=None, to_t=1):
+        """The position, cash, equity and value at the close of each time point from from_t to to_t, excluding to_t.
+        This is calculated from the ledger in one pass, instead of calling value(t) for each time point.
+
+        Args:
+            from_t (int, optional): The starting time. Defaults to None, which will use all time available before to_t.
+            to_t (int, optional): The ending time, excluded. Defaults to 1.
+
+        Returns:
+            pandas.DataFrame: A data frame with the dates as index (in reverse order),
+                and columns: position, cash, equity and value.
+        """
+        if to_t > 1:
+            to_t = 1
+        if from_t is None or from_t < 1 - len(self.df):
+            from_t = 1 - len(self.df)
+        # Time points in reverse order, same as the stock data frame.
+        times = np.arange(to_t - 1, from_t - 1, -1)
+        positions, costs = self.ledger.sync(self.trading_history).cumulative(times)
+        close = self.df["close"].to_numpy()[-times] if len(times) else np.array([])
+        equity = positions * close
+        cash = self.initial_cash - costs
+        return pd.DataFrame({
+            "position": positions,
+            "cash": cash,
+            "equity": equity,
+            "value": equity + cash,
+        }, index=self.df.index[-times])
+
+    @property
+    def arrays(self):
+        if getattr(self, "_Strategy__arrays_source", None) is not self.df:
+            # Timestamps are stored as a list to avoid creating a Timestamp object for each access.
+            arrays = {"timestamp": self.df.index.tolist()}
+            for field in Bar.fields:
+                if field in self.df.columns:
+                    arrays[field] = np.ascontiguousarray(self.df[field].to_numpy())
+                else:
+                    arrays[field] = np.full(len(self.df), np.nan)
+            self.__arrays = arrays
+            self.__arrays_source = self.df
+        return self.__arrays
+
     def prices(self, t):
         """The prices at time t, which is row in the stock data frame.
+
+        Returns:
+            Bar: The prices at time t, or None if the data at time t is not available.
         """
         if t > 0 or -t >= len(self.df):
             return None
-        return self.df.iloc[-t]
+        return Bar(self.arrays, self.df, -t)
 
     def history(self, t):
         """Historical data up to time t
@@ -137,8 +379,10 @@ class Strategy:
             return 0
         # Check if it is possible to trade at the price
         if t <= 0:
-            prices = self.prices(t)
-            if price < prices.low or price > prices.high:
+            if -t >= len(self.df):
+                return 0
+            arrays = self.arrays
+            if price < arrays["low"][-t] or price > arrays["high"][-t]:
                 return 0
         self.trading_history.append((price, shares, t))
         cost = price * shares
@@ -164,6 +408,117 @@ class Strategy:
             self.trade(p, s, t)
         return self.profit(to_t - 1) - self.profit(from_t - 1)
 
+    def signals(self):
+        """Suggests the trades for all time points at once, same as calling suggest(t) for each t.
+        This base class suggests buying 1 share at the lowest price at each time point.
+
+        A sub-class overriding suggest() should also override this method in order to use backtest().
+        As the signals are calculated before any trade,
+            a suggestion depending on the position is represented by the "exit" column,
+            which suggests selling all the position.
+
+        Returns:
+            pandas.DataFrame: A data frame with the same index as the stock data frame (in reverse order),
+                and 3 columns:
+                price: The price to trade.
+                shares: The number of shares to trade, 0 for no trade.
+                exit: True to sell all the position at the price, the shares column will be ignored.
+        """
+        if type(self).suggest is not Strategy.suggest:
+            raise NotImplementedError("%s does not implement signals()." % type(self).__name__)
+        return pd.DataFrame({
+            "price": self.df["low"].to_numpy(),
+            "shares": np.ones(len(self.df), dtype=int),
+            "exit": np.zeros(len(self.df), dtype=bool),
+        }, index=self.df.index)
+
+    def simulate(self, from_t=None, to_t=1):
+        """Simulates the trades suggested by signals() with cumulative sums over arrays,
+            without calling suggest(t) or trade() for each time point.
+        Trades with prices outside of the low-high range of the time point are not executed, same as trade().
+        The trading_history is not changed.
+
+        Args:
+            from_t (int, optional): The starting time for simulating this strategy.
+                Defaults to None, which will use all time available before to_t.
+            to_t (int, optional): The ending time for simulating this strategy, excluded. Defaults to 1.
+
+        Returns:
+            pandas.DataFrame: A data frame with index of the time points from to_t - 1 to from_t (in reverse order),
+                and columns: price, shares (executed), position, cash, equity and value at the close of each time point.
+        """
+        if to_t > 1:
+            to_t = 1
+        if from_t is None:
+            from_t = 1 - len(self.df)
+        # Positions in the stock data frame in ascending (chronological) order
+        start = max(len(self.df) - 1 + from_t, 0)
+        end = len(self.df) - 1 + to_t
+        columns = ["price", "shares", "position", "cash", "equity", "value"]
+        if end <= start:
+            return pd.DataFrame(columns=columns, index=self.df.index[:0], dtype=float)
+        signals = self.signals()
+        ascending = slice(None, None, -1)
+        prices = signals["price"].to_numpy(dtype=float)[ascending][start:end]
+        shares = signals["shares"].to_numpy()[ascending][start:end]
+        exits = signals["exit"].to_numpy(dtype=bool)[ascending][start:end]
+        low = self.df["low"].to_numpy()[ascending][start:end]
+        high = self.df["high"].to_numpy()[ascending][start:end]
+        close = self.df["close"].to_numpy()[ascending][start:end]
+
+        valid = (prices >= low) & (prices <= high)
+        buys = np.where(valid & ~exits, shares, 0)
+        exits = valid & exits
+        # Position before each time point, assuming no exit.
+        cumulative = self.position(from_t - 1) + np.cumsum(buys) - buys
+        # Every exit sells all the position, i.e. the position after the previous exit starts from 0.
+        indices = np.arange(len(exits))
+        previous_exit = np.maximum.accumulate(np.where(exits, indices, -1))
+        previous_exit = np.concatenate([[-1], previous_exit[:-1]])
+        anchor = np.where(previous_exit >= 0, cumulative[np.maximum(previous_exit, 0)], 0)
+        traded = np.where(exits, anchor - cumulative, buys)
+
+        position = self.position(from_t - 1) + np.cumsum(traded)
+        cash = self.cash(from_t - 1) - np.cumsum(traded * np.where(traded != 0, prices, 0))
+        equity = position * close
+        return pd.DataFrame({
+            "price": np.where(traded != 0, prices, 0),
+            "shares": traded,
+            "position": position,
+            "cash": cash,
+            "equity": equity,
+            "value": equity + cash,
+        }, index=self.df.index[ascending][start:end], columns=columns)[ascending]
+
+    def backtest(self, from_t=None, to_t=1):
+        """Evaluates this trading strategy with the vectorized simulate(), as an alternative to evaluate().
+        The results are the same as evaluate() if signals() is consistent with suggest().
+        The executed trades are added to the trading_history.
+
+        Args:
+            from_t (int, optional): The starting time for simulating this strategy.
+                Defaults to None, which will use all time available before to_t.
+            to_t (int, optional): The ending time for simulating this strategy, excluded. Defaults to 1.
+
+        Returns:
+            float: The profit during the period.
+        """
+        if to_t > 1:
+            to_t = 1
+        if from_t is None:
+            from_t = 1 - len(self.df)
+        value = self.value(from_t - 1)
+        results = self.simulate(from_t, to_t)
+        if len(results) == 0:
+            return 0.0
+        # Time points in ascending order
+        times = np.arange(to_t - len(results), to_t)
+        traded = results["shares"].to_numpy()[::-1]
+        prices = results["price"].to_numpy()[::-1]
+        for i in np.flatnonzero(traded):
+            self.trading_history.append((prices[i].item(), traded[i].item(), int(times[i])))
+        return results["value"].iloc[0] - value
+
 
 class GoldenCrossStrategy(Strategy):
     """Represents a trading strategy of buying at golden crosses and selling at death crosses.
@@ -178,6 +533,25 @@ class GoldenCrossStrategy(Strategy):
         self.golden_crosses = golden_crosses
         self.death_crosses = death_crosses
 
+    @classmethod
+    def from_parameters(cls, stock_data_frame, short_term=50, long_term=200, initial_cash=0):
+        """Initializes the strategy with the golden crosses and death crosses of
+            the short term and long term simple moving averages.
+        """
+        crosses = SMA.crosses(stock_data_frame, [(short_term, long_term)])[(short_term, long_term)]
+        return cls(
+            stock_data_frame, initial_cash,
+            golden_crosses=crosses["golden_cross"], death_crosses=crosses["death_cross"]
+        )
+
+    def __cross_sets(self):
+        # Sets of the crosses for fast lookup, rebuilt if the crosses are replaced.
+        key = (id(self.golden_crosses), id(self.death_crosses))
+        if getattr(self, "_GoldenCrossStrategy__cross_key", None) != key:
+            self.__crosses = (set(self.golden_crosses), set(self.death_crosses))
+            self.__cross_key = key
+        return self.__crosses
+
     def suggest(self, t=1):
         """Determine the price and shares of stock to buy/sell at time t.
         
@@ -191,16 +565,34 @@ class GoldenCrossStrategy(Strategy):
         if prices is None:
             return 0, 0
         date = prices.name
+        golden_crosses, death_crosses = self.__cross_sets()
         p = 0
         s = 0
-        if date in self.golden_crosses:
+        if date in golden_crosses:
             next_prices = self.prices(t)
             if next_prices is not None:
                 p = next_prices.high
                 s = 10
-        if date in self.death_crosses:
+        if date in death_crosses:
             next_prices = self.prices(t)
             if next_prices is not None:
                 p = next_prices.low
                 s = -self.position(t - 1)
         return p, s
+
+    def signals(self):
+        """Suggests buying 10 shares at the highest price after golden crosses,
+            and selling all the position at the lowest price after death crosses, same as suggest().
+        """
+        crosses = pd.DataFrame({
+            "golden": self.df.index.isin(self.golden_crosses),
+            "death": self.df.index.isin(self.death_crosses),
+        })
+        # The trades at time t depends on the crosses at time t - 1, i.e. the next row.
+        golden = crosses["golden"].shift(-1, fill_value=False).to_numpy()
+        death = crosses["death"].shift(-1, fill_value=False).to_numpy()
+        return pd.DataFrame({
+            "price": np.where(death, self.df["low"].to_numpy(), self.df["high"].to_numpy()),
+            "shares": np.where(golden, 10, 0),
+            "exit": death,
+        }, index=self.df.index)
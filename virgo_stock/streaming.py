@@ -0,0 +1,230 @@
+"""Contains classes for updating indicators incrementally, one bar at a time.
+
+The indicators in indicators.py are calculated over the whole history of a data frame.
+For monitoring live (e.g. intraday) data, the classes here keep the state of an indicator,
+    so that each new bar is processed in O(1) time:
+    StreamingSMA keeps a running sum over a window,
+    StreamingEMA keeps the weighted sums of the exponential moving average,
+    StreamingBollinger keeps the mean and the sum of squared deviations (Welford's algorithm) over a window.
+The values are consistent with the batch indicators (SMA, EMA and BollingerBands).
+
+Bars are processed in chronological order (oldest first).
+A bar can be a row of a data frame (pandas.Series), a dictionary, or a number.
+
+Example:
+    sma = StreamingSMA.from_data_frame(df, 20)
+    # For each new bar
+    value = sma.update(bar)
+
+"""
+import math
+import numbers
+from collections import deque
+from . import rolling
+
+
+class StreamingIndicator:
+    """Base class of indicators updated incrementally.
+
+    Attributes:
+        n_point (int): Number of data points used to calculate each value.
+        series_type (str): The price type used to calculate the indicator.
+        count (int): Number of bars processed.
+        value: The latest value of the indicator.
+    """
+    def __init__(self, n_point, series_type='close'):
+        self.n_point = n_point
+        self.series_type = series_type
+        self.count = 0
+        self.value = math.nan
+
+    @classmethod
+    def from_data_frame(cls, data_frame, *args, **kwargs):
+        """Initializes the indicator with historical data.
+
+        Args:
+            data_frame (pandas.DataFrame): Stock data with timestamp as index, in reverse order.
+            Additional arguments are passed to the constructor.
+
+        Returns: An indicator with the state after processing all rows in the data frame.
+        """
+        indicator = cls(*args, **kwargs)
+        for price in rolling.ascending(data_frame, indicator.series_type):
+            indicator.update(float(price))
+        return indicator
+
+    def price(self, bar):
+        """Gets the price of the series type from a bar.
+        """
+        if isinstance(bar, numbers.Real):
+            return float(bar)
+        return float(bar[self.series_type])
+
+    def update(self, bar):
+        """Processes a new bar.
+
+        Args:
+            bar: A row of stock data containing the series type (e.g. close) or a price.
+
+        Returns: The value of the indicator after processing the bar.
+        """
+        raise NotImplementedError()
+
+
+class StreamingSMA(StreamingIndicator):
+    """Simple moving average updated with a running sum.
+    The value is NaN until n_point bars are processed, or while there is a NaN price in the window,
+        same as the SMA indicator.
+    """
+    # The running sum is re-calculated from the window periodically to avoid accumulating rounding errors.
+    resync_interval = 1000
+
+    def __init__(self, n_point, series_type='close'):
+        StreamingIndicator.__init__(self, n_point, series_type)
+        self.window = deque(maxlen=n_point)
+        # Sum of the prices in the window, excluding NaN.
+        self.total = 0.0
+        # Number of NaN prices in the window.
+        self.n_nan = 0
+
+    def update(self, bar):
+        price = self.price(bar)
+        if len(self.window) == self.n_point:
+            removed = self.window[0]
+            if math.isnan(removed):
+                self.n_nan -= 1
+            else:
+                self.total -= removed
+        self.window.append(price)
+        if math.isnan(price):
+            self.n_nan += 1
+        else:
+            self.total += price
+        self.count += 1
+        if self.count % self.resync_interval == 0:
+            self.total = math.fsum(x for x in self.window if not math.isnan(x))
+        if len(self.window) == self.n_point and self.n_nan == 0:
+            self.value = self.total / self.n_point
+        else:
+            self.value = math.nan
+        return self.value
+
+
+class StreamingEMA(StreamingIndicator):
+    """Exponential moving average updated with weighted sums, same as the EMA indicator,
+        i.e. pandas ewm(span=n_point, adjust=True).mean().
+    NaN prices are skipped, while the weights of the previous prices still decay (same as ignore_na=False).
+    """
+    def __init__(self, n_point, series_type='close'):
+        StreamingIndicator.__init__(self, n_point, series_type)
+        self.decay = 1 - 2.0 / (n_point + 1)
+        # The average is numerator / denominator, where
+        # numerator = sum(decay^i * price[t-i]) and denominator = sum(decay^i), excluding NaN prices.
+        self.numerator = 0.0
+        self.denominator = 0.0
+
+    def update(self, bar):
+        price = self.price(bar)
+        self.numerator *= self.decay
+        self.denominator *= self.decay
+        if not math.isnan(price):
+            self.numerator += price
+            self.denominator += 1.0
+        self.count += 1
+        if self.denominator > 0:
+            self.value = self.numerator / self.denominator
+        return self.value
+
+
+class StreamingBollinger(StreamingIndicator):
+    """Bollinger Bands updated with the mean and variance over a sliding window (Welford's algorithm).
+    The values are NaN until n_point bars are processed, or while there is a NaN price in the window,
+        same as the BollingerBands indicator.
+
+    Attributes:
+        upper (float): The upper band.
+        lower (float): The lower band.
+        mean (float): The moving average.
+        value (dict): The latest values with the same keys as the columns of BollingerBands.
+    """
+    # The mean and variance are re-calculated from the window periodically to avoid accumulating rounding errors.
+    resync_interval = 1000
+
+    def __init__(self, n_point=20, k_std=2, series_type='close', prefix="BB"):
+        StreamingIndicator.__init__(self, n_point, series_type)
+        self.k_std = k_std
+        self.prefix = prefix
+        self.window = deque(maxlen=n_point)
+        # Number of NaN prices in the window.
+        self.n_nan = 0
+        # Number, mean and sum of squared deviations from the mean of the prices in the window, excluding NaN.
+        self.n = 0
+        self.running_mean = 0.0
+        self.m2 = 0.0
+        self.upper = math.nan
+        self.lower = math.nan
+        self.mean = math.nan
+        self.value = self.__values()
+
+    def __values(self):
+        return {
+            self.prefix + "_upper": self.upper,
+            self.prefix + "_lower": self.lower,
+            self.prefix + "_sma": self.mean,
+        }
+
+    def __resync(self):
+        prices = [x for x in self.window if not math.isnan(x)]
+        self.n = len(prices)
+        self.running_mean = math.fsum(prices) / self.n if prices else 0.0
+        self.m2 = math.fsum((x - self.running_mean) ** 2 for x in prices)
+
+    def __add(self, price):
+        if math.isnan(price):
+            self.n_nan += 1
+            return
+        self.n += 1
+        previous_mean = self.running_mean
+        self.running_mean += (price - previous_mean) / self.n
+        self.m2 += (price - previous_mean) * (price - self.running_mean)
+
+    def __remove(self, price):
+        if math.isnan(price):
+            self.n_nan -= 1
+            return
+        self.n -= 1
+        if self.n == 0:
+            self.running_mean = 0.0
+            self.m2 = 0.0
+            return
+        previous_mean = self.running_mean
+        self.running_mean -= (price - previous_mean) / self.n
+        self.m2 -= (price - previous_mean) * (price - self.running_mean)
+
+    def __replace(self, removed, price):
+        previous_mean = self.running_mean
+        self.running_mean += (price - removed) / self.n
+        self.m2 += (price - removed) * (price - self.running_mean + removed - previous_mean)
+
+    def update(self, bar):
+        price = self.price(bar)
+        removed = self.window[0] if len(self.window) == self.n_point else None
+        self.window.append(price)
+        if removed is not None and not math.isnan(removed) and not math.isnan(price):
+            self.__replace(removed, price)
+        else:
+            if removed is not None:
+                self.__remove(removed)
+            self.__add(price)
+        self.count += 1
+        if self.count % self.resync_interval == 0:
+            self.__resync()
+        if len(self.window) == self.n_point and self.n_nan == 0 and self.n_point > 1:
+            std = math.sqrt(max(self.m2, 0.0) / (self.n_point - 1))
+            self.mean = self.running_mean
+            self.upper = self.mean + self.k_std * std
+            self.lower = self.mean - self.k_std * std
+        else:
+            self.mean = self.upper = self.lower = math.nan
+        self.value = self.__values()
+        return self.value
@@ -0,0 +1,198 @@
+"""Contains the StockUniverse class for analyzing multiple stocks at once.
+
+The data of all stocks are aligned on a shared timestamp index and
+    stored as 2-D NumPy arrays (timestamps x symbols), one array for each field (open, high, low, close and volume).
+Consistent with the rest of the package, the first row stores the latest data.
+Calculations on the arrays run over all stocks in one vectorized pass.
+"""
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from .stock import Stock, DataSeries
+from . import rolling
+logger = logging.getLogger(__name__)
+
+
+class StockUniverse:
+    """Represents a set of stocks with series data aligned on a shared timestamp index.
+
+    Attributes:
+        symbols (list): The symbols of the stocks.
+        data_source (DataSourceInterface): The data source for loading the data.
+        timestamps (pandas.DatetimeIndex): The shared timestamp index, in reverse order.
+            The index is the union of the timestamps of all stocks.
+        data (dict): A dictionary mapping each field to a 2-D array of timestamps x symbols.
+            Values are NaN if a stock has no data at a timestamp.
+        failed (list): Symbols failed to load.
+
+    """
+    fields = ["open", "high", "low", "close", "volume"]
+
+    def __init__(self, symbols, data_source=None, max_workers=8):
+        """Initializes a stock universe. Use load() to load the data.
+
+        Args:
+            symbols (list): A list of symbols.
+            data_source (DataSourceInterface, optional): A data source for loading the data.
+            max_workers (int, optional): Max number of stocks loading concurrently. Defaults to 8.
+        """
+        self.symbols = list(symbols)
+        self.data_source = data_source
+        self.max_workers = max_workers
+        self.timestamps = pd.DatetimeIndex([])
+        self.data = {}
+        self.failed = []
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __load_symbol(self, symbol, start, end):
+        try:
+            return Stock(symbol, self.data_source).daily_series(start, end)
+        except Exception as ex:
+            logger.error("Failed to load %s: %s: %s" % (symbol, type(ex), str(ex)))
+            return None
+
+    def load(self, start=None, end=None):
+        """Loads the daily series data of all stocks concurrently.
+
+        Args:
+            start: Starting date for the time series, e.g. 2017-01-21.
+            end: Ending date for the time series, e.g. 2017-02-22.
+
+        Returns: The StockUniverse itself.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            frames = list(executor.map(lambda symbol: self.__load_symbol(symbol, start, end), self.symbols))
+        self.align(dict(zip(self.symbols, frames)))
+        return self
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Initializes a stock universe from data frames.
+
+        Args:
+            frames (dict): A dictionary mapping symbols to data frames of stock series data.
+
+        Returns: A StockUniverse.
+        """
+        universe = cls(frames.keys())
+        universe.align(frames)
+        return universe
+
+    def align(self, frames):
+        """Aligns the data frames on a shared timestamp index and stores them as 2-D arrays.
+
+        Args:
+            frames (dict): A dictionary mapping symbols to data frames of stock series data.
+                Symbols mapping to None or empty data frames are considered as failed.
+        """
+        self.failed = [symbol for symbol in self.symbols if frames.get(symbol) is None or frames[symbol].empty]
+        indices = [
+            pd.DatetimeIndex(frames[symbol].index) for symbol in self.symbols if symbol not in self.failed
+        ]
+        timestamps = indices[0] if indices else pd.DatetimeIndex([])
+        for index in indices[1:]:
+            timestamps = timestamps.union(index)
+        self.timestamps = timestamps.sort_values(ascending=False)
+        self.data = {
+            field: np.full((len(self.timestamps), len(self.symbols)), np.nan) for field in self.fields
+        }
+        for j, symbol in enumerate(self.symbols):
+            if symbol in self.failed:
+                continue
+            df = frames[symbol]
+            rows = self.timestamps.get_indexer(pd.DatetimeIndex(df.index))
+            for field in self.fields:
+                if field in df.columns:
+                    self.data[field][rows, j] = df[field].to_numpy(dtype=float)
+
+    def panel(self, field="close"):
+        """Gets the data of a field as a data frame (timestamps x symbols).
+        """
+        return pd.DataFrame(self.data[field], index=self.timestamps, columns=self.symbols)
+
+    def series(self, symbol):
+        """Gets the data of a stock as a DataSeries, excluding the timestamps without data.
+        """
+        j = self.symbols.index(symbol)
+        df = DataSeries(
+            {field: self.data[field][:, j] for field in self.fields},
+            index=self.timestamps
+        )
+        return df[~np.isnan(self.data["close"][:, j])]
+
+    def returns(self, field="close", periods=1):
+        """Calculates the returns of all stocks.
+
+        Returns:
+            numpy.ndarray: A 2-D array of timestamps x symbols.
+                The return at a timestamp is relative to the value "periods" rows below (earlier).
+                The last "periods" rows are NaN.
+        """
+        values = self.data[field]
+        returns = np.full(values.shape, np.nan)
+        if periods < len(values):
+            returns[:-periods] = values[:-periods] / values[periods:] - 1
+        return returns
+
+    def rolling_mean(self, n_point, field="close"):
+        """Calculates the simple moving average of all stocks, same as the SMA indicator.
+        Windows including timestamps without data (NaN) produce NaN.
+
+        Returns:
+            numpy.ndarray: A 2-D array of timestamps x symbols.
+        """
+        return rolling.rolling_mean(self.data[field][::-1], n_point)[::-1]
+
+    def rolling_std(self, n_point, field="close"):
+        """Calculates the moving standard deviation of all stocks.
+
+        Returns:
+            numpy.ndarray: A 2-D array of timestamps x symbols.
+        """
+        return rolling.rolling_std(self.data[field][::-1], n_point)[::-1]
+
+    def ewm_mean(self, n_point, field="close"):
+        """Calculates the exponential moving average of all stocks, same as the EMA indicator.
+
+        Returns:
+            numpy.ndarray: A 2-D array of timestamps x symbols.
+        """
+        return rolling.ewm_mean(self.data[field][::-1], n_point)[::-1]
+
+    @staticmethod
+    def crosses(series_n, series_k):
+        """Finds where series_n breaking above series_k for all stocks.
+
+        Args:
+            series_n (numpy.ndarray): A 2-D array of timestamps x symbols, in reverse order.
+            series_k (numpy.ndarray): A 2-D array with the same shape as series_n.
+
+        Returns:
+            numpy.ndarray: A 2-D boolean array, True if series_n breaking above series_k at the timestamp.
+        """
+        crosses = np.zeros(series_n.shape, dtype=bool)
+        crosses[:-1] = (series_n[:-1] > series_k[:-1]) & (series_n[1:] < series_k[1:])
+        return crosses
+
+    def golden_crosses(self, short_term=50, long_term=200, field="close"):
+        """Finds the golden crosses of simple moving averages for all stocks.
+
+        Returns:
+            pandas.DataFrame: A boolean data frame of timestamps x symbols.
+        """
+        short = self.rolling_mean(short_term, field)
+        long = self.rolling_mean(long_term, field)
+        return pd.DataFrame(self.crosses(short, long), index=self.timestamps, columns=self.symbols)
+
+    def death_crosses(self, short_term=50, long_term=200, field="close"):
+        """Finds the death crosses of simple moving averages for all stocks.
+
+        Returns:
+            pandas.DataFrame: A boolean data frame of timestamps x symbols.
+        """
+        short = self.rolling_mean(short_term, field)
+        long = self.rolling_mean(long_term, field)
+        return pd.DataFrame(self.crosses(long, short), index=self.timestamps, columns=self.symbols)